@@ -0,0 +1,87 @@
+"""Throughput of the rooms sharded over 1, 2 and 4 worker processes behind a
+FrontServer, and the time to add a worker and move the rooms it takes over. The
+front runs in its own process, and every room is a bot of bench_server sending
+its next command as soon as the previous one is answered. Throughput only scales
+with the cores the workers can run on.
+
+    PYTHONPATH=./src python benchmark/bench_cluster.py [n_rooms] [seconds]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from multiprocessing.connection import Connection
+
+from bench_server import Bot
+
+from host.cluster import FrontServer, run_worker
+
+
+def quiet_worker(path: str) -> None:
+    sys.stdout = open(os.devnull, "w")  # the game model prints the turns
+    run_worker(path)
+
+
+def serve_front(path: str, n_workers: int, conn: Connection) -> None:
+    async def main() -> None:
+        front = FrontServer(worker_target=quiet_worker)
+        for _ in range(n_workers):
+            await front.add_worker()
+        unix_server = await front.start_unix(path)
+        conn.send("ready")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)
+        start = time.perf_counter()
+        await front.add_worker()
+        conn.send((front.moved_count, time.perf_counter() - start))
+        unix_server.close()
+        await front.close()
+
+    asyncio.run(main())
+
+
+async def load(path: str, n_rooms: int, seconds: float, conn: Connection) -> None:
+    bots = [Bot(*await asyncio.open_unix_connection(path)) for _ in range(n_rooms)]
+    await asyncio.gather(*(bot.setup() for bot in bots))
+    start = time.monotonic()
+    await asyncio.gather(*(bot.play(start + seconds, 0) for bot in bots))
+    elapsed = time.monotonic() - start
+    n_commands = sum(len(bot.latencies) for bot in bots)
+    conn.send("grow")
+    moved, move_seconds = conn.recv()
+    for bot in bots:
+        bot.writer.close()
+    print(
+        f"{n_commands / elapsed:.0f} commands/sec, adding a worker moved "
+        f"{moved} rooms in {move_seconds * 1e3:.0f} ms"
+    )
+
+
+def main(n_rooms: int, seconds: float) -> None:
+    print(f"{n_rooms} rooms, {os.cpu_count()} cores")
+    context = multiprocessing.get_context("spawn")
+    for n_workers in (1, 2, 4):
+        path = os.path.join(tempfile.mkdtemp(), "front.sock")
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=serve_front, args=(path, n_workers, child_conn)
+        )
+        process.start()
+        assert parent_conn.recv() == "ready"
+        print(f"{n_workers} workers: ", end="", flush=True)
+        try:
+            asyncio.run(load(path, n_rooms, seconds, parent_conn))
+        finally:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5,
+    )
@@ -0,0 +1,85 @@
+"""Cost of delivering events to many subscribers that each handle a few event
+types: every subscriber receiving every event and filtering it in listen, against
+the topic routing each event type to the handlers registered for it.
+
+    PYTHONPATH=./src python benchmark/bench_dispatch.py [n_events] [n_subscribers]
+"""
+
+import random
+import sys
+import time
+
+from event import Event, EventRuntime, EventType, Topic
+
+EVENT_TYPES = list(EventType)
+TYPES_PER_SUBSCRIBER = 3
+
+
+class FilteringSubscriber:
+    """Receives every event and ignores the types it does not handle"""
+
+    def __init__(self, event_types: list[EventType]):
+        self.event_types = event_types
+        self.handled = 0
+
+    async def listen(self, event: Event) -> None:
+        if event.event_type in self.event_types:
+            self.handled += 1
+
+
+class Handlers:
+    def __init__(self):
+        self.handled = 0
+
+    async def on_event(self, event: Event) -> None:
+        self.handled += 1
+
+
+def bench(events: list[Event], interests: list[list[EventType]], routed: bool):
+    runtime = EventRuntime()
+    topic = Topic("bench", runtime=runtime)
+    counters: list = []
+    for event_types in interests:
+        if routed:
+            handlers = Handlers()
+            topic.register_handlers(
+                {event_type: handlers.on_event for event_type in event_types}
+            )
+            counters.append(handlers)
+        else:
+            subscriber = FilteringSubscriber(event_types)
+            topic.register_subscriber(subscriber)
+            counters.append(subscriber)
+    start = time.perf_counter()
+    for event in events:
+        topic.publish(Event(event.event_type, event.message))
+    topic.close()
+    topic.drain()
+    elapsed = time.perf_counter() - start
+    runtime.close()
+    return elapsed, sum(counter.handled for counter in counters)
+
+
+def main(n_events: int, n_subscribers: int) -> None:
+    rng = random.Random(0)
+    events = [Event(rng.choice(EVENT_TYPES), {}) for _ in range(n_events)]
+    interests = [
+        rng.sample(EVENT_TYPES, TYPES_PER_SUBSCRIBER) for _ in range(n_subscribers)
+    ]
+    print(
+        f"{n_events} events of {len(EVENT_TYPES)} types, {n_subscribers} subscribers "
+        f"of {TYPES_PER_SUBSCRIBER} types each"
+    )
+    for name, routed in (("every subscriber", False), ("routed handlers", True)):
+        elapsed, handled = bench(events, interests, routed)
+        print(
+            f"{name}: {elapsed * 1e3:.0f} ms, {elapsed / n_events * 1e6:.1f} us/event, "
+            f"{handled} handled"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 5000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 50,
+    )
@@ -0,0 +1,87 @@
+"""Cost of building and publishing events, with the envelope of uuid4 id, utcnow
+timestamp and dict message compared to the envelope of topic sequence number,
+monotonic timestamp and slotted payload.
+
+    PYTHONPATH=./src python benchmark/bench_event.py [n_events]
+"""
+
+import sys
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable
+
+from event import Event, EventType, LocalPublisher, Topic, payload
+
+
+@dataclass
+class LegacyEvent:
+    """Envelope of the events before the sequence numbers"""
+
+    event_type: EventType
+    message: Any
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    timestamp: datetime = field(default_factory=datetime.utcnow)
+
+
+def legacy_event(player_id: int, old_cash: int, new_cash: int) -> Any:
+    return LegacyEvent(
+        EventType.G_CASH_CHANGE,
+        {"player_id": player_id, "old_cash": old_cash, "new_cash": new_cash},
+    )
+
+
+def payload_event(player_id: int, old_cash: int, new_cash: int) -> Any:
+    return Event(
+        EventType.G_CASH_CHANGE,
+        payload.CashChange(player_id=player_id, old_cash=old_cash, new_cash=new_cash),
+    )
+
+
+class CountingSubscriber:
+    def __init__(self):
+        self.count = 0
+        self.expected = 0
+        self.done = threading.Event()
+
+    async def listen(self, event: Any) -> None:
+        self.count += event.message["new_cash"] >= 0
+        if self.count == self.expected:
+            self.done.set()
+
+
+def bench_construct(build: Callable[[int, int, int], Any], n_events: int) -> float:
+    start = time.perf_counter()
+    for i in range(n_events):
+        build(0, i, i + 1)
+    return (time.perf_counter() - start) / n_events
+
+
+def bench_publish(build: Callable[[int, int, int], Any], n_events: int) -> float:
+    topic = Topic("bench")
+    subscriber = CountingSubscriber()
+    subscriber.expected = n_events
+    topic.register_subscriber(subscriber)
+    publisher = LocalPublisher()
+    publisher.register_topic(topic)
+    start = time.perf_counter()
+    for i in range(n_events):
+        publisher.publish(build(0, i, i + 1))
+    subscriber.done.wait()
+    elapsed = time.perf_counter() - start
+    topic.close()
+    return elapsed / n_events
+
+
+def main(n_events: int) -> None:
+    for name, build in (("legacy", legacy_event), ("payload", payload_event)):
+        construct = bench_construct(build, n_events)
+        publish = bench_publish(build, n_events)
+        print(f"{name} construct: {construct * 1e9:.0f} ns/event")
+        print(f"{name} publish to listen: {publish * 1e9:.0f} ns/event")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,31 @@
+"""Throughput of the simulation farm in games/sec by worker count.
+
+PYTHONPATH=./src python benchmark/bench_farm.py [n_games] [master_seed]
+"""
+
+import os
+import sys
+
+from game import farm, sim
+
+
+def main(n_games: int, master_seed: int) -> None:
+    worker_counts = sorted({1, 2, os.cpu_count() or 1})
+    for workers in worker_counts:
+        simulation_farm = farm.SimulationFarm(
+            policies=[sim.GreedyPolicy() for _ in range(4)],
+            master_seed=master_seed,
+            workers=workers,
+        )
+        stats = simulation_farm.run(n_games)
+        print(
+            f"workers: {workers}, games/sec: {stats.games_per_sec:.1f}, "
+            + f"turns: {stats.turns}, timeouts: {stats.timeouts}, wins: {stats.wins}"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 400,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 9001,
+    )
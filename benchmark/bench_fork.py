@@ -0,0 +1,40 @@
+"""Cost of Game.fork, fresh and into a reused game, against copy.deepcopy, alone
+and followed by one simulated turn as in a lookahead.
+
+    PYTHONPATH=./src python benchmark/bench_fork.py [n_turns]
+"""
+
+import copy
+import sys
+import timeit
+
+from game import sim
+from game.game import Game
+from game.rng import GameRng
+
+
+def main(n_turns: int) -> None:
+    simulator = sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+    game = simulator.new_game(rng=GameRng(9001))
+    for _ in range(n_turns):
+        simulator.play_turn(game)
+    scratch = game.fork()
+
+    def play_turn(forked: Game) -> None:
+        simulator.play_turn(forked)
+
+    number = 2000
+    for name, statement in (
+        ("deepcopy", lambda: copy.deepcopy(game)),
+        ("fork", game.fork),
+        ("fork into", lambda: game.fork(into=scratch)),
+        ("deepcopy + turn", lambda: play_turn(copy.deepcopy(game))),
+        ("fork + turn", lambda: play_turn(game.fork())),
+        ("fork into + turn", lambda: play_turn(game.fork(into=scratch))),
+    ):
+        elapsed = timeit.timeit(statement, number=number)
+        print(f"{name}: {elapsed / number * 1e6:.1f} us/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 120)
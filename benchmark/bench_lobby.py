@@ -0,0 +1,76 @@
+"""Lobby pages of a server with many rooms: a page rebuilt over every room as
+list_rooms used to, a page of the index, and the cached JSON of a page, while
+polled alone and while every poll follows a user joining or leaving a room.
+
+    PYTHONPATH=./src python benchmark/bench_lobby.py [n_rooms] [n_polls]
+"""
+
+import json
+import sys
+import time
+from typing import Any, Callable
+
+from host.lobby import RoomState
+from host.server import server
+
+
+def rebuild(lobby: server) -> bytes:
+    """A page of open rooms, filtered and encoded over every room"""
+    rooms = [
+        {
+            "uid": room.uid,
+            "name": room.name,
+            "host": room.host.name,
+            "users": len(room.users),
+            "max_users": room.max_users,
+            "state": room.state.value,
+        }
+        for room in lobby.rooms.values()
+        if room.state is RoomState.OPEN and len(room.users) < room.max_users
+    ]
+    return json.dumps({"rooms": rooms[:20], "total": len(rooms)}).encode()
+
+
+def bench(n_polls: int, poll: Callable[[], Any], churn: Callable[[], None]) -> float:
+    start = time.perf_counter()
+    for _ in range(n_polls):
+        churn()
+        poll()
+    return (time.perf_counter() - start) / n_polls
+
+
+def main(n_rooms: int, n_polls: int) -> None:
+    lobby = server()
+    room_uids = []
+    for idx in range(n_rooms):
+        host = lobby.add_user(f"host-{idx}")
+        room_uids.append(lobby.create_room(host.uid, f"room-{idx}"))
+        lobby.join_room(host.uid, room_uids[-1])
+    guest = lobby.add_user("guest")
+
+    def churn() -> None:
+        if guest.room_uid is None:
+            lobby.join_room(guest.uid, room_uids[n_rooms // 2])
+        else:
+            lobby.leave_room(guest.uid)
+
+    polls = {
+        "rebuilt": lambda: rebuild(lobby),
+        "index page": lambda: lobby.list_rooms(open_seats=True),
+        "cached JSON": lambda: lobby.lobby_index.page_json(open_seats=True),
+    }
+    print(f"{n_rooms} rooms, page of 20 open rooms")
+    for name, poll in polls.items():
+        idle = bench(n_polls, poll, lambda: None)
+        busy = bench(n_polls, poll, churn)
+        print(
+            f"{name:>12}: {idle * 1e6:8.2f} us per poll, "
+            f"{busy * 1e6:8.2f} us with a join or leave before each"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 10000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 1000,
+    )
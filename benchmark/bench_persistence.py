@@ -0,0 +1,94 @@
+"""Commands per second of the network game server with and without persisting
+its rooms to SQLite. The server runs in its own process, and every room is a bot
+of bench_server sending a command every interval seconds, by default as soon as
+the previous one is answered. With persistence, the dirty rooms are written
+behind every flush interval and their changes committed in one transaction,
+reported as commits per second.
+
+    PYTHONPATH=./src python benchmark/bench_persistence.py [rooms] [seconds] [interval]
+"""
+
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing.connection import Connection
+from typing import Optional
+
+from bench_server import Bot
+
+from host.network import GameServer
+from host.persistence import GameStore
+
+
+def serve(path: str, database: Optional[str], conn: Connection) -> None:
+    sys.stdout = open(os.devnull, "w")  # the game model prints the turns
+
+    async def main() -> None:
+        store = None if database is None else GameStore(database)
+        game_server = GameServer(store=store)
+        unix_server = await game_server.start_unix(path)
+        conn.send("ready")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)
+        commits = 0 if store is None else store.commit_count
+        await loop.run_in_executor(None, conn.recv)
+        if store is not None:
+            commits = store.commit_count - commits
+        unix_server.close()
+        game_server.close()
+        conn.send(commits)
+
+    asyncio.run(main())
+
+
+async def load(
+    path: str, n_rooms: int, seconds: float, interval: float, conn: Connection
+) -> None:
+    bots = [Bot(*await asyncio.open_unix_connection(path)) for _ in range(n_rooms)]
+    await asyncio.gather(*(bot.setup() for bot in bots))
+    conn.send("start")
+    start = time.monotonic()
+    await asyncio.gather(*(bot.play(start + seconds, interval) for bot in bots))
+    elapsed = time.monotonic() - start
+    conn.send("stop")
+    commits = conn.recv()
+    for bot in bots:
+        bot.writer.close()
+    latencies = [latency for bot in bots for latency in bot.latencies]
+    print(
+        f"{len(latencies) / elapsed:.0f} commands/sec, median latency "
+        f"{statistics.median(latencies) / 1e3:.0f} us, "
+        f"{commits / elapsed:.0f} commits/sec"
+    )
+
+
+def main(n_rooms: int, seconds: float, interval: float) -> None:
+    print(f"{n_rooms} rooms, a command every {interval * 1e3:.0f} ms")
+    context = multiprocessing.get_context("spawn")
+    for persist in (False, True):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, "server.sock")
+        database = os.path.join(directory, "games.db") if persist else None
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=serve, args=(path, database, child_conn))
+        process.start()
+        assert parent_conn.recv() == "ready"
+        print(f"persistence {'on' if persist else 'off'}: ", end="", flush=True)
+        try:
+            asyncio.run(load(path, n_rooms, seconds, interval, parent_conn))
+        finally:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 5,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0,
+    )
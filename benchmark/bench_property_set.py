@@ -0,0 +1,60 @@
+"""Cost of the ownership queries of PropertySet against a full rescan of the set,
+and the resulting simulation throughput.
+
+    PYTHONPATH=./src python benchmark/bench_property_set.py [n_games]
+"""
+
+import sys
+import timeit
+
+import constants as c
+from game import game_initializer, sim, space
+
+
+def count_owned_by_scan(property_set: space.PropertySet, owner_uid: int) -> int:
+    """count_owned before the owner counts were kept"""
+    return sum(
+        1 for property_ in property_set.properties if property_.owner_uid == owner_uid
+    )
+
+
+def update_monopoly_by_scan(property_set: space.PropertySet) -> bool:
+    """update_monopoly before the owner counts were kept"""
+    owner_uid = property_set.properties[0].owner_uid
+    for property_ in property_set.properties[1:]:
+        if property_.owner_uid is None or property_.owner_uid != owner_uid:
+            return False
+    return True
+
+
+def main(n_games: int) -> None:
+    game_map = game_initializer.build_game_map(
+        HOUSE_LIMIT=c.CONST_HOUSE_LIMIT, HOTEL_LIMIT=c.CONST_HOTEL_LIMIT
+    )
+    railroad = game_map.map_list[5]
+    assert isinstance(railroad, space.RailroadSpace)
+    for position in (5, 15, 25):
+        property_ = game_map.map_list[position]
+        assert isinstance(property_, space.Property)
+        property_.assign_owner(1)
+    railroads = railroad.property_set
+
+    number = 200000
+    for name, statement in (
+        ("count_owned (scan)", lambda: count_owned_by_scan(railroads, 1)),
+        ("count_owned", lambda: railroads.count_owned(1)),
+        ("monopoly check (scan)", lambda: update_monopoly_by_scan(railroads)),
+        ("assign_owner", lambda: railroad.assign_owner(1)),
+        ("railroad compute_rent", railroad.compute_rent),
+    ):
+        elapsed = timeit.timeit(statement, number=number)
+        print(f"{name}: {elapsed / number * 1e9:.0f} ns/call")
+
+    simulator = sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+    stats = simulator.run(n_games, seed=9001)
+    print(f"simulation games/sec: {stats.games_per_sec:.1f}")
+    print(f"simulation turns/sec: {stats.turns_per_sec:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
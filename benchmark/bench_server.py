@@ -0,0 +1,160 @@
+"""Load generator of the network game server. The server runs in its own process,
+and every room is a bot connection playing two users, sending a command every
+interval seconds and waiting for its reply. Reports the command to first event
+latency and the rooms one core of the server can host at that pace, from the CPU
+time of the server process.
+
+    PYTHONPATH=./src python benchmark/bench_server.py [n_rooms] [seconds] [interval]
+"""
+
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing.connection import Connection
+from typing import Any
+
+from host.network import GameServer
+
+# last event of a reply deciding the next command, and the player sending it
+_NEXT_COMMAND = {
+    "g_current_player": ("v_roll_and_move", "player_id"),
+    "g_wait_for_roll": ("v_roll_and_move", "player_id"),
+    "g_wait_for_end_turn": ("v_end_turn", "player_id"),
+    "g_ask_to_buy": ("v_buy_property", "player_id"),
+    "g_ask_for_rent": ("v_pay", "payer_id"),
+    "g_current_auction": ("v_bid_pass", "player_id"),
+}
+
+
+def serve(path: str, conn: Connection) -> None:
+    sys.stdout = open(os.devnull, "w")  # the game model prints the turns
+
+    async def main() -> None:
+        unix_server = await GameServer().start_unix(path)
+        conn.send("ready")
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, conn.recv)  # start measuring
+        start = time.process_time()
+        await loop.run_in_executor(None, conn.recv)
+        conn.send(time.process_time() - start)
+        unix_server.close()
+
+    asyncio.run(main())
+
+
+class Bot:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.users: dict[int, str] = {}  # player id, user uid
+        self.command = ("v_roll_and_move", 0)
+        self.latencies: list[int] = []
+        self.errors = 0
+
+    async def request(self, line: dict[str, Any]) -> dict[str, Any]:
+        """Send the request, return its reply and play the events before it"""
+        start = time.monotonic_ns()
+        self.writer.write(json.dumps(line).encode() + b"\n")
+        first = True
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if first:
+                self.latencies.append(time.monotonic_ns() - start)
+                first = False
+            if reply["op"] != "event":
+                return reply
+            message = reply["message"]
+            if reply["type"] == "g_add_player":
+                self.users = {
+                    player: user for user, player in message["user_to_player"].items()
+                }
+            elif reply["type"] in _NEXT_COMMAND:
+                command, field = _NEXT_COMMAND[reply["type"]]
+                self.command = (command, message[field])
+
+    async def setup(self) -> None:
+        uids = [
+            (await self.request({"op": "login", "name": name}))["user"]
+            for name in ("a", "b")
+        ]
+        reply = await self.request({"op": "create_room", "user": uids[0]})
+        await self.request({"op": "join_room", "user": uids[1], "room": reply["room"]})
+        await self.request({"op": "start", "user": uids[0]})
+        self.latencies.clear()
+
+    async def play(self, until: float, interval: float) -> None:
+        rng = random.Random()
+        await asyncio.sleep(rng.uniform(0, interval))
+        while time.monotonic() < until:
+            command, player = self.command
+            reply = await self.request(
+                {"op": "command", "user": self.users[player], "type": command}
+            )
+            if reply["op"] == "error":
+                # e.g. not enough cash to buy, or a jailed player: end the turn
+                self.errors += 1
+                other = "v_roll_and_move" if command == "v_end_turn" else "v_end_turn"
+                self.command = (other, player)
+            await asyncio.sleep(interval)
+
+
+async def load(
+    path: str, n_rooms: int, seconds: float, interval: float, conn: Connection
+) -> None:
+    bots = [Bot(*await asyncio.open_unix_connection(path)) for _ in range(n_rooms)]
+    await asyncio.gather(*(bot.setup() for bot in bots))
+    conn.send("start")
+    start = time.monotonic()
+    await asyncio.gather(*(bot.play(start + seconds, interval) for bot in bots))
+    elapsed = time.monotonic() - start
+    conn.send("stop")
+    cpu_seconds = conn.recv()
+    for bot in bots:
+        bot.writer.close()
+
+    latencies = sorted(latency for bot in bots for latency in bot.latencies)
+    n_commands = len(latencies)
+    utilization = cpu_seconds / elapsed
+    print(
+        f"{n_rooms} rooms, a command every {interval * 1e3:.0f} ms: "
+        f"{n_commands / elapsed:.0f} commands/sec, "
+        f"{sum(bot.errors for bot in bots)} rejected"
+    )
+    print(
+        f"command to event latency: median "
+        f"{statistics.median(latencies) / 1e3:.0f} us, "
+        f"p99 {latencies[int(n_commands * 0.99)] / 1e3:.0f} us"
+    )
+    print(
+        f"server CPU {utilization:.0%} of a core, "
+        f"{n_rooms / utilization:.0f} rooms per core"
+    )
+
+
+def main(n_rooms: int, seconds: float, interval: float) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "server.sock")
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(target=serve, args=(path, child_conn))
+    process.start()
+    assert parent_conn.recv() == "ready"
+    try:
+        asyncio.run(load(path, n_rooms, seconds, interval, parent_conn))
+    finally:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.kill()
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 10,
+        float(sys.argv[3]) if len(sys.argv) > 3 else 0.5,
+    )
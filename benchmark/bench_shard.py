@@ -0,0 +1,63 @@
+"""Events of many games dispatched on 1 to 8 shards, each shard on its own loop.
+Every handler blocks for a short write, e.g. to a socket or a log, during which
+the other shards keep dispatching; the events of every game are checked to be
+handled in order.
+
+    PYTHONPATH=./src python benchmark/bench_shard.py [n_games] [n_events]
+"""
+
+import sys
+import time
+
+from event import Event, EventRuntime, EventType, ShardedDispatcher, payload
+
+WRITE_SECONDS = 0.0001
+
+
+class GameSubscriber:
+    def __init__(self):
+        self.last_seq = 0
+        self.in_order = True
+
+    def listen(self, event: Event) -> None:
+        self.in_order &= event.seq == self.last_seq + 1
+        self.last_seq = event.seq
+        time.sleep(WRITE_SECONDS)
+
+
+def bench(n_shards: int, n_games: int, n_events: int) -> tuple[float, bool]:
+    runtime = EventRuntime(n_loops=n_shards)
+    dispatcher = ShardedDispatcher("bench", n_shards=n_shards, runtime=runtime)
+    subscribers = {f"game-{idx}": GameSubscriber() for idx in range(n_games)}
+    for game_id, subscriber in subscribers.items():
+        dispatcher.register_game(game_id, subscriber)
+    start = time.perf_counter()
+    for idx in range(n_events):
+        for game_id in subscribers:
+            message = payload.CashChange(player_id=0, old_cash=idx, new_cash=idx + 1)
+            dispatcher.publish(game_id, Event(EventType.G_CASH_CHANGE, message))
+    dispatcher.close()
+    dispatcher.drain()
+    elapsed = time.perf_counter() - start
+    runtime.close()
+    return elapsed, all(subscriber.in_order for subscriber in subscribers.values())
+
+
+def main(n_games: int, n_events: int) -> None:
+    total = n_games * n_events
+    print(
+        f"{n_games} games, {n_events} events each, {WRITE_SECONDS * 1e6:.0f} us write"
+    )
+    for n_shards in (1, 2, 4, 8):
+        elapsed, in_order = bench(n_shards, n_games, n_events)
+        print(
+            f"{n_shards} shards: {total / elapsed:.0f} events/sec, "
+            f"{'in order' if in_order else 'OUT OF ORDER'}"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 64,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100,
+    )
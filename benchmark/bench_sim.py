@@ -0,0 +1,22 @@
+"""Throughput of the headless simulation engine in games/sec and turns/sec.
+
+PYTHONPATH=./src python benchmark/bench_sim.py [n_games]
+"""
+
+import sys
+
+from game import sim
+
+
+def main(n_games: int) -> None:
+    simulator = sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+    stats = simulator.run(n_games, seed=9001)
+    print(f"games: {stats.games}, turns: {stats.turns}, timeouts: {stats.timeouts}")
+    print(f"wins by seat: {stats.wins}")
+    print(f"elapsed: {stats.elapsed:.2f}s")
+    print(f"games/sec: {stats.games_per_sec:.1f}")
+    print(f"turns/sec: {stats.turns_per_sec:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,44 @@
+"""Size and conversion time of the compact GameState against pickle and deepcopy
+of the Game object graph.
+
+    PYTHONPATH=./src python benchmark/bench_state.py [n_turns]
+"""
+
+import copy
+import pickle
+import sys
+import timeit
+
+from game import sim, state
+from game.rng import GameRng
+
+
+def main(n_turns: int) -> None:
+    simulator = sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+    game = simulator.new_game(rng=GameRng(9001))
+    for _ in range(n_turns):
+        simulator.play_turn(game)
+
+    game_state = state.encode(game)
+    buffer = game_state.to_bytes()
+    template = simulator.new_game()
+    print(f"bytes/game: {len(buffer)}")
+    print(f"bytes/game (no rng): {len(state.encode(game, False).to_bytes())}")
+    print(f"bytes/game (pickle): {len(pickle.dumps(game))}")
+
+    number = 2000
+    for name, statement in (
+        ("encode", lambda: state.encode(game)),
+        ("to_bytes", game_state.to_bytes),
+        ("from_bytes", lambda: state.GameState.from_bytes(buffer)),
+        ("decode", lambda: state.decode(game_state)),
+        ("decode into game", lambda: state.decode(game_state, game=template)),
+        ("pickle round trip", lambda: pickle.loads(pickle.dumps(game))),
+        ("deepcopy", lambda: copy.deepcopy(game)),
+    ):
+        elapsed = timeit.timeit(statement, number=number)
+        print(f"{name}: {elapsed / number * 1e6:.1f} us/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 120)
@@ -0,0 +1,58 @@
+"""Events per second through a topic whose subscribers do no I/O, written as
+async listeners, each listening from its own queue and task, and as synchronous
+listeners called straight from the broadcast.
+
+    PYTHONPATH=./src python benchmark/bench_sync.py [n_events]
+"""
+
+import sys
+import time
+
+from event import Event, EventRuntime, EventType, Topic
+
+
+class AsyncCounter:
+    def __init__(self):
+        self.count = 0
+
+    async def listen(self, event: Event) -> None:
+        self.count += 1
+
+
+class SyncCounter:
+    def __init__(self):
+        self.count = 0
+
+    def listen(self, event: Event) -> None:
+        self.count += 1
+
+
+def bench(counter_type: type, n_subscribers: int, n_events: int) -> float:
+    runtime = EventRuntime()
+    topic = Topic("bench", runtime=runtime)
+    counters = [counter_type() for _ in range(n_subscribers)]
+    for counter in counters:
+        topic.register_subscriber(counter)
+    start = time.perf_counter()
+    for _ in range(n_events):
+        topic.publish(Event(EventType.G_DICE_ROLL, {"dices": (1, 2)}))
+    topic.close()
+    topic.drain()
+    elapsed = time.perf_counter() - start
+    runtime.close()
+    assert all(counter.count == n_events for counter in counters)
+    return n_events / elapsed
+
+
+def main(n_events: int) -> None:
+    for n_subscribers in (1, 2, 10):
+        async_rate = bench(AsyncCounter, n_subscribers, n_events)
+        sync_rate = bench(SyncCounter, n_subscribers, n_events)
+        print(
+            f"{n_subscribers} subscribers: async {async_rate:.0f} events/sec, "
+            f"sync {sync_rate:.0f} events/sec ({sync_rate / async_rate:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,66 @@
+"""End-to-end latency of the event bus, from Publisher.publish to
+Subscriber.listen, for single events and for bursts like the events of a turn.
+
+    PYTHONPATH=./src python benchmark/bench_topic.py [n_events]
+"""
+
+import statistics
+import sys
+import threading
+import time
+
+from event import Event, EventType, LocalPublisher, Topic
+
+
+class LatencySubscriber:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.expected = 0
+        self.done = threading.Event()
+
+    def expect(self, count: int) -> None:
+        self.latencies.clear()
+        self.expected = count
+        self.done.clear()
+
+    async def listen(self, event: Event) -> None:
+        self.latencies.append(time.perf_counter() - event.message["published"])
+        if len(self.latencies) == self.expected:
+            self.done.set()
+
+
+def publish(publisher: LocalPublisher, subscriber: LatencySubscriber, count: int):
+    subscriber.expect(count)
+    for _ in range(count):
+        publisher.publish(
+            Event(EventType.G_DICE_ROLL, {"published": time.perf_counter()})
+        )
+    subscriber.done.wait()
+
+
+def main(n_events: int) -> None:
+    topic = Topic("bench")
+    subscriber = LatencySubscriber()
+    topic.register_subscriber(subscriber)
+    publisher = LocalPublisher()
+    publisher.register_topic(topic)
+
+    latencies: list[float] = []
+    for _ in range(n_events):
+        publish(publisher, subscriber, 1)
+        latencies.extend(subscriber.latencies)
+    latencies.sort()
+    print(f"single event median: {statistics.median(latencies) * 1e6:.0f} us")
+    print(f"single event p99: {latencies[int(len(latencies) * 0.99)] * 1e6:.0f} us")
+
+    burst = 20  # about the events of a turn
+    start = time.perf_counter()
+    for _ in range(n_events // burst):
+        publish(publisher, subscriber, burst)
+    elapsed = time.perf_counter() - start
+    print(f"burst of {burst} events: {elapsed / (n_events // burst) * 1e6:.0f} us")
+    print(f"events/sec: {n_events // burst * burst / elapsed:.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
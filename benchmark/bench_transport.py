@@ -0,0 +1,142 @@
+"""Throughput and latency of events sent to another process over a Unix socket,
+against the LocalPublisher of the same process. Latency is from Event creation
+to the subscriber of the receiving topic, on the monotonic clock of the host, for
+single events sent apart. Throughput is for bursts sent as fast as possible.
+
+    PYTHONPATH=./src python benchmark/bench_transport.py [n_events]
+"""
+
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing.connection import Connection
+
+from event import (
+    Event,
+    EventRuntime,
+    EventType,
+    LocalPublisher,
+    Publisher,
+    SocketPublisher,
+    SocketReceiver,
+    Topic,
+    payload,
+)
+
+BURST = 20  # about the events of a turn, written at once
+PAUSE = 0.0002  # between the events of the latency runs
+
+
+class LatencySubscriber:
+    def __init__(self):
+        self.expected = 0
+        self.latencies: list[int] = []
+        self.done = threading.Event()
+
+    def expect(self, count: int) -> None:
+        self.latencies = []
+        self.expected = count
+        self.done.clear()
+
+    def listen(self, event: Event) -> None:
+        self.latencies.append(time.monotonic_ns() - event.timestamp_ns)
+        if len(self.latencies) == self.expected:
+            self.done.set()
+
+
+def send(publisher: Publisher, n_events: int, pause: float = 0) -> None:
+    """Publish bursts of events, or single events pause seconds apart"""
+    burst = 1 if pause else BURST
+    for start in range(0, n_events, burst):
+        with publisher.batch():
+            for idx in range(start, min(start + burst, n_events)):
+                message = payload.CashChange(
+                    player_id=idx % 4, old_cash=idx, new_cash=idx + 1
+                )
+                publisher.publish(Event(EventType.G_CASH_CHANGE, message))
+        if pause:
+            time.sleep(pause)
+
+
+def print_latency(name: str, latencies: list[int]) -> None:
+    latencies.sort()
+    print(
+        f"{name} latency: median {statistics.median(latencies) / 1e3:.0f} us, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] / 1e3:.0f} us"
+    )
+
+
+def child(path: str, counts: tuple[int, int], conn: Connection) -> None:
+    runtime = EventRuntime()
+    topic = Topic("remote", runtime=runtime)
+    subscriber = LatencySubscriber()
+    topic.register_subscriber(subscriber)
+    receiver = SocketReceiver(path, topic, runtime=runtime)
+    for count in counts:
+        subscriber.expect(count)
+        conn.send("ready")
+        subscriber.done.wait()
+        conn.send((time.monotonic_ns(), subscriber.latencies))
+    receiver.close()
+    runtime.close()
+
+
+def bench_local(n_latency: int, n_events: int) -> None:
+    runtime = EventRuntime()
+    topic = Topic("local", runtime=runtime)
+    subscriber = LatencySubscriber()
+    topic.register_subscriber(subscriber)
+    publisher = LocalPublisher()
+    publisher.register_topic(topic)
+
+    subscriber.expect(n_latency)
+    send(publisher, n_latency, pause=PAUSE)
+    subscriber.done.wait()
+    print_latency("local", subscriber.latencies)
+
+    subscriber.expect(n_events)
+    start = time.perf_counter()
+    send(publisher, n_events)
+    subscriber.done.wait()
+    elapsed = time.perf_counter() - start
+    print(f"local throughput: {n_events / elapsed:.0f} events/sec")
+    runtime.close()
+
+
+def bench_socket(n_latency: int, n_events: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.sock")
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    process = context.Process(
+        target=child, args=(path, (n_latency, n_events), child_conn)
+    )
+    process.start()
+
+    assert parent_conn.recv() == "ready"
+    publisher = SocketPublisher(path)
+    send(publisher, n_latency, pause=PAUSE)
+    _end, latencies = parent_conn.recv()
+    print_latency("socket", latencies)
+
+    assert parent_conn.recv() == "ready"
+    start = time.monotonic_ns()
+    send(publisher, n_events)
+    end, _latencies = parent_conn.recv()
+    elapsed = (end - start) / 1e9
+    print(f"socket throughput: {n_events / elapsed:.0f} events/sec")
+    publisher.close()
+    process.join()
+
+
+def main(n_events: int) -> None:
+    n_latency = min(n_events, 2000)
+    bench_local(n_latency, n_events)
+    bench_socket(n_latency, n_events)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
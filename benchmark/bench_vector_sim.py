@@ -0,0 +1,24 @@
+"""Throughput of the vectorized lockstep simulator in games/sec and turns/sec.
+Requires numpy.
+
+    PYTHONPATH=./src python benchmark/bench_vector_sim.py [n_games]
+"""
+
+import sys
+
+from game.vector_sim import VectorSimulator
+
+
+def main(n_games: int) -> None:
+    simulator = VectorSimulator(n_games=n_games, seed=9001)
+    stats = simulator.run()
+    print(f"games: {stats.games}, turns: {stats.turns}, timeouts: {stats.timeouts}")
+    print(f"steps: {stats.steps}")
+    print(f"wins by seat: {stats.wins}")
+    print(f"elapsed: {stats.elapsed:.2f}s")
+    print(f"games/sec: {stats.games_per_sec:.1f}")
+    print(f"turns/sec: {stats.turns_per_sec:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -5,6 +5,15 @@ CONST_GO_CASH = 200
 CONST_HOUSE_MAX = 32
 CONST_HOTEL_MAX = 12
 CONST_MAX_DOUBLE_ROLL = 3
+CONST_JAIL_FINE = 50
+CONST_MAX_JAIL_TURNS = 3  # pay the fine and leave after failing this many rolls
+
+# Room
+CONST_ROOM_SIZE = 8  # users of a room
+
+# Simulation
+CONST_SIM_STARTING_CASH = 1500
+CONST_SIM_MAX_TURNS = 1000
 
 # Property
 CONST_HOUSE_LIMIT = 4
@@ -1,90 +1,100 @@
 from dataclasses import dataclass, field
 
-from event import Event, EventType, Subscriber
+from event import Event, EventType, Handler, SyncSubscriber
 
 from .game_controller import GameController
 
+_BID_AMOUNTS = {
+    EventType.V_BID_1: 1,
+    EventType.V_BID_10: 10,
+    EventType.V_BID_50: 50,
+    EventType.V_BID_100: 100,
+    EventType.V_BID_PASS: 0,
+}
+
 
 @dataclass(slots=True)
-class ControllerListener(Subscriber):
+class ControllerListener(SyncSubscriber):
     game_controller: GameController
     user_to_player: dict[str, int] = field(default_factory=dict)
+    _handlers: dict[EventType, Handler] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._handlers = {
+            EventType.V_ADD_PLAYER: self._on_add_player,
+            EventType.V_ROLL_AND_MOVE: self._on_roll_and_move,
+            EventType.V_ASSIGN_TOKEN: self._on_assign_token,
+            EventType.V_START_GAME: self._on_start_game,
+            EventType.V_END_TURN: self._on_end_turn,
+            EventType.V_BUY_PROPERTY: self._on_buy_property,
+            EventType.V_AUCTION_PROPERTY: self._on_auction_property,
+            **{event_type: self._on_bid for event_type in _BID_AMOUNTS},
+            EventType.V_PAY: self._on_pay,
+            EventType.V_PROPERTY_STATUS: self._on_property_status,
+            EventType.V_MORTGAGE: self._on_mortgage,
+            EventType.V_UNMORTGAGE: self._on_unmortgage,
+            EventType.V_ADD_HOUSE: self._on_add_house,
+            EventType.V_SELL_HOUSE: self._on_sell_house,
+        }
+
+    @property
+    def handlers(self) -> dict[EventType, Handler]:
+        """Handler of every user command, see Topic.register_handlers"""
+        return self._handlers
+
+    def listen(self, event: Event) -> None:
+        handler = self._handlers.get(event.event_type)
+        if handler is not None:
+            handler(event)
+
+    def _player_id(self, event: Event) -> int:
+        return self.user_to_player[event.message["user_id"]]
+
+    def _on_add_player(self, event: Event) -> None:
+        user_ids = event.message["user_ids"]
+        self.user_to_player = self.game_controller.add_players(user_ids)
+
+    def _on_roll_and_move(self, event: Event) -> None:
+        self.game_controller.roll_and_move(self._player_id(event))
+
+    def _on_assign_token(self, event: Event) -> None:
+        token = event.message["token"]
+        self.game_controller.assign_player_token(self._player_id(event), token)
+
+    def _on_start_game(self, event: Event) -> None:
+        self.game_controller.start_game()
+
+    def _on_end_turn(self, event: Event) -> None:
+        self.game_controller.end_turn(self._player_id(event))
+
+    def _on_buy_property(self, event: Event) -> None:
+        self.game_controller.buy_property(self._player_id(event))
+
+    def _on_auction_property(self, event: Event) -> None:
+        self.game_controller.auction_property(self._player_id(event))
+
+    def _on_bid(self, event: Event) -> None:
+        amount = _BID_AMOUNTS[event.event_type]
+        self.game_controller.bid_property(self._player_id(event), amount)
+
+    def _on_pay(self, event: Event) -> None:
+        self.game_controller.pay(self._player_id(event))
+
+    def _on_property_status(self, event: Event) -> None:
+        self.game_controller.get_property_status(self._player_id(event))
+
+    def _on_mortgage(self, event: Event) -> None:
+        property_id = event.message["property_id"]
+        self.game_controller.mortgage(self._player_id(event), property_id)
+
+    def _on_unmortgage(self, event: Event) -> None:
+        property_id = event.message["property_id"]
+        self.game_controller.unmortgage(self._player_id(event), property_id)
+
+    def _on_add_house(self, event: Event) -> None:
+        property_id = event.message["property_id"]
+        self.game_controller.add_house(self._player_id(event), property_id)
 
-    async def listen(self, event: Event):
-        if event.event_type is EventType.V_ADD_PLAYER:
-            msg = event.message
-            user_ids = msg["user_ids"]
-            self.user_to_player = self.game_controller.add_players(user_ids)
-        elif event.event_type is EventType.V_ROLL_AND_MOVE:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.roll_and_move(self.user_to_player[user_id])
-        elif event.event_type is EventType.V_ASSIGN_TOKEN:
-            msg = event.message
-            user_id = msg["user_id"]
-            token = msg["token"]
-            self.game_controller.assign_player_token(
-                self.user_to_player[user_id], token
-            )
-        elif event.event_type is EventType.V_START_GAME:
-            self.game_controller.start_game()
-        elif event.event_type is EventType.V_END_TURN:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.end_turn(self.user_to_player[user_id])
-        elif event.event_type is EventType.V_BUY_PROPERTY:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.buy_property(self.user_to_player[user_id])
-        elif event.event_type is EventType.V_AUCTION_PROPERTY:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.auction_property(self.user_to_player[user_id])
-        elif event.event_type in (
-            EventType.V_BID_1,
-            EventType.V_BID_10,
-            EventType.V_BID_50,
-            EventType.V_BID_100,
-            EventType.V_BID_PASS,
-        ):
-            msg = event.message
-            user_id = msg["user_id"]
-            if event.event_type is EventType.V_BID_1:
-                amount = 1
-            elif event.event_type is EventType.V_BID_10:
-                amount = 10
-            elif event.event_type is EventType.V_BID_50:
-                amount = 50
-            elif event.event_type is EventType.V_BID_100:
-                amount = 100
-            else:
-                amount = 0
-            self.game_controller.bid_property(self.user_to_player[user_id], amount)
-        elif event.event_type is EventType.V_PAY:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.pay(self.user_to_player[user_id])
-        elif event.event_type is EventType.V_PROPERTY_STATUS:
-            msg = event.message
-            user_id = msg["user_id"]
-            self.game_controller.get_property_status(self.user_to_player[user_id])
-        elif event.event_type is EventType.V_MORTGAGE:
-            msg = event.message
-            user_id = msg["user_id"]
-            property_id = msg["property_id"]
-            self.game_controller.mortgage(self.user_to_player[user_id], property_id)
-        elif event.event_type is EventType.V_UNMORTGAGE:
-            msg = event.message
-            user_id = msg["user_id"]
-            property_id = msg["property_id"]
-            self.game_controller.unmortgage(self.user_to_player[user_id], property_id)
-        elif event.event_type is EventType.V_ADD_HOUSE:
-            msg = event.message
-            user_id = msg["user_id"]
-            property_id = msg["property_id"]
-            self.game_controller.add_house(self.user_to_player[user_id], property_id)
-        elif event.event_type is EventType.V_SELL_HOUSE:
-            msg = event.message
-            user_id = msg["user_id"]
-            property_id = msg["property_id"]
-            self.game_controller.sell_house(self.user_to_player[user_id], property_id)
+    def _on_sell_house(self, event: Event) -> None:
+        property_id = event.message["property_id"]
+        self.game_controller.sell_house(self._player_id(event), property_id)
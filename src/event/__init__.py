@@ -1,4 +1,38 @@
+from .coalesce import CoalescingPublisher
 from .event import Event, EventType
+from .metrics import HistogramSnapshot, TopicSnapshot, openmetrics
+from .runtime import EventRuntime
+from .shard import ShardedDispatcher
+from .subscription import (
+    Handler,
+    HandlerTable,
+    QueuePolicy,
+    Subscription,
+    SubscriptionStats,
+    SyncSubscriber,
+)
 from .topic import LocalPublisher, Publisher, Subscriber, Topic
+from .transport import SocketPublisher, SocketReceiver
 
-__all__ = ["Event", "EventType", "Topic", "Subscriber", "Publisher", "LocalPublisher"]
+__all__ = [
+    "Event",
+    "EventType",
+    "EventRuntime",
+    "Topic",
+    "Subscriber",
+    "Publisher",
+    "LocalPublisher",
+    "CoalescingPublisher",
+    "Handler",
+    "HandlerTable",
+    "QueuePolicy",
+    "Subscription",
+    "SubscriptionStats",
+    "SyncSubscriber",
+    "ShardedDispatcher",
+    "SocketPublisher",
+    "SocketReceiver",
+    "HistogramSnapshot",
+    "TopicSnapshot",
+    "openmetrics",
+]
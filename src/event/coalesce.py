@@ -0,0 +1,102 @@
+"""
+Coalescing stage between a publisher and its topic.
+
+A command of the game model can publish several cash changes for the same player,
+e.g. the Go cash and a card, and several moves for the same token, e.g. the move
+and its offset after passing Go. Inside a batch, CoalescingPublisher holds the
+events and merges the cash changes and moves of a player into one event that goes
+from the first old value to the last new value. Any other event ends the run of
+mergeable events, so the events keep their order relative to it. The held events
+are published when the outermost batch ends.
+
+coalesce_key and merge apply the same merging to the subscribers listening with
+the COALESCE queue policy.
+"""
+
+import contextlib
+import dataclasses
+from collections.abc import Iterator
+from typing import Any, Optional
+
+from event.event import Event, EventType
+from event.topic import Publisher, Topic
+
+# (old key, new key) of the message of the mergeable event types
+COALESCED_FIELDS: dict[EventType, tuple[str, str]] = {
+    EventType.G_CASH_CHANGE: ("old_cash", "new_cash"),
+    EventType.G_MOVE: ("old_position", "new_position"),
+}
+
+
+class CoalescingPublisher(Publisher):
+    def __init__(self, publisher: Publisher):
+        self.publisher = publisher  # publishes the merged events
+        self.held: list[Event] = []
+        self.merged_count = 0  # events merged into an earlier one
+        self._run: dict[tuple[EventType, int], Event] = {}  # by type and player
+        self._depth = 0
+
+    def register_topic(self, topic: Topic) -> None:
+        self.topic = topic
+        self.publisher.register_topic(topic)
+
+    def publish(self, event: Event) -> None:
+        if self._depth == 0:
+            self.publisher.publish(event)
+            return
+        fields = COALESCED_FIELDS.get(event.event_type)
+        if fields is None:
+            self._run.clear()
+            self.held.append(event)
+            return
+        key = (event.event_type, event.message["player_id"])
+        earlier = self._run.get(key)
+        if earlier is None:
+            self._run[key] = event
+            self.held.append(event)
+            return
+        _old_key, new_key = fields
+        earlier.message = _replace(earlier.message, new_key, event.message[new_key])
+        self.merged_count += 1
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self.flush()
+
+    def flush(self) -> None:
+        """Publish the held events"""
+        held, self.held = self.held, []
+        self._run.clear()
+        for event in held:
+            self.publisher.publish(event)
+
+
+def coalesce_key(event: Event) -> Optional[tuple[EventType, int]]:
+    """Key of the mergeable events, by type and player. None for the others"""
+    if event.event_type not in COALESCED_FIELDS:
+        return None
+    return (event.event_type, event.message["player_id"])
+
+
+def merge(earlier: Event, later: Event) -> Event:
+    """Copy of the later event that starts from the old value of the earlier one.
+    Any other event type replaces the earlier event as it is"""
+    fields = COALESCED_FIELDS.get(later.event_type)
+    if fields is None:
+        return later
+    old_key, _new_key = fields
+    message = _replace(later.message, old_key, earlier.message[old_key])
+    return dataclasses.replace(later, message=message)
+
+
+def _replace(message: Any, key: str, value: Any) -> Any:
+    """Copy of the payload or dict message with the value of key replaced"""
+    if isinstance(message, dict):
+        return {**message, key: value}
+    return dataclasses.replace(message, **{key: value})
@@ -1,9 +1,12 @@
 import enum
-import uuid
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
+# wall clock minus monotonic clock, to convert the timestamps only when read
+_WALL_CLOCK_OFFSET_NS = time.time_ns() - time.monotonic_ns()
+
 
 class EventType(enum.Enum):
     G_DICE_ROLL = "g_dice_roll"
@@ -44,15 +47,25 @@ class EventType(enum.Enum):
     V_ADD_HOUSE = "v_add_house"
     V_SELL_HOUSE = "v_sell_house"
 
+    # members are singletons, hash them in C instead of by name in Python, for the
+    # dispatch tables and metrics looked up on every event
+    __hash__ = object.__hash__
+
 
 @dataclass(slots=True)
 class Event:
     """Base class for all events"""
 
     event_type: EventType
-    message: dict[str, Any]
-    id: str = field(default_factory=lambda: uuid.uuid4().hex)
-    timestamp: datetime = field(default_factory=datetime.utcnow)
+    message: Any  # payload.Payload of the event type, or a dict
+    seq: int = -1  # increasing number given by the topic the event is published to
+    timestamp_ns: int = field(default_factory=time.monotonic_ns)
+
+    @property
+    def timestamp(self) -> datetime:
+        """Wall-clock time of the creation in UTC"""
+        seconds = (self.timestamp_ns + _WALL_CLOCK_OFFSET_NS) / 1e9
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
 
 
 # @dataclass(slots=True)
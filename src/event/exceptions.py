@@ -0,0 +1,9 @@
+class EventError(Exception):
+    pass
+
+
+class TopicClosedError(EventError):
+    """The topic no longer accepts events"""
+
+    def __init__(self, name: str):
+        super().__init__(f"Topic {name} is closed")
@@ -0,0 +1,181 @@
+"""
+Latency histograms and the OpenMetrics text of the event bus.
+
+Every topic measures, per EventType:
+- publish to dispatch: from the timestamp of the event, taken when it is created
+  just before publishing, to the broadcast handing it to the subscribers.
+- dispatch to handler complete, per subscriber: from the broadcast to the end of
+  listen, including the time the event waited in the queue of the subscriber.
+
+Topic.snapshot returns the histograms with the counters and queue gauges of the
+subscribers, and openmetrics turns snapshots into the OpenMetrics text format, to
+be printed, written to a file or served by any HTTP handler.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from event.event import EventType
+
+if TYPE_CHECKING:
+    from event.subscription import SubscriptionStats
+
+# bucket i of a histogram counts the latencies below 2 ** (_MIN_EXPONENT + i) ns,
+# from about 1 us to 8.6 s, the bucket index is then a shift and a bit_length
+_MIN_EXPONENT = 10
+_N_BOUNDS = 24
+LATENCY_BUCKETS = tuple(2 ** (_MIN_EXPONENT + i) / 1e9 for i in range(_N_BOUNDS))
+
+
+@dataclass(kw_only=True, slots=True)
+class HistogramSnapshot:
+    bounds: tuple[float, ...]  # upper bounds in seconds, +Inf not included
+    counts: tuple[int, ...]  # per bucket, the last one above the last bound
+    count: int
+    sum: float  # seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q quantile, inf above the bounds"""
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            if total >= rank and total > 0:
+                return bound
+        return float("inf")
+
+
+class Histogram:
+    """Counts of latencies in nanoseconds by power of two bucket"""
+
+    __slots__ = ("_counts", "sum_ns")
+
+    def __init__(self) -> None:
+        self._counts = [0] * 64  # up to the bit length of any int64 latency
+        self.sum_ns = 0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    def observe(self, value_ns: int) -> None:
+        self._counts[(value_ns >> _MIN_EXPONENT).bit_length()] += 1
+        self.sum_ns += value_ns
+
+    def snapshot(self) -> HistogramSnapshot:
+        counts = self._counts[:]
+        return HistogramSnapshot(
+            bounds=LATENCY_BUCKETS,
+            counts=(*counts[:_N_BOUNDS], sum(counts[_N_BOUNDS:])),
+            count=sum(counts),
+            sum=self.sum_ns / 1e9,
+        )
+
+
+def snapshot_all(
+    histograms: dict[EventType, Histogram],
+) -> dict[EventType, HistogramSnapshot]:
+    return {
+        event_type: histogram.snapshot()
+        for event_type, histogram in list(histograms.items())
+    }
+
+
+@dataclass(kw_only=True, slots=True)
+class TopicSnapshot:
+    name: str
+    published: int
+    dispatch_latency: dict[EventType, HistogramSnapshot]  # publish to dispatch
+    subscribers: list["SubscriptionStats"]
+
+
+def openmetrics(snapshots: Iterable[TopicSnapshot]) -> str:
+    """OpenMetrics text of the snapshots of the topics"""
+    families: list[tuple[str, str, str, list[str]]] = [
+        ("event_published", "counter", "Events published to the topic", []),
+        ("event_dispatch_latency_seconds", "histogram", "Publish to dispatch", []),
+        ("event_handle_latency_seconds", "histogram", "Dispatch to handled", []),
+        ("event_delivered", "counter", "Events handled by the subscriber", []),
+        ("event_dropped", "counter", "Events dropped from a full queue", []),
+        ("event_coalesced", "counter", "Events merged into a pending one", []),
+        ("event_subscriber_errors", "counter", "Exceptions raised by listen", []),
+        ("event_queue_depth", "gauge", "Events waiting for the subscriber", []),
+        ("event_queue_lag_seconds", "gauge", "Age of the oldest pending event", []),
+    ]
+    samples = {name: lines for name, _type, _help, lines in families}
+    for snapshot in snapshots:
+        topic = {"topic": snapshot.name}
+        samples["event_published"].append(
+            _sample("event_published_total", topic, snapshot.published)
+        )
+        for event_type, histogram in snapshot.dispatch_latency.items():
+            samples["event_dispatch_latency_seconds"].extend(
+                _histogram(
+                    "event_dispatch_latency_seconds",
+                    {**topic, "event_type": event_type.value},
+                    histogram,
+                )
+            )
+        for stats in snapshot.subscribers:
+            labels = {**topic, "subscriber": stats.name}
+            for event_type, histogram in stats.handle_latency.items():
+                samples["event_handle_latency_seconds"].extend(
+                    _histogram(
+                        "event_handle_latency_seconds",
+                        {**labels, "event_type": event_type.value},
+                        histogram,
+                    )
+                )
+            for name, value in (
+                ("event_delivered", stats.delivered),
+                ("event_dropped", stats.dropped),
+                ("event_coalesced", stats.coalesced),
+                ("event_subscriber_errors", stats.errors),
+            ):
+                samples[name].append(_sample(f"{name}_total", labels, value))
+            samples["event_queue_depth"].append(
+                _sample("event_queue_depth", labels, stats.depth)
+            )
+            samples["event_queue_lag_seconds"].append(
+                _sample("event_queue_lag_seconds", labels, stats.lag_seconds)
+            )
+
+    lines: list[str] = []
+    for name, metric_type, help_text, family_samples in families:
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.extend(family_samples)
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _histogram(
+    name: str, labels: dict[str, str], histogram: HistogramSnapshot
+) -> list[str]:
+    lines: list[str] = []
+    total = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        total += count
+        lines.append(_sample(f"{name}_bucket", {**labels, "le": _format(bound)}, total))
+    lines.append(_sample(f"{name}_bucket", {**labels, "le": "+Inf"}, histogram.count))
+    lines.append(_sample(f"{name}_count", labels, histogram.count))
+    lines.append(_sample(f"{name}_sum", labels, histogram.sum))
+    return lines
+
+
+def _sample(name: str, labels: dict[str, str], value: float) -> str:
+    label_text = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+    return f"{name}{{{label_text}}} {_format(value)}"
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
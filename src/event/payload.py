@@ -0,0 +1,181 @@
+"""
+Typed messages of the events.
+
+Every payload is a slotted dataclass, which is cheaper to build and to read than
+a dict and documents the fields of its EventType. msg["field"] still works, so
+subscribers written against dict messages keep working.
+"""
+
+import dataclasses
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from event.event import EventType
+
+
+class Payload:
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            field.name: getattr(self, field.name)
+            for field in dataclasses.fields(self)  # type: ignore[arg-type]
+        }
+
+
+@dataclass(kw_only=True, slots=True)
+class Empty(Payload):
+    pass
+
+
+@dataclass(kw_only=True, slots=True)
+class PlayerPayload(Payload):
+    player_id: int
+
+
+@dataclass(kw_only=True, slots=True)
+class AddPlayers(Payload):
+    user_to_player: dict[str, int]
+
+
+@dataclass(kw_only=True, slots=True)
+class Move(Payload):
+    player_id: int
+    old_position: int
+    new_position: int
+
+
+@dataclass(kw_only=True, slots=True)
+class CashChange(Payload):
+    player_id: int
+    old_cash: int
+    new_cash: int
+
+
+@dataclass(kw_only=True, slots=True)
+class DiceRoll(Payload):
+    dices: tuple[int, ...]
+
+
+@dataclass(kw_only=True, slots=True)
+class PropertyPayload(Payload):
+    player_id: int
+    property_id: int
+
+
+@dataclass(kw_only=True, slots=True)
+class StartAuction(Payload):
+    property_id: int
+
+
+@dataclass(kw_only=True, slots=True)
+class CurrentAuction(Payload):
+    player_id: int  # current bidder
+    bidders: list[int]
+    property_id: int
+    price: int
+
+
+@dataclass(kw_only=True, slots=True)
+class EndAuction(Payload):
+    player_id: int  # winner
+    property_id: int
+    price: int
+
+
+@dataclass(kw_only=True, slots=True)
+class AskForRent(Payload):
+    payer_id: int
+    payee_id: int
+    rent: int
+    property_id: int
+
+
+@dataclass(kw_only=True, slots=True)
+class DrawChanceCard(Payload):
+    player_id: int
+    description: str
+    ownable: bool
+
+
+@dataclass(kw_only=True, slots=True)
+class ChargeTax(Payload):
+    player_id: int
+    tax_amount: int
+    tax_type: str
+
+
+@dataclass(kw_only=True, slots=True)
+class CollectJailCard(Payload):
+    player_id: int
+    current_card_amount: int
+
+
+@dataclass(kw_only=True, slots=True)
+class PropertyStatus(Payload):
+    player_id: int
+    property_status: list[dict[str, Any]]
+
+
+@dataclass(kw_only=True, slots=True)
+class AddUsers(Payload):
+    user_ids: list[str]
+
+
+@dataclass(kw_only=True, slots=True)
+class AssignToken(Payload):
+    user_id: str
+    token: int
+
+
+@dataclass(kw_only=True, slots=True)
+class UserCommand(Payload):
+    user_id: str
+    property_id: Optional[int] = None
+
+
+_USER_COMMANDS = (
+    EventType.V_ROLL_AND_MOVE,
+    EventType.V_END_TURN,
+    EventType.V_BUY_PROPERTY,
+    EventType.V_AUCTION_PROPERTY,
+    EventType.V_BID_1,
+    EventType.V_BID_10,
+    EventType.V_BID_50,
+    EventType.V_BID_100,
+    EventType.V_BID_PASS,
+    EventType.V_PAY,
+    EventType.V_PROPERTY_STATUS,
+    EventType.V_MORTGAGE,
+    EventType.V_UNMORTGAGE,
+    EventType.V_ADD_HOUSE,
+    EventType.V_SELL_HOUSE,
+)
+
+PAYLOAD_TYPES: dict[EventType, type[Payload]] = {
+    EventType.G_DICE_ROLL: DiceRoll,
+    EventType.G_MOVE: Move,
+    EventType.G_CASH_CHANGE: CashChange,
+    EventType.G_ADD_PLAYER: AddPlayers,
+    EventType.G_ALL_STATES: Empty,
+    EventType.G_CURRENT_PLAYER: PlayerPayload,
+    EventType.G_WAIT_FOR_ROLL: PlayerPayload,
+    EventType.G_WAIT_FOR_END_TURN: PlayerPayload,
+    EventType.G_ASK_TO_BUY: PropertyPayload,
+    EventType.G_BUY_PROPERTY: PropertyPayload,
+    EventType.G_START_AUCTION: StartAuction,
+    EventType.G_CURRENT_AUCTION: CurrentAuction,
+    EventType.G_END_AUCTION: EndAuction,
+    EventType.G_ASK_FOR_RENT: AskForRent,
+    EventType.G_DRAW_CHANCE_CARD: DrawChanceCard,
+    EventType.G_CHARGE_TAX: ChargeTax,
+    EventType.G_COLLECT_JAIL_CARD: CollectJailCard,
+    EventType.G_PROPERTY_STATUS: PropertyStatus,
+    EventType.V_ADD_PLAYER: AddUsers,
+    EventType.V_ASSIGN_TOKEN: AssignToken,
+    EventType.V_START_GAME: Empty,
+    **{event_type: UserCommand for event_type in _USER_COMMANDS},
+}
@@ -0,0 +1,107 @@
+"""
+Event loops shared by the topics.
+
+An EventRuntime runs a fixed number of asyncio loops, each in its own daemon
+thread, and places every new topic on the least loaded loop. The thread count
+does not grow with the number of topics: a server with thousands of rooms needs
+as many threads as loops, not two per room.
+"""
+
+import asyncio
+import atexit
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from event.exceptions import EventError
+
+
+@dataclass(kw_only=True, slots=True)
+class EventRuntime:
+    """Fixed pool of event loops, started on the first topic"""
+
+    n_loops: int = 1
+    _loops: list[asyncio.AbstractEventLoop] = field(init=False, default_factory=list)
+    _threads: list[threading.Thread] = field(init=False, default_factory=list)
+    _topic_counts: list[int] = field(init=False, default_factory=list)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+    _closed: bool = field(init=False, default=False)
+
+    def __post_init__(self) -> None:
+        if self.n_loops < 1:
+            raise ValueError("Number of loops must be positive")
+
+    @property
+    def topic_count(self) -> int:
+        return sum(self._topic_counts)
+
+    def attach(self) -> asyncio.AbstractEventLoop:
+        """Return the loop with the fewest topics for a new topic"""
+        with self._lock:
+            if self._closed:
+                raise EventError("Event runtime is closed")
+            if not self._loops:
+                self._start()
+            idx = min(range(self.n_loops), key=self._topic_counts.__getitem__)
+            self._topic_counts[idx] += 1
+            return self._loops[idx]
+
+    def detach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Release the place of a topic that stopped broadcasting on the loop"""
+        with self._lock:
+            if not self._closed:
+                self._topic_counts[self._loops.index(loop)] -= 1
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Cancel the broadcasts of the remaining topics and stop the loops"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        for loop in self._loops:
+            asyncio.run_coroutine_threadsafe(_cancel_tasks(), loop).result(timeout)
+            loop.call_soon_threadsafe(loop.stop)
+        for thread in self._threads:
+            thread.join(timeout)
+        for loop in self._loops:
+            if not loop.is_running():
+                loop.close()
+
+    def _start(self) -> None:
+        for idx in range(self.n_loops):
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=_run_loop, args=(loop,), name=f"event-loop-{idx}", daemon=True
+            )
+            thread.start()
+            self._loops.append(loop)
+            self._threads.append(thread)
+            self._topic_counts.append(0)
+
+
+_default_runtime: Optional[EventRuntime] = None
+_default_lock = threading.Lock()
+
+
+def default_runtime() -> EventRuntime:
+    """Return the runtime of the topics created without one"""
+    global _default_runtime
+    with _default_lock:
+        if _default_runtime is None:
+            _default_runtime = EventRuntime()
+            # stop the topics that were not closed before the interpreter exits
+            atexit.register(_default_runtime.close, timeout=1.0)
+        return _default_runtime
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+async def _cancel_tasks() -> None:
+    current = asyncio.current_task()
+    tasks = [task for task in asyncio.all_tasks() if task is not current]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,176 @@
+"""
+Events of many games dispatched on a fixed number of shards.
+
+Every game is placed on a shard by a stable hash of its id, and every shard hands
+its events to the subscribers of their game from a single task, in the order they
+were published. The events of one game are therefore handled one after the other
+in publish order, which the ControllerListener relies on since the transitions of
+the GameState depend on the order of the commands. The games of different shards
+are handled concurrently, and in parallel threads when the shards are spread over
+the loops of an EventRuntime with several loops.
+
+A shard is a queue and a task, not a thread: n_shards sets how many games can be
+handled at once, the loops of the runtime how many threads run them. More shards
+than loops keeps a game awaiting I/O from holding back the games of other shards.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from typing import Optional
+
+from event.event import Event
+from event.exceptions import EventError
+from event.runtime import EventRuntime, default_runtime
+from event.subscription import AnySubscriber, sync_listen
+
+DEFAULT_SHARDS = 8
+
+# the subscriber of a game, and its listen if it is synchronous
+_Listener = tuple[AnySubscriber, Optional[Callable[[Event], None]]]
+
+
+class _Shard:
+    __slots__ = ("idx", "loop", "queue", "task", "dispatched")
+
+    def __init__(self, idx: int, loop: asyncio.AbstractEventLoop):
+        self.idx = idx
+        self.loop = loop
+        # game id and event, None closes
+        self.queue: asyncio.Queue[Optional[tuple[str, Event]]] = asyncio.Queue()
+        self.task: Optional[concurrent.futures.Future[None]] = None
+        self.dispatched = 0
+
+
+class ShardedDispatcher:
+    """Dispatches the events of every game in order, games of different shards
+    concurrently"""
+
+    def __init__(
+        self,
+        name: str,
+        n_shards: int = DEFAULT_SHARDS,
+        runtime: Optional[EventRuntime] = None,
+    ):
+        if n_shards < 1:
+            raise ValueError("Number of shards must be positive")
+        self.name = name
+        self.runtime = default_runtime() if runtime is None else runtime
+        self._games: dict[str, tuple[_Listener, ...]] = {}
+        self._seqs: dict[str, int] = {}  # seq of the last published event per game
+        self._lock = threading.Lock()
+        self._closed = False
+        self._shards = [_Shard(idx, self.runtime.attach()) for idx in range(n_shards)]
+        for shard in self._shards:
+            shard.task = asyncio.run_coroutine_threadsafe(self._run(shard), shard.loop)
+
+    @property
+    def n_shards(self) -> int:
+        return len(self._shards)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def shard_of(self, game_id: str) -> int:
+        """Index of the shard of the game, the same in every process"""
+        return zlib.crc32(game_id.encode()) % len(self._shards)
+
+    def register_game(self, game_id: str, subscriber: AnySubscriber) -> None:
+        """Listen to the events of the game published from now on"""
+        with self._lock:
+            if self._closed:
+                raise EventError(f"Dispatcher {self.name} is closed")
+            listener = (subscriber, sync_listen(subscriber))
+            self._games[game_id] = self._games.get(game_id, ()) + (listener,)
+            self._seqs.setdefault(game_id, 0)
+
+    def unregister_game(self, game_id: str) -> None:
+        """Forget the subscribers of the game, its pending events are skipped"""
+        with self._lock:
+            self._games.pop(game_id, None)
+            self._seqs.pop(game_id, None)
+
+    def publish(self, game_id: str, event: Event) -> None:
+        """Queue the event of the game on its shard, with the next seq of the game"""
+        with self._lock:
+            if self._closed:
+                raise EventError(f"Dispatcher {self.name} is closed")
+            if game_id not in self._seqs:
+                raise EventError(f"Game {game_id} is not registered")
+            self._seqs[game_id] += 1
+            event.seq = self._seqs[game_id]
+            shard = self._shards[self.shard_of(game_id)]
+            shard.loop.call_soon_threadsafe(shard.queue.put_nowait, (game_id, event))
+
+    def depths(self) -> list[int]:
+        """Events waiting in every shard"""
+        return [shard.queue.qsize() for shard in self._shards]
+
+    def dispatched(self) -> list[int]:
+        """Events handed to the subscribers by every shard"""
+        return [shard.dispatched for shard in self._shards]
+
+    def close(self) -> None:
+        """Stop accepting events. Does not wait, see drain"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            for shard in self._shards:
+                shard.loop.call_soon_threadsafe(shard.queue.put_nowait, None)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the events published so far are handled, and the shards have
+        stopped if the dispatcher is closed. Return False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for shard in self._shards:
+            assert shard.task is not None
+            if self._closed or shard.task.done():
+                waiter = shard.task
+            else:
+                waiter = asyncio.run_coroutine_threadsafe(
+                    shard.queue.join(), shard.loop
+                )
+            remaining = (
+                None if deadline is None else max(deadline - time.monotonic(), 0)
+            )
+            try:
+                waiter.result(remaining)
+            except concurrent.futures.TimeoutError:
+                return False
+            except concurrent.futures.CancelledError:  # the runtime was closed
+                pass
+        return True
+
+    async def _run(self, shard: _Shard) -> None:
+        try:
+            await self._dispatch_events(shard)
+        finally:
+            self.runtime.detach(shard.loop)
+
+    async def _dispatch_events(self, shard: _Shard) -> None:
+        queue = shard.queue
+        games = self._games
+        while True:
+            item = await queue.get()
+            try:
+                if item is None:
+                    break
+                game_id, event = item
+                for subscriber, listen in games.get(game_id, ()):
+                    try:
+                        if listen is not None:
+                            listen(event)
+                        else:
+                            await subscriber.listen(event)  # type: ignore[misc]
+                    except Exception as error:
+                        print(
+                            f"Dispatcher {self.name} - Error in game {game_id}: {error}"
+                        )
+                shard.dispatched += 1
+            finally:
+                queue.task_done()
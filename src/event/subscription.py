@@ -0,0 +1,275 @@
+"""
+Bounded queue between a topic and one of its subscribers.
+
+Every subscriber of a topic listens from its own queue in its own task, so a slow
+subscriber, e.g. the pygame view or a spectator, falls behind on its own instead
+of holding the events back from the other subscribers. The policy decides what
+happens when the queue is full:
+- BLOCK: the topic waits for space. Nothing is lost, but the subscriber can
+  throttle the topic once its queue is full.
+- DROP_OLDEST: the oldest pending event is dropped.
+- COALESCE: an event with the key of a pending event replaces it at the end of the
+  queue, cash changes and moves keep the old value of the replaced event. Events
+  without a key are queued, and the oldest pending event is dropped when full.
+
+A subscription can be limited to some event types, e.g. a HandlerTable of one
+handler per EventType. The topic then routes the other event types past it.
+
+A synchronous subscriber, whose listen is a plain function, is called straight
+from the broadcast without a queue, task or coroutine. It cannot await, so it
+would block the loop from its own task just the same; listeners that do I/O stay
+async.
+"""
+
+import asyncio
+import enum
+import inspect
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable, Mapping
+from dataclasses import dataclass
+from typing import Optional, Protocol, Union
+
+from event.event import Event, EventType
+from event.metrics import Histogram, HistogramSnapshot, snapshot_all
+
+DEFAULT_QUEUE_SIZE = 1024
+
+
+class Subscriber(Protocol):
+    async def listen(self, event: Event) -> None:
+        raise NotImplementedError
+
+
+class SyncSubscriber(Protocol):
+    def listen(self, event: Event) -> None:
+        raise NotImplementedError
+
+
+AnySubscriber = Union[Subscriber, SyncSubscriber]
+Handler = Callable[[Event], Optional[Awaitable[None]]]  # sync or async
+
+
+class HandlerTable:
+    """Subscriber calling the handler of the event type. Synchronous if all the
+    handlers are"""
+
+    def __init__(self, handlers: Mapping[EventType, Handler]):
+        self.handlers = dict(handlers)
+        self.synchronous = not any(map(_is_async, self.handlers.values()))
+
+    def dispatch(self, event: Event) -> None:
+        self.handlers[event.event_type](event)
+
+    async def listen(self, event: Event) -> None:
+        result = self.handlers[event.event_type](event)
+        if result is not None:
+            await result
+
+
+def _is_async(function: Callable[..., object]) -> bool:
+    return inspect.iscoroutinefunction(function)
+
+
+def sync_listen(subscriber: AnySubscriber) -> Optional[Callable[[Event], None]]:
+    """Return the function to call the subscriber directly, None if it is async"""
+    if isinstance(subscriber, HandlerTable):
+        return subscriber.dispatch if subscriber.synchronous else None
+    return None if _is_async(subscriber.listen) else subscriber.listen
+
+
+class QueuePolicy(enum.Enum):
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    COALESCE = "coalesce"
+
+
+@dataclass(kw_only=True, slots=True)
+class SubscriptionStats:
+    name: str
+    policy: QueuePolicy
+    maxsize: int
+    depth: int  # events waiting in the queue
+    high_water: int  # largest depth so far
+    delivered: int
+    dropped: int
+    coalesced: int  # events that replaced a pending event
+    lag: int  # seq of the last queued event minus seq of the last delivered one
+    lag_seconds: float  # age of the oldest event not delivered yet
+    errors: int  # exceptions raised by listen
+    handle_latency: dict[EventType, HistogramSnapshot]  # dispatch to handled
+
+
+class _Slot:
+    __slots__ = ("event", "dispatched_ns")
+
+    def __init__(self, event: Event, dispatched_ns: int):
+        self.event = event
+        self.dispatched_ns = dispatched_ns
+
+
+class Subscription:
+    def __init__(
+        self,
+        subscriber: AnySubscriber,
+        *,
+        topic_name: str,
+        name: str,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: QueuePolicy = QueuePolicy.BLOCK,
+        key: Optional[Callable[[Event], Optional[Hashable]]] = None,
+        event_types: Optional[Iterable[EventType]] = None,
+    ):
+        if maxsize < 1:
+            raise ValueError("Queue size must be positive")
+        merge: Optional[Callable[[Event, Event], Event]] = None
+        if policy is QueuePolicy.COALESCE:
+            from event import coalesce
+
+            key = coalesce.coalesce_key if key is None else key
+            merge = coalesce.merge
+        self.subscriber = subscriber
+        self.topic_name = topic_name
+        self.name = name
+        self.maxsize = maxsize
+        self.policy = policy
+        # the event types routed to the subscriber, None for all of them
+        self.event_types = None if event_types is None else frozenset(event_types)
+        self._key = key
+        self._merge = merge
+        self._sync_listen = sync_listen(subscriber)
+        # slots of the pending events in queue order, by their coalesce key or a
+        # key of their own. A coalesced event takes the slot of its key out
+        self._slots: OrderedDict[Hashable, _Slot] = OrderedDict()
+        self._current: Optional[Event] = None  # event being listened to
+        self._ready = asyncio.Event()  # set when an event is queued or on close
+        self._space = asyncio.Event()  # set when an event leaves a full queue
+        self._idle = asyncio.Event()  # set when nothing is queued or listened to
+        self._idle.set()
+        self._closing = False
+        self._task: Optional[asyncio.Task[None]] = None
+        self.high_water = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.handle_latency: dict[EventType, Histogram] = {}
+        self._queued_seq = 0
+        self._delivered_seq = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._slots)
+
+    @property
+    def delivered(self) -> int:
+        return sum(histogram.count for histogram in self.handle_latency.values())
+
+    @property
+    def synchronous(self) -> bool:
+        return self._sync_listen is not None
+
+    def wants(self, event_type: EventType) -> bool:
+        return self.event_types is None or event_type in self.event_types
+
+    def start(self) -> None:
+        """Start listening, on the loop of the topic"""
+        if self._sync_listen is not None:
+            return  # called from put
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def put(self, event: Event, dispatched_ns: int) -> None:
+        """Queue the event following the policy, on the loop of the topic. A
+        synchronous subscriber listens to it straight away"""
+        if self._sync_listen is not None:
+            try:
+                self._sync_listen(event)
+            except Exception as error:
+                self._report(error)
+            self._observe(event.event_type, time.monotonic_ns() - dispatched_ns)
+            return
+        key = None if self._key is None else self._key(event)
+        if key is not None and key in self._slots:
+            earlier = self._slots.pop(key).event
+            assert self._merge is not None
+            event = self._merge(earlier, event)
+            self.coalesced += 1
+        while len(self._slots) >= self.maxsize:
+            if self.policy is QueuePolicy.BLOCK:
+                self._space.clear()
+                await self._space.wait()
+            else:
+                self._pop()
+                self.dropped += 1
+        self._slots[object() if key is None else key] = _Slot(event, dispatched_ns)
+        self.high_water = max(self.high_water, len(self._slots))
+        self._queued_seq = event.seq
+        self._idle.clear()
+        self._ready.set()
+
+    async def close(self) -> None:
+        """Deliver the pending events and stop listening"""
+        self._closing = True
+        self._ready.set()
+        if self._task is not None:
+            await self._task
+
+    async def join(self) -> None:
+        """Wait until the events queued so far are delivered"""
+        await self._idle.wait()
+
+    def stats(self) -> SubscriptionStats:
+        oldest = self._current
+        if oldest is None and self._slots:
+            oldest = next(iter(self._slots.values())).event
+        lag_ns = 0 if oldest is None else time.monotonic_ns() - oldest.timestamp_ns
+        return SubscriptionStats(
+            name=self.name,
+            policy=self.policy,
+            maxsize=self.maxsize,
+            depth=len(self._slots),
+            high_water=self.high_water,
+            delivered=self.delivered,
+            dropped=self.dropped,
+            coalesced=self.coalesced,
+            lag=self._queued_seq - self._delivered_seq,
+            lag_seconds=lag_ns / 1e9,
+            errors=self.errors,
+            handle_latency=snapshot_all(self.handle_latency),
+        )
+
+    def _pop(self) -> _Slot:
+        _, slot = self._slots.popitem(last=False)
+        self._space.set()
+        return slot
+
+    async def _run(self) -> None:
+        while True:
+            while not self._slots:
+                if self._closing:
+                    return
+                self._ready.clear()
+                await self._ready.wait()
+            slot = self._pop()
+            event = self._current = slot.event
+            try:
+                await self.subscriber.listen(event)  # type: ignore[misc]
+            except Exception as error:
+                self._report(error)
+            finally:
+                self._current = None
+                self._delivered_seq = event.seq
+                latency = time.monotonic_ns() - slot.dispatched_ns
+                self._observe(event.event_type, latency)
+                if not self._slots:
+                    self._idle.set()
+
+    def _observe(self, event_type: EventType, latency_ns: int) -> None:
+        try:
+            self.handle_latency[event_type].observe(latency_ns)
+        except KeyError:
+            histogram = self.handle_latency[event_type] = Histogram()
+            histogram.observe(latency_ns)
+
+    def _report(self, error: Exception) -> None:
+        self.errors += 1
+        print(f"Topic {self.topic_name} - Error in subscriber {self.name}: {error}")
@@ -1,66 +1,221 @@
 import asyncio
+import concurrent.futures
+import contextlib
 import threading
 import time
 from abc import ABC, abstractmethod
-from collections import deque
+from collections.abc import Callable, Hashable, Iterable, Iterator, Mapping
 from dataclasses import dataclass, field
-from typing import Protocol
+from typing import Optional
 
-from event import Event
-
-
-class Subscriber(Protocol):
-    async def listen(self, event: Event) -> None:
-        raise NotImplementedError
+from event.event import Event, EventType
+from event.exceptions import EventError, TopicClosedError
+from event.metrics import Histogram, TopicSnapshot, snapshot_all
+from event.runtime import EventRuntime, default_runtime
+from event.subscription import (
+    DEFAULT_QUEUE_SIZE,
+    AnySubscriber,
+    Handler,
+    HandlerTable,
+    QueuePolicy,
+    Subscriber,
+    Subscription,
+    SubscriptionStats,
+)
 
 
 @dataclass(kw_only=True, slots=True)
 class Topic:
+    """Broadcasts the published events in order to every subscriber.
+
+    The topic broadcasts on one of the loops of its EventRuntime, the default
+    runtime if none is given. publish is thread-safe and hands the event to an
+    asyncio.Queue of the loop, so the broadcast wakes up as soon as an event
+    arrives and sleeps otherwise. Every published event gets the next seq of the
+    topic. Each subscriber listens from its own bounded queue, see Subscription,
+    so a slow subscriber does not hold back the others. A subscriber limited to
+    some event types is only handed those: the broadcast looks the subscriptions
+    of the event type up in a dispatch table, and skips the event types without
+    any. Synchronous subscribers are called straight from the broadcast. close
+    stops accepting events; the pending ones are still delivered before the
+    broadcast ends and the loop is released."""
+
     name: str
-    subscribers: list[Subscriber] = field(default_factory=list)
-    events: deque[Event] = field(default_factory=deque)
+    subscriptions: list[Subscription] = field(default_factory=list)
+    runtime: EventRuntime = field(default_factory=default_runtime)
+    _loop: asyncio.AbstractEventLoop = field(init=False)
+    _routes: dict[EventType, tuple[Subscription, ...]] = field(init=False)
+    _unfiltered: tuple[Subscription, ...] = field(init=False)  # of the other types
+    _queue: asyncio.Queue[Optional[Event]] = field(init=False)  # None closes
+    _broadcast: concurrent.futures.Future[None] = field(init=False)
+    _lock: threading.Lock = field(init=False)
+    _closed: bool = field(init=False)
+    _seq: int = field(init=False)  # seq of the last published event
+    _dispatch_latency: dict[EventType, Histogram] = field(init=False)
 
-    def __init__(self, name: str):
+    def __init__(self, name: str, runtime: Optional[EventRuntime] = None):
         self.name = name
-        self.subscribers = []
-        self.events = deque()
-        loop_thread = threading.Thread(target=self._broadcast_loop, daemon=True)
-        loop_thread.start()
+        self.subscriptions = []
+        self._routes = {}
+        self._unfiltered = ()
+        self.runtime = default_runtime() if runtime is None else runtime
+        self._loop = self.runtime.attach()
+        self._queue = asyncio.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._seq = 0
+        self._dispatch_latency = {}
+        self._broadcast = asyncio.run_coroutine_threadsafe(
+            self._broadcast_event(), self._loop
+        )
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def subscribers(self) -> list[AnySubscriber]:
+        return [subscription.subscriber for subscription in self.subscriptions]
+
+    def register_subscriber(
+        self,
+        subscriber: AnySubscriber,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: QueuePolicy = QueuePolicy.BLOCK,
+        key: Optional[Callable[[Event], Optional[Hashable]]] = None,
+        name: Optional[str] = None,
+        event_types: Optional[Iterable[EventType]] = None,
+    ) -> Subscription:
+        """Listen to the events published from now on, of the event types if given.
+        The COALESCE policy merges the cash changes and moves of a player unless
+        another key is given"""
+        with self._lock:
+            if self._closed:
+                raise TopicClosedError(self.name)
+            subscription = Subscription(
+                subscriber,
+                topic_name=self.name,
+                name=str(len(self.subscriptions)) if name is None else name,
+                maxsize=maxsize,
+                policy=policy,
+                key=key,
+                event_types=event_types,
+            )
+            self.subscriptions.append(subscription)
+            self._add_route(subscription)
+            self._loop.call_soon_threadsafe(subscription.start)
+        return subscription
+
+    def _add_route(self, subscription: Subscription) -> None:
+        if subscription.event_types is None:
+            self._unfiltered += (subscription,)
+            for event_type, routed in self._routes.items():
+                self._routes[event_type] = routed + (subscription,)
+            return
+        for event_type in subscription.event_types:
+            routed = self._routes.get(event_type, self._unfiltered)
+            self._routes[event_type] = routed + (subscription,)
 
-    def register_subscriber(self, subscriber: Subscriber) -> None:
-        self.subscribers.append(subscriber)
+    def register_handlers(
+        self,
+        handlers: Mapping[EventType, Handler],
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        policy: QueuePolicy = QueuePolicy.BLOCK,
+        key: Optional[Callable[[Event], Optional[Hashable]]] = None,
+        name: Optional[str] = None,
+    ) -> Subscription:
+        """Listen to the event types of the handlers, each with its own handler"""
+        return self.register_subscriber(
+            HandlerTable(handlers),
+            maxsize=maxsize,
+            policy=policy,
+            key=key,
+            name=name,
+            event_types=handlers.keys(),
+        )
+
+    def stats(self) -> list[SubscriptionStats]:
+        """Queue depth and lag of every subscriber"""
+        return [subscription.stats() for subscription in self.subscriptions]
+
+    def snapshot(self) -> TopicSnapshot:
+        """Counters and latency histograms of the topic and its subscribers, see
+        metrics.openmetrics"""
+        return TopicSnapshot(
+            name=self.name,
+            published=self._seq,
+            dispatch_latency=snapshot_all(self._dispatch_latency),
+            subscribers=self.stats(),
+        )
 
     def publish(self, event: Event) -> None:
-        self.events.append(event)
+        with self._lock:  # no event may follow the closing None
+            if self._closed:
+                raise TopicClosedError(self.name)
+            self._seq += 1
+            event.seq = self._seq
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
 
-    def _broadcast_loop(self) -> None:
-        loop = asyncio.new_event_loop()
-        loop.create_task(self._broadcast_event())
-        loop.run_forever()
+    def close(self) -> None:
+        """Stop accepting events. Does not wait, see drain"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, None)
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the events published so far are delivered, and the broadcast
+        has ended if the topic is closed. Return False on timeout"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            raise EventError(f"Topic {self.name} cannot be drained from its own loop")
+        if self._closed or self._broadcast.done():
+            waiter = self._broadcast
+        else:
+            waiter = asyncio.run_coroutine_threadsafe(self._join(), self._loop)
+        try:
+            waiter.result(timeout)
+        except concurrent.futures.TimeoutError:
+            return False
+        except concurrent.futures.CancelledError:  # the runtime was closed
+            pass
+        return True
 
     async def _broadcast_event(self) -> None:
+        try:
+            await self._deliver_events()
+        finally:  # before drain returns, also when cancelled by the runtime
+            with self._lock:
+                self._closed = True
+            self.runtime.detach(self._loop)
+
+    async def _deliver_events(self) -> None:
         while True:
-            # print("loop")
-            if len(self.events) > 0:
-                print(f"Topic {self.name} - remaining events:", len(self.events))
-                event = self.events.popleft()
-                task_list = [
-                    subscriber.listen(event) for subscriber in self.subscribers
-                ]
-                results = await asyncio.gather(*task_list, return_exceptions=True)
-                for idx, res in enumerate(results):
-                    if isinstance(res, Exception):
-                        print(f"Topic {self.name} - Error in subscriber {idx}: {res}")
-            time.sleep(0.1)
-
-        # asyncio.set_event_loop(loop)
-
-    async def test(self, event: Event):
-        print("test1", event.id)
-        await asyncio.sleep(5)
-        if event.message["dice_1"] == 3:
-            raise Exception("dllm")
-        print("test2", event.id)
+            event = await self._queue.get()
+            try:
+                if event is None:
+                    break
+                dispatched_ns = time.monotonic_ns()
+                histogram = self._dispatch_latency.get(event.event_type)
+                if histogram is None:
+                    histogram = self._dispatch_latency[event.event_type] = Histogram()
+                histogram.observe(dispatched_ns - event.timestamp_ns)
+                routed = self._routes.get(event.event_type, self._unfiltered)
+                for subscription in routed:
+                    await subscription.put(event, dispatched_ns)
+            finally:
+                self._queue.task_done()
+        for subscription in self.subscriptions:
+            await subscription.close()
+
+    async def _join(self) -> None:
+        await self._queue.join()
+        for subscription in self.subscriptions:
+            await subscription.join()
 
 
 class Publisher(ABC):
@@ -70,8 +225,13 @@ class Publisher(ABC):
         self.topic = topic
 
     @abstractmethod
-    def publish(self, event: Event) -> None:
-        ...
+    def publish(self, event: Event) -> None: ...
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group the events published inside, e.g. the events of one command.
+        Publishers that do not hold events publish them straight away."""
+        yield
 
 
 class LocalPublisher(Publisher):
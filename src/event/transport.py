@@ -0,0 +1,309 @@
+"""
+Events between processes over Unix domain sockets.
+
+SocketPublisher sends events to the socket of a SocketReceiver, which publishes
+them into its local Topic, so the subscribers of that topic work unchanged. A
+SocketPublisher is also a synchronous subscriber: registered on a topic of the
+backend, it forwards the events of the topic to a frontend process.
+
+Every event is one frame: a header of the body length, the kind of message, the
+index of the EventType and the monotonic timestamp, then the message in marshal
+format. A payload is sent as the tuple of its field values, in the order of the
+fields of its payload type. The sockets are local to the host, so the monotonic
+timestamps of both processes come from the same clock.
+
+Writes are batched: inside Publisher.batch, e.g. one command of the game model,
+the frames are written at once when the batch ends, and the events a topic hands
+to the publisher in one iteration of its loop are written together afterwards.
+The writes themselves are made by a thread of the publisher, so neither the
+thread publishing nor the loop of a topic waits for a slow receiver, which may
+run on the same loop. The batches waiting for the writer are bounded by
+max_pending_bytes, past which the policy of the publisher applies: BLOCK waits
+for the receiver to catch up, and DROP_OLDEST drops the oldest batches, counted
+in SocketPublisher.dropped. A receiver on the loop publishing into the socket
+cannot catch up while the loop waits, so it needs DROP_OLDEST or a bound above
+the largest burst of the topic.
+"""
+
+import asyncio
+import concurrent.futures
+import contextlib
+import marshal
+import os
+import socket
+import struct
+import threading
+from collections import deque
+from collections.abc import Iterator
+from dataclasses import fields
+from typing import Any, Optional
+
+from event import payload
+from event.event import Event, EventType
+from event.exceptions import EventError, TopicClosedError
+from event.runtime import EventRuntime, default_runtime
+from event.subscription import QueuePolicy
+from event.topic import Publisher, Topic
+
+# body length, message kind, event type index, timestamp_ns
+_HEADER = struct.Struct("<IBBQ")
+_KIND_PAYLOAD = 0  # tuple of the fields of the payload type of the event type
+_KIND_OTHER = 1  # dict or any other marshal value
+
+_EVENT_TYPES = list(EventType)
+_TYPE_INDEX = {event_type: idx for idx, event_type in enumerate(_EVENT_TYPES)}
+_PAYLOAD_FIELDS = {
+    payload_type: tuple(field.name for field in fields(payload_type))
+    for payload_type in set(payload.PAYLOAD_TYPES.values())
+}
+
+DEFAULT_BATCH_BYTES = 64 * 1024
+DEFAULT_MAX_PENDING_BYTES = 16 * 1024 * 1024
+_READ_SIZE = 256 * 1024
+
+
+def encode_event(event: Event) -> bytes:
+    """Frame of the event"""
+    message = event.message
+    payload_type = payload.PAYLOAD_TYPES[event.event_type]
+    if type(message) is payload_type:
+        kind = _KIND_PAYLOAD
+        value: Any = tuple(
+            getattr(message, name) for name in _PAYLOAD_FIELDS[payload_type]
+        )
+    else:
+        kind = _KIND_OTHER
+        value = message.to_dict() if isinstance(message, payload.Payload) else message
+    try:
+        body = marshal.dumps(value)
+    except ValueError as error:
+        raise ValueError(f"Cannot encode the message of {event.event_type}") from error
+    header = _HEADER.pack(
+        len(body), kind, _TYPE_INDEX[event.event_type], event.timestamp_ns
+    )
+    return header + body
+
+
+def decode_events(buffer: bytearray) -> list[Event]:
+    """Decode and remove the complete frames at the start of the buffer"""
+    events: list[Event] = []
+    offset = 0
+    while len(buffer) - offset >= _HEADER.size:
+        length, kind, type_index, timestamp_ns = _HEADER.unpack_from(buffer, offset)
+        end = offset + _HEADER.size + length
+        if end > len(buffer):
+            break
+        value = marshal.loads(memoryview(buffer)[offset + _HEADER.size : end])
+        event_type = _EVENT_TYPES[type_index]
+        if kind == _KIND_PAYLOAD:
+            payload_type = payload.PAYLOAD_TYPES[event_type]
+            value = payload_type(**dict(zip(_PAYLOAD_FIELDS[payload_type], value)))
+        events.append(Event(event_type, value, timestamp_ns=timestamp_ns))
+        offset = end
+    del buffer[:offset]
+    return events
+
+
+class SocketPublisher(Publisher):
+    """Sends events to the SocketReceiver listening on path"""
+
+    def __init__(
+        self,
+        path: str,
+        batch_bytes: int = DEFAULT_BATCH_BYTES,
+        max_pending_bytes: int = DEFAULT_MAX_PENDING_BYTES,
+        policy: QueuePolicy = QueuePolicy.BLOCK,
+    ):
+        if policy is QueuePolicy.COALESCE:
+            raise ValueError("Socket publishers cannot coalesce events")
+        self.path = path
+        self.batch_bytes = batch_bytes  # written before the batch ends if reached
+        self.max_pending_bytes = max_pending_bytes  # waiting for the writer thread
+        self.policy = policy
+        self.sent_count = 0
+        self.dropped = 0  # events, with DROP_OLDEST
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+        self._buffer = bytearray()
+        self._buffered = 0  # events in the buffer
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._depth = 0
+        self._flush_scheduled = False
+        self._closed = False
+        self._error: Optional[OSError] = None
+        # batches of frames for the writer thread, with their number of events
+        self._writes: deque[tuple[bytes, int]] = deque()
+        self._pending_bytes = 0
+        self._blocked = 0  # flushes waiting for space
+        self._writer = threading.Thread(
+            target=self._write, name=f"SocketPublisher {path}", daemon=True
+        )
+        self._writer.start()
+
+    @property
+    def pending_bytes(self) -> int:
+        return self._pending_bytes
+
+    def publish(self, event: Event) -> None:
+        frame = encode_event(event)
+        with self._lock:
+            self._append(frame)
+            if self._depth == 0 and not self._flush_scheduled:
+                self._flush()
+
+    def listen(self, event: Event) -> None:
+        """Forward an event of the topic, written after the current loop iteration"""
+        frame = encode_event(event)
+        with self._lock:
+            self._append(frame)
+            if not self._flush_scheduled:
+                self._flush_scheduled = True
+                asyncio.get_running_loop().call_soon(self.flush)
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        with self._lock:
+            self._depth += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._flush()
+
+    def flush(self) -> None:
+        """Hand the buffered frames to the writer thread"""
+        with self._lock:
+            self._flush_scheduled = False
+            self._flush()
+
+    def close(self) -> None:
+        """Write the buffered frames and close the socket"""
+        with self._lock:
+            if self._closed:
+                return
+            self._flush()
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._socket.close()
+
+    def _append(self, frame: bytes) -> None:
+        if self._closed:
+            raise EventError(f"Socket publisher {self.path} is closed")
+        if self._error is not None:
+            raise EventError(
+                f"Socket publisher {self.path} - Error: {self._error}"
+            ) from self._error
+        self._buffer += frame
+        self._buffered += 1
+        self.sent_count += 1
+        if len(self._buffer) >= self.batch_bytes:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer or self._closed:
+            return
+        data, count = bytes(self._buffer), self._buffered
+        self._buffer.clear()
+        self._buffered = 0
+        while (
+            self._writes
+            and self._pending_bytes + len(data) > self.max_pending_bytes
+            and self._error is None
+        ):
+            if self.policy is QueuePolicy.BLOCK:
+                self._blocked += 1
+                self._condition.wait()
+                self._blocked -= 1
+            else:
+                dropped, dropped_count = self._writes.popleft()
+                self._pending_bytes -= len(dropped)
+                self.dropped += dropped_count
+        if self._error is not None:
+            return  # the writer thread stopped
+        self._writes.append((data, count))
+        self._pending_bytes += len(data)
+        self._condition.notify_all()
+
+    def _write(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._writes or (self._closed and not self._blocked)
+                )
+                if not self._writes:
+                    return  # closed
+                data, _ = self._writes.popleft()
+                self._pending_bytes -= len(data)
+                self._condition.notify_all()
+            try:
+                self._socket.sendall(data)
+            except OSError as error:
+                with self._condition:
+                    self._error = error  # raised by the next publish
+                    self._writes.clear()
+                    self._pending_bytes = 0
+                    self._condition.notify_all()
+                return
+
+
+class SocketReceiver:
+    """Publishes the events received on a Unix socket into the topic. Any number
+    of SocketPublishers can connect"""
+
+    def __init__(self, path: str, topic: Topic, runtime: Optional[EventRuntime] = None):
+        self.path = path
+        self.topic = topic
+        self.received_count = 0
+        self.runtime = default_runtime() if runtime is None else runtime
+        self._loop = self.runtime.attach()
+        self._connections: set[asyncio.Task[None]] = set()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(path)
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_unix_server(self._receive, path=path), self._loop
+        ).result()
+        self._closed = False
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Stop accepting connections and drop the open ones"""
+        if self._closed:
+            return
+        self._closed = True
+        # the runtime was closed
+        with contextlib.suppress(RuntimeError, concurrent.futures.CancelledError):
+            asyncio.run_coroutine_threadsafe(self._close(), self._loop).result(timeout)
+        self.runtime.detach(self._loop)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)
+
+    async def _close(self) -> None:
+        self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _receive(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        assert task is not None
+        self._connections.add(task)
+        buffer = bytearray()
+        try:
+            while chunk := await reader.read(_READ_SIZE):
+                buffer += chunk
+                for event in decode_events(buffer):
+                    self.topic.publish(event)
+                    self.received_count += 1
+        except TopicClosedError:
+            pass  # nothing left to publish into
+        except asyncio.CancelledError:
+            pass  # closed, the stream protocol reports a cancelled task as an error
+        finally:
+            self._connections.discard(task)
+            writer.close()
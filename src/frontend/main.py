@@ -3,7 +3,7 @@ import view
 
 import controller
 import model
-from event import Event, EventType, LocalPublisher, Topic
+from event import Event, EventType, LocalPublisher, Topic, payload
 
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -90,29 +90,33 @@ def main():
     view_listener.set_player_tokens(
         {token_list[i].user_id: token_list[i] for i in range(4)}
     )
-    game_view_topic.register_subscriber(view_listener)
+    game_view_topic.register_handlers(view_listener.handlers, name="view")
     game_model.register_publisher_topic(game_view_topic)
 
     view_controller_topic = Topic("view_controller")
     controller_listener = controller.ControllerListener(game_controller)
-    view_controller_topic.register_subscriber(controller_listener)
+    view_controller_topic.register_handlers(
+        controller_listener.handlers, name="controller"
+    )
     view_controller_publisher = LocalPublisher()
     view_controller_publisher.register_topic(view_controller_topic)
 
     view_controller_publisher.publish(
         Event(
             EventType.V_ADD_PLAYER,
-            {"user_ids": [token_list[i].user_id for i in range(4)]},
+            payload.AddUsers(user_ids=[token_list[i].user_id for i in range(4)]),
         )
     )
     for i in range(4):
         view_controller_publisher.publish(
             Event(
                 EventType.V_ASSIGN_TOKEN,
-                {"user_id": token_list[i].user_id, "token": token_list[i].token},
+                payload.AssignToken(
+                    user_id=token_list[i].user_id, token=token_list[i].token
+                ),
             )
         )
-    view_controller_publisher.publish(Event(EventType.V_START_GAME, {}))
+    view_controller_publisher.publish(Event(EventType.V_START_GAME, payload.Empty()))
 
     background_sprites.draw(screen.surface)
     token_sprites.draw(screen.surface)
@@ -4,6 +4,7 @@ from typing import Any, Optional
 import pygame
 
 import event
+from event import payload
 
 
 class ButtonType(enum.auto):
@@ -67,7 +68,7 @@ class Button(pygame.sprite.Sprite):
     def handle_click(self) -> event.Event:
         return event.Event(
             self.event_type,
-            {"user_id": self.user_id, "property_id": self.property_id},
+            payload.UserCommand(user_id=self.user_id, property_id=self.property_id),
         )
 
     def update_allow(self, allow: bool) -> None:
@@ -22,18 +22,22 @@ class Deck:
         cards: Optional[list[ChanceCard]] = None,
         data: Optional[list[CardData]] = None,
         seed: Optional[int] = None,
+        rng: Optional[random.Random] = None,
     ) -> None:
         """
         Add the cards after shuffling. This should be called before using the deck and after initialization.
 
         cards: A List of ChanceCard. Either cards or data must be provided.
         data: A List of dict containging data to initialize ChanceCard. Either cards or data must be provided.
+        rng: The generator to shuffle with, otherwise a new one seeded with seed.
         """
+        if rng is None:
+            rng = random.Random(seed)
         if cards is not None:
-            random.Random(seed).shuffle(cards)
+            rng.shuffle(cards)
         elif data is not None:
             cards = [ChanceCard(**datum) for datum in data]
-            random.Random(seed).shuffle(cards)
+            rng.shuffle(cards)
         else:
             raise ValueError("Either cards or data must be provided.")
         self.cards = deque(cards)
@@ -9,7 +9,17 @@ playing continues unless they hit Doubles a fourth time in a row, thus going to
 """
 
 import random
+from typing import Optional
 
+from game.rng import DICE_FACES, GameRng
 
-def roll(num_faces: int = 6, num_dice: int = 2) -> tuple[int, ...]:
-    return tuple(random.randint(1, num_faces) for _die in range(num_dice))
+
+def roll(
+    num_faces: int = 6, num_dice: int = 2, rng: Optional[random.Random] = None
+) -> tuple[int, ...]:
+    """Roll with the given generator, or the global random module if rng is None.
+    Six-sided dice come from the pre-generated block of a GameRng."""
+    if num_faces == DICE_FACES and isinstance(rng, GameRng):
+        return rng.roll_dice(num_dice)
+    randint = random.randint if rng is None else rng.randint
+    return tuple(randint(1, num_faces) for _die in range(num_dice))
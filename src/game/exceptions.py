@@ -5,6 +5,10 @@ class GameError(Exception):
     pass
 
 
+class InvariantError(GameError):
+    """Raised by the invariant check mode when tracked totals are out of sync"""
+
+
 class InvalidActionError(GameError):
     def __init__(self, message: Optional[str] = None):
         if message is None:
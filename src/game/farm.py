@@ -0,0 +1,106 @@
+"""
+Process pool runner for sim.Simulator.
+
+The games of a run are split into chunks of consecutive game indices and the
+chunks are played by a pool of worker processes. Game i gets its own random
+generator seeded with derive_seed(master_seed, i), and seat s of that game
+reseeds its policy with derive_seed(master_seed, i, s). The streams do not depend
+on which worker plays the game, so the merged statistics are reproducible for a
+master seed whatever the worker count is.
+
+Workers send back compact arrays of winners and turns per chunk, which are merged
+in chunk order.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import time
+from array import array
+from dataclasses import dataclass, field
+
+import constants as c
+from game import sim
+from game.rng import GameRng
+
+
+def derive_seed(master_seed: int, *keys: int) -> int:
+    """Return a 64-bit seed from the blake2b digest of the master seed and keys"""
+    digest = hashlib.blake2b(digest_size=8)
+    for value in (master_seed, *keys):
+        digest.update(value.to_bytes(16, "little", signed=True))
+    return int.from_bytes(digest.digest(), "little")
+
+
+@dataclass(kw_only=True, slots=True)
+class ChunkResult:
+    start: int  # index of the first game of the chunk
+    winners: array  # winner uid by game, -1 if the turn limit was reached
+    turns: array  # turn count by game
+
+
+@dataclass(kw_only=True, slots=True)
+class SimulationFarm:
+    """Plays the games of sim.Simulator across worker processes"""
+
+    policies: list[sim.Policy]
+    master_seed: int = 0
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    chunk_size: int = 50
+    starting_cash: int = c.CONST_SIM_STARTING_CASH
+    max_turns: int = c.CONST_SIM_MAX_TURNS
+    auctions: bool = True
+
+    def run(self, n_games: int) -> sim.SimStats:
+        """Play n_games games and return the merged statistics"""
+        if self.workers < 1:
+            raise ValueError("Number of workers must be positive")
+        if self.chunk_size < 1:
+            raise ValueError("Chunk size must be positive")
+
+        chunks = [
+            (start, min(start + self.chunk_size, n_games))
+            for start in range(0, n_games, self.chunk_size)
+        ]
+        stats = sim.SimStats(wins=[0] * len(self.policies))
+        start_time = time.perf_counter()
+        if self.workers == 1:
+            for chunk in chunks:
+                self._merge(stats, self.play_chunk(chunk))
+        else:
+            with multiprocessing.Pool(self.workers) as pool:
+                # imap keeps the chunk order while the results stream in
+                for result in pool.imap(self.play_chunk, chunks):
+                    self._merge(stats, result)
+        stats.elapsed = time.perf_counter() - start_time
+        return stats
+
+    def play_chunk(self, chunk: tuple[int, int]) -> ChunkResult:
+        """Play the games with indices in [start, end)"""
+        start, end = chunk
+        simulator = sim.Simulator(
+            policies=self.policies,
+            starting_cash=self.starting_cash,
+            max_turns=self.max_turns,
+            auctions=self.auctions,
+        )
+        result = ChunkResult(start=start, winners=array("b"), turns=array("l"))
+        for game_idx in range(start, end):
+            for seat, policy in enumerate(self.policies):
+                policy.reseed(derive_seed(self.master_seed, game_idx, seat))
+            rng = GameRng(derive_seed(self.master_seed, game_idx))
+            game_result = simulator.play_game(simulator.new_game(rng=rng))
+            winner_uid = game_result.winner_uid
+            result.winners.append(-1 if winner_uid is None else winner_uid)
+            result.turns.append(game_result.turns)
+        return result
+
+    @staticmethod
+    def _merge(stats: sim.SimStats, result: ChunkResult) -> None:
+        stats.games += len(result.winners)
+        stats.turns += sum(result.turns)
+        for winner_uid in result.winners:
+            if winner_uid < 0:
+                stats.timeouts += 1
+            else:
+                stats.wins[winner_uid] += 1
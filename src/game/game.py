@@ -1,16 +1,20 @@
 from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Optional
+from typing import Any, Callable, Optional, TypeVar
 
 import constants as c
 import game.dice as dice
 from game import card, data
 from game import exceptions as exc
 from game import game_initializer, space
+from game import positions as pos
 from game.actions import Action
 from game.enum_types import DeckType
 from game.game_map import GameMap, SpaceDetails
 from game.player import Player
+from game.rng import GameRng
+
+T = TypeVar("T")
 
 
 @dataclass(kw_only=True, slots=True)
@@ -27,6 +31,8 @@ class Game:
     _roll_double_counter: Optional[tuple[int, int]] = None  # uid, count
     cc_deck: card.Deck = field(init=False)
     chance_deck: card.Deck = field(init=False)
+    rng: GameRng = field(default_factory=GameRng)  # dice and deck shuffles
+    check_invariants: bool = False  # recompute the player totals after every change
     # TODO handle out of the game players
     # TODO jail_list with uid and count
     # TODO [FUTURE] accept game settings
@@ -71,10 +77,18 @@ class Game:
 
     # TODO to be removed to property
     def get_next_player(self, prev_player_uid: int) -> Player:
-        # TODO check if the player is out of the game
-        next_player_id = (prev_player_uid + 1) % len(self.players)
+        """Return the next player who is still in the game"""
+        next_player_id = prev_player_uid
+        for _ in range(len(self.players)):
+            next_player_id = (next_player_id + 1) % len(self.players)
+            if self.players[next_player_id].active:
+                break
         return self.players[next_player_id]
 
+    @property
+    def active_players(self) -> list[Player]:
+        return [player for player in self.players if player.active]
+
     def get_player_position(self, player_uid: Optional[int] = None) -> int:
         if player_uid is None:
             player_uid = self.current_player_uid
@@ -108,10 +122,10 @@ class Game:
         self._roll_double_counter = None
         self.last_dice_rolls = None
 
-    def add_player(self, name: str):
-        new_player = Player(
-            name=name, uid=len(self.players), cash=c.CONST_STARTING_CASH
-        )
+    def add_player(self, name: str, cash: Optional[int] = None):
+        if cash is None:
+            cash = c.CONST_STARTING_CASH
+        new_player = Player(name=name, uid=len(self.players), cash=cash)
         self.players.append(new_player)
         return new_player.uid
 
@@ -125,7 +139,7 @@ class Game:
         ] = []  # (sum, player_uid, (dice_1, dice_2, ...))
         roll_max = (0, -1)  # (sum, player_uid)
         for player in self.players:
-            dice_rolls = dice.roll(num_faces=6, num_dice=2)
+            dice_rolls = dice.roll(num_faces=6, num_dice=2, rng=self.rng)
             roll_result.append(
                 (sum(dice_rolls), player.uid, dice_rolls)
             )  # sum, player_uid, roll_result tuple(int, ...)
@@ -142,15 +156,25 @@ class Game:
     def _initialize_deck(self) -> None:
         """Initialize the deck for chance cards and community chest"""
         self.cc_deck = card.Deck(name="Community Chest Cards")
-        self.cc_deck.shuffle_add_cards(data=data.CONST_CC_CARDS)
+        self.cc_deck.shuffle_add_cards(data=data.CONST_CC_CARDS, rng=self.rng)
         self.chance_deck = card.Deck(name="Chance Cards")
-        self.chance_deck.shuffle_add_cards(data=data.CONST_CHANCE_CARDS)
+        self.chance_deck.shuffle_add_cards(data=data.CONST_CHANCE_CARDS, rng=self.rng)
 
     def initialize(self) -> None:
         """Public API to initialize the whole game"""
         self._initialize_deck()
         self._initialize_game_map()
 
+    def fork(self, into: Optional["Game"] = None) -> "Game":
+        """Return an independent copy of the game through its compact game.state,
+        with its own map, decks and copy of rng. A game used for earlier forks can
+        be given as into to reuse its objects instead of building new ones."""
+        from game import state  # state imports this module
+
+        forked = state.decode(state.encode(self), game=into)
+        forked.check_invariants = self.check_invariants
+        return forked
+
     # TODO test this
     def draw_chance_card(self) -> card.ChanceCard:
         return self.chance_deck.draw_card()
@@ -171,7 +195,7 @@ class Game:
         return next_player
 
     def roll_dice(self) -> tuple[int, ...]:
-        rolls = dice.roll(num_faces=6, num_dice=2)
+        rolls = dice.roll(num_faces=6, num_dice=2, rng=self.rng)
         self.last_dice_rolls = rolls
         return rolls
 
@@ -318,9 +342,8 @@ class Game:
         self.current_bid_property = property_
         self.bidders = deque()
         for player in self.players:
-            # TODO filter out inactive players
-            # if player.active:
-            self.bidders.append(player)
+            if player.active:
+                self.bidders.append(player)
         # rotate the deque until the next player is at the leftmost position
         while self.bidders[0] != self.get_next_player(self.current_player_uid):
             self.bidders.rotate(-1)
@@ -373,6 +396,8 @@ class Game:
         new_cash = player.sub_cash(price)
         player.add_property(property)
         property.assign_owner(player.uid)
+        self._track_property(property)
+        self._verify_if_checking()
         return new_cash
 
     def transfer_cash(
@@ -392,21 +417,102 @@ class Game:
         """Mortgage the property. Return the mortgage price"""
 
         property_ = self._get_property_from_id(property_id)
-        mortgaged_value = property_.mortgage()
+        mortgaged_value = self._change_property(property_, property_.mortgage)
         return mortgaged_value
 
     def unmortgage_property(self, property_id: int) -> int:
         """Unmortgage the property. Return the unmortgage price"""
 
         property_ = self._get_property_from_id(property_id)
-        unmortgaged_value = property_.unmortgage()
+        unmortgaged_value = self._change_property(property_, property_.unmortgage)
         return unmortgaged_value
 
+    def add_house(self, property_id: int) -> int:
+        """Build a house on the property. Return the price of the house"""
+        property_ = self._get_property_space_from_id(property_id)
+        self._change_property(property_, property_.add_house)
+        return property_.price_of_house
+
+    def add_hotel(self, property_id: int) -> int:
+        """Build a hotel on the property. Return the price of the hotel"""
+        property_ = self._get_property_space_from_id(property_id)
+        self._change_property(property_, property_.add_hotel)
+        return property_.price_of_hotel
+
+    def sell_house(self, property_id: int) -> int:
+        """Sell a house of the property back to the bank. Return the selling price"""
+        property_ = self._get_property_space_from_id(property_id)
+        self._change_property(property_, property_.remove_house)
+        return property_.price_of_house // 2
+
+    def sell_hotel(self, property_id: int) -> int:
+        """Sell the hotel of the property back to the bank. Return the selling price"""
+        property_ = self._get_property_space_from_id(property_id)
+        self._change_property(property_, property_.remove_hotel)
+        return property_.price_of_hotel // 2
+
+    def _change_property(
+        self, property_: space.Property, change: Callable[[], T]
+    ) -> T:
+        """Apply the change to the property and update the totals of its owner"""
+        self._track_property(property_, sign=-1)
+        try:
+            result = change()
+        finally:
+            self._track_property(property_)
+        self._verify_if_checking()
+        return result
+
+    def _track_property(self, property_: space.Property, sign: int = 1) -> None:
+        """Add (sign 1) or remove (sign -1) the property to the totals of its owner"""
+        if property_.owner_uid is None:
+            return
+        house_count, hotel_count, mortgaged_count, value = _property_totals(property_)
+        self.players[property_.owner_uid].add_totals(
+            house_count=sign * house_count,
+            hotel_count=sign * hotel_count,
+            mortgaged_count=sign * mortgaged_count,
+            value=sign * value,
+        )
+
+    def recompute_player_totals(self) -> None:
+        """Recompute the totals of every player from scratch, e.g. after changing
+        properties without Game"""
+        for player in self.players:
+            player.clear_totals()
+            for property_ in player.properties:
+                self._track_property(property_)
+
+    def verify_player_totals(self) -> None:
+        """Raise InvariantError if a player's tracked totals differ from a recount"""
+        for player in self.players:
+            expected = [0, 0, 0, 0]
+            for property_ in player.properties:
+                if property_.owner_uid != player.uid:
+                    raise exc.InvariantError(
+                        f"Player {player.uid} holds property {property_.id} "
+                        + f"owned by {property_.owner_uid}"
+                    )
+                for idx, total in enumerate(_property_totals(property_)):
+                    expected[idx] += total
+            if player.get_totals() != tuple(expected):
+                raise exc.InvariantError(
+                    f"Player {player.uid} totals {player.get_totals()} "
+                    + f"do not match the recount {tuple(expected)}"
+                )
+
+    def _verify_if_checking(self) -> None:
+        if self.check_invariants:
+            self.verify_player_totals()
+
+    def _get_property_space_from_id(self, property_id: int) -> space.PropertySpace:
+        property_ = self._get_property_from_id(property_id)
+        if not isinstance(property_, space.PropertySpace):
+            raise ValueError(f"Property {property_id} cannot have buildings")
+        return property_
+
     def _get_property_from_id(self, property_id: int) -> space.Property:
-        for map_space in self.game_map.map_list:
-            if isinstance(map_space, space.Property) and map_space.id == property_id:
-                return map_space
-        raise ValueError("Invalid property id: {0}".format(property_id))
+        return self.game_map.get_property(property_id)
 
     def get_property(
         self, position: Optional[int] = None, player_uid: Optional[int] = None
@@ -426,13 +532,7 @@ class Game:
     def get_player_house_and_hotel_counts(self, player_uid: int) -> tuple[int, int]:
         """Returns the number of houses and hotels owned by the player (house, hotel)"""
         player = self.players[player_uid]
-        house_count = 0
-        hotel_count = 0
-        for property_ in player.properties:
-            if isinstance(property_, space.PropertySpace):
-                house_count += property_.no_of_houses
-                hotel_count += property_.no_of_hotels
-        return house_count, hotel_count
+        return player.house_count, player.hotel_count
 
     def get_pay_rent_info(self) -> tuple[int, int]:
         """Returns the payee id and the rent amount to pay rent to using
@@ -526,6 +626,66 @@ class Game:
             player_id = self.current_player_uid
         return self.players[player_id].jail_turns is not None
 
+    def send_player_to_jail(self, player_uid: Optional[int] = None) -> None:
+        """Move the player straight to jail without passing Go and end the double roll streak"""
+        if player_uid is None:
+            player_uid = self.current_player_uid
+        player = self.players[player_uid]
+        player.move(position=pos.Position.JAIL.value)
+        player.jail_turns = 0
+        self._roll_double_counter = None
+
+    def release_player_from_jail(self, player_uid: Optional[int] = None) -> None:
+        if player_uid is None:
+            player_uid = self.current_player_uid
+        self.players[player_uid].jail_turns = None
+
+    def bankrupt_player(
+        self, player_uid: int, creditor_uid: Optional[int] = None
+    ) -> None:
+        """Remove the player from the game. The remaining cash and properties go to
+        the creditor, or back to the bank if creditor_uid is None.
+        Buildings are always returned to the bank."""
+        player = self.players[player_uid]
+        if creditor_uid is not None:
+            creditor = self.players[creditor_uid]
+            if player.cash > 0:
+                creditor.add_cash(player.cash)
+        for property_ in player.properties:
+            self._track_property(property_, sign=-1)
+            if isinstance(property_, space.PropertySpace):
+                property_.no_of_houses = 0
+                property_.no_of_hotels = 0
+            if creditor_uid is not None:
+                creditor.add_property(property_)
+                property_.assign_owner(creditor_uid)
+                self._track_property(property_)
+            else:
+                property_.remove_owner()
+        while len(player.jail_cards) > 0:
+            self.use_player_jail_card(player_uid)
+
+        player.properties = []
+        player.clear_totals()
+        player.sub_cash(player.cash)
+        player.jail_turns = None
+        player.active = False
+        self._verify_if_checking()
+
     def get_all_states(self):
         # TODO: return game states for view
         ...
+
+
+def _property_totals(property_: space.Property) -> tuple[int, int, int, int]:
+    """Return the (house count, hotel count, mortgaged count, value) of the property.
+    The value is at cost, a hotel includes the houses it replaced."""
+    mortgaged_count = 1 if property_.mortgaged else 0
+    value = property_.mortgage_value if property_.mortgaged else property_.price
+    if not isinstance(property_, space.PropertySpace):
+        return 0, 0, mortgaged_count, value
+    house_count, hotel_count = property_.no_of_houses, property_.no_of_hotels
+    value += house_count * property_.price_of_house + hotel_count * (
+        property_.price_of_hotel + property_.HOUSE_LIMIT * property_.price_of_house
+    )
+    return house_count, hotel_count, mortgaged_count, value
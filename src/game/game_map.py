@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 from typing import Optional, TypedDict
 
+import constants as c
 from game import space
 from game.actions import Action
 from game.player import Player
@@ -25,9 +26,33 @@ class GameMap:
 
     map_list: list[space.Space]
     size: int = field(init=False)
+    # property id, (position, property), built once as the map does not change
+    _property_index: dict[int, tuple[int, space.Property]] = field(
+        init=False, repr=False
+    )
 
     def __post_init__(self):
         self.size = len(self.map_list)
+        self._property_index = {}
+        for position, map_space in enumerate(self.map_list):
+            if isinstance(map_space, space.Property):
+                if map_space.id in self._property_index:
+                    raise ValueError(f"Duplicate property id: {map_space.id}")
+                self._property_index[map_space.id] = (position, map_space)
+
+    def get_property(self, property_id: int) -> space.Property:
+        """Return the property with the id in O(1)"""
+        return self._get_property_entry(property_id)[1]
+
+    def get_property_position(self, property_id: int) -> int:
+        """Return the position of the property with the id in O(1)"""
+        return self._get_property_entry(property_id)[0]
+
+    def _get_property_entry(self, property_id: int) -> tuple[int, space.Property]:
+        entry = self._property_index.get(property_id)
+        if entry is None:
+            raise ValueError("Invalid property id: {0}".format(property_id))
+        return entry
 
     # TODO test this
     def get_space_name(self, position: int) -> str:
@@ -54,3 +79,12 @@ class GameMap:
         This method triggers the card's action and action result.
         """
         return self.map_list[player.position].trigger(player)
+
+    def landing_probabilities(
+        self, max_jail_turns: int = c.CONST_MAX_JAIL_TURNS
+    ) -> tuple[float, ...]:
+        """Return the long-run probability of a player being on each space at a roll,
+        solved exactly and cached by game.markov. Requires numpy."""
+        from game import markov  # numpy is only needed for this method
+
+        return markov.landing_probabilities_of_map(self, max_jail_turns=max_jail_turns)
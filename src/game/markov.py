@@ -0,0 +1,214 @@
+"""
+Exact landing probabilities of the board as a Markov chain.
+
+A state is the position of the player about to roll, together with the number of
+doubles already rolled in the turn, or the number of failed rolls in jail. Every
+transition enumerates the 36 dice outcomes and follows the same rules as
+Game.check_double_roll and sim.Simulator:
+- The last of CONST_MAX_DOUBLE_ROLL doubles sends the player to jail without moving.
+- Landing on the go-to-jail space or drawing a jail card sends the player to jail.
+- Movement cards are drawn uniformly from their deck, e.g. Back 3 Spaces from
+  a chance space can land on a community chest space and draw again.
+- In jail the player tries to roll doubles up to max_jail_turns times and then pays
+  the fine. Leaving by doubles moves without an extra roll. With max_jail_turns 0
+  the fine is paid straight away and the turn is played normally.
+
+The stationary distribution is solved with NumPy and cached per board and rules,
+so repeated queries do not rebuild the matrix.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+import constants as c
+from game import data, enum_types, space
+from game import positions as pos
+from game.actions import Action
+from game.game_map import GameMap
+
+# labels of the spaces relevant to movement
+GO_TO_JAIL = "go_to_jail"
+CHANCE = "chance"
+CC = "cc"
+RAILROAD = "railroad"
+UTILITY = "utility"
+OTHER = ""
+
+_ADVANCE_TO: dict[Action, int] = {
+    Action.SEND_TO_BOARDWALK: pos.Position.BOARDWALK.value,
+    Action.SEND_TO_GO: pos.Position.GO.value,
+    Action.SEND_TO_ILLINOIS_AVE: pos.Position.ILLINOIS_AVE.value,
+    Action.SEND_TO_ST_CHARLES_PLACE: pos.Position.ST_CHARLES_PLACE.value,
+    Action.SEND_TO_READING_RAILROAD: pos.Position.READING_RAILROAD.value,
+}
+
+_IN_JAIL = -1  # landing outcome of being sent to jail
+
+
+def board_labels(game_map: GameMap) -> tuple[str, ...]:
+    """Return the movement label of every space of the map"""
+    labels: list[str] = []
+    for map_space in game_map.map_list:
+        if isinstance(map_space, space.JailSpace):
+            labels.append(GO_TO_JAIL)
+        elif isinstance(map_space, space.DrawSpace):
+            is_chance = map_space.deck_type is enum_types.DeckType.CHANCE
+            labels.append(CHANCE if is_chance else CC)
+        elif isinstance(map_space, space.RailroadSpace):
+            labels.append(RAILROAD)
+        elif isinstance(map_space, space.UtilitySpace):
+            labels.append(UTILITY)
+        else:
+            labels.append(OTHER)
+    return tuple(labels)
+
+
+def landing_probabilities_of_map(
+    game_map: GameMap, max_jail_turns: int = c.CONST_MAX_JAIL_TURNS
+) -> tuple[float, ...]:
+    """Return the probability of a player being on each space of the map at a roll"""
+    return landing_probabilities(
+        board=board_labels(game_map),
+        chance_actions=tuple(card["action"] for card in data.CONST_CHANCE_CARDS),
+        cc_actions=tuple(card["action"] for card in data.CONST_CC_CARDS),
+        max_double_roll=c.CONST_MAX_DOUBLE_ROLL,
+        max_jail_turns=max_jail_turns,
+    )
+
+
+@lru_cache(maxsize=32)
+def landing_probabilities(
+    board: tuple[str, ...],
+    chance_actions: tuple[Action, ...],
+    cc_actions: tuple[Action, ...],
+    max_double_roll: int,
+    max_jail_turns: int,
+) -> tuple[float, ...]:
+    """Solve the stationary distribution of the chain and sum it up by position.
+    Being in jail is counted as being on the jail space."""
+    size = len(board)
+    jail = pos.Position.JAIL.value
+    if size <= jail:
+        raise ValueError(f"Board of size {size} has no jail space")
+    if max_double_roll < 1:
+        raise ValueError("Max double roll must be positive")
+    if max_jail_turns < 0:
+        raise ValueError("Max jail turns must not be negative")
+
+    n_board_states = size * max_double_roll
+    n_states = n_board_states + max_jail_turns
+
+    def board_state(position: int, doubles: int) -> int:
+        return position * max_double_roll + doubles
+
+    def jail_state(failed_rolls: int) -> int:
+        if max_jail_turns == 0:  # fine paid at the start of the next turn
+            return board_state(jail, 0)
+        return n_board_states + failed_rolls
+
+    decks = {CHANCE: chance_actions, CC: cc_actions}
+    landing_cache: dict[int, dict[int, float]] = {}
+
+    def land(position: int) -> dict[int, float]:
+        """Final position distribution after landing, _IN_JAIL if sent to jail"""
+        if position not in landing_cache:
+            landing_cache[position] = _land(board, decks, position, depth=0)
+        return landing_cache[position]
+
+    matrix = np.zeros((n_states, n_states))
+    outcomes = [(d1, d2) for d1 in range(1, 7) for d2 in range(1, 7)]
+    for position in range(size):
+        for doubles in range(max_double_roll):
+            row = board_state(position, doubles)
+            for dice_1, dice_2 in outcomes:
+                is_double = dice_1 == dice_2
+                if is_double and doubles + 1 >= max_double_roll:
+                    matrix[row, jail_state(0)] += 1 / 36
+                    continue
+                next_doubles = doubles + 1 if is_double else 0
+                target = (position + dice_1 + dice_2) % size
+                for final, prob in land(target).items():
+                    if final == _IN_JAIL:
+                        matrix[row, jail_state(0)] += prob / 36
+                    else:
+                        matrix[row, board_state(final, next_doubles)] += prob / 36
+
+    for failed_rolls in range(max_jail_turns):
+        row = jail_state(failed_rolls)
+        for dice_1, dice_2 in outcomes:
+            if dice_1 != dice_2 and failed_rolls + 1 < max_jail_turns:
+                matrix[row, jail_state(failed_rolls + 1)] += 1 / 36
+                continue
+            # leave by doubles or by the fine, move without an extra roll
+            target = (jail + dice_1 + dice_2) % size
+            for final, prob in land(target).items():
+                if final == _IN_JAIL:
+                    matrix[row, jail_state(0)] += prob / 36
+                else:
+                    matrix[row, board_state(final, 0)] += prob / 36
+
+    # solve pi (P - I) = 0 with sum(pi) = 1 replacing one of the equations
+    system = matrix.T - np.eye(n_states)
+    system[-1, :] = 1.0
+    rhs = np.zeros(n_states)
+    rhs[-1] = 1.0
+    stationary = np.linalg.solve(system, rhs)
+
+    by_position = stationary[:n_board_states].reshape(size, max_double_roll).sum(axis=1)
+    by_position[jail] += stationary[n_board_states:].sum()
+    return tuple(float(prob) for prob in by_position)
+
+
+def _land(
+    board: tuple[str, ...],
+    decks: dict[str, tuple[Action, ...]],
+    position: int,
+    depth: int,
+) -> dict[int, float]:
+    label = board[position]
+    if label == GO_TO_JAIL:
+        return {_IN_JAIL: 1.0}
+    if label not in decks or depth > len(board):
+        return {position: 1.0}
+
+    actions = decks[label]
+    result: dict[int, float] = {}
+    for action in actions:
+        target = _card_target(board, action, position)
+        if target is None:
+            outcomes = {position: 1.0}
+        elif target == _IN_JAIL:
+            outcomes = {_IN_JAIL: 1.0}
+        else:
+            outcomes = _land(board, decks, target, depth + 1)
+        for final, prob in outcomes.items():
+            result[final] = result.get(final, 0.0) + prob / len(actions)
+    return result
+
+
+def _card_target(
+    board: tuple[str, ...], action: Action, position: int
+) -> Optional[int]:
+    """Return the position the card moves to, _IN_JAIL, or None if it does not move"""
+    if action in _ADVANCE_TO:
+        return _ADVANCE_TO[action]
+    if action is Action.SEND_TO_JAIL:
+        return _IN_JAIL
+    if action is Action.SEND_BACK_THREE_SPACES:
+        return (position - 3) % len(board)
+    if action is Action.SEND_TO_NEAREST_RAILROAD:
+        return _find_nearest_label(board, position, RAILROAD)
+    if action is Action.SEND_TO_NEAREST_UTILITY:
+        return _find_nearest_label(board, position, UTILITY)
+    return None
+
+
+def _find_nearest_label(board: tuple[str, ...], position: int, label: str) -> int:
+    """Same as positions.find_nearest_position with the positions of the label"""
+    for step in range(1, len(board) + 1):
+        target = (position + step) % len(board)
+        if board[target] == label:
+            return target
+    raise ValueError(f"Board has no {label} space")
@@ -19,14 +19,46 @@ class Player:
     position: int = 0
     jail_cards: list[card.ChanceCard] = field(default_factory=list)
     jail_turns: int | None = None
+    active: bool = True  # False after the player went bankrupt
+    # totals over the owned properties, kept up to date by Game
+    house_count: int = 0
+    hotel_count: int = 0
+    mortgaged_count: int = 0
+    property_value: int = 0  # at cost, the mortgage value for mortgaged properties
 
     def __eq__(self, other: object):
         assert isinstance(other, Player)
         return self.uid == other.uid
 
+    @property
+    def net_worth(self) -> int:
+        return self.cash + self.property_value
+
     def add_property(self, property_: space.Property) -> None:
         self.properties.append(property_)
 
+    def add_totals(
+        self, house_count: int, hotel_count: int, mortgaged_count: int, value: int
+    ) -> None:
+        """Add the differences to the property totals"""
+        self.house_count += house_count
+        self.hotel_count += hotel_count
+        self.mortgaged_count += mortgaged_count
+        self.property_value += value
+
+    def clear_totals(self) -> None:
+        self.house_count = self.hotel_count = 0
+        self.mortgaged_count = self.property_value = 0
+
+    def get_totals(self) -> tuple[int, int, int, int]:
+        """Return (house count, hotel count, mortgaged count, property value)"""
+        return (
+            self.house_count,
+            self.hotel_count,
+            self.mortgaged_count,
+            self.property_value,
+        )
+
     def assign_token(self, token: int) -> None:
         self.token = token
 
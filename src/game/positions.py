@@ -13,3 +13,12 @@ class Position(Enum):
 
     UTILITIES = [12, 28]
     RAILROADS = [5, 15, 25, 35]
+
+
+def find_nearest_position(player_pos: int, search_pos: list[int]) -> int:
+    """Find the nearest position from search_pos that is ahead of the
+    player's current position."""
+    for position in search_pos:
+        if player_pos < position:
+            return position
+    return search_pos[0]  # returns the first one after passing Go
@@ -0,0 +1,61 @@
+"""
+Random generator owned by a single Game.
+
+GameRng is a random.Random, so it shuffles the decks and seeds anything else of
+the game, and adds roll_dice for six-sided dice. The dice are pre-generated in
+blocks: randbytes draws block_size bytes at once, bytes.translate drops the bytes
+above the largest multiple of 6 and maps the rest to faces, which keeps the
+faces uniform. A roll then only slices the block.
+
+The state returned by getstate holds the dice not rolled yet and the block size,
+so a game restored with setstate, copied or unpickled rolls the same dice as the
+original.
+"""
+
+import random
+from typing import Any, Optional
+
+DICE_FACES = 6
+_ACCEPTED = 256 - 256 % DICE_FACES  # bytes below are uniform modulo the faces
+_FACE_TABLE = bytes(byte % DICE_FACES + 1 for byte in range(256))
+_REJECTED = bytes(range(_ACCEPTED, 256))
+
+
+class GameRng(random.Random):
+    def __init__(self, seed: Optional[int] = None, block_size: int = 256):
+        if block_size < 1:
+            raise ValueError("Block size must be positive")
+        self.block_size = block_size
+        random.Random.__init__(self, seed)
+
+    def seed(self, a: Any = None, version: int = 2) -> None:
+        random.Random.seed(self, a, version)
+        self._dice = b""  # pre-generated faces, rolled from _next on
+        self._next = 0
+
+    def roll_dice(self, num_dice: int = 2) -> tuple[int, ...]:
+        """Roll num_dice six-sided dice from the pre-generated block"""
+        end = self._next + num_dice
+        if end > len(self._dice):
+            self._refill(num_dice)
+            end = num_dice
+        rolls = tuple(self._dice[self._next : end])
+        self._next = end
+        return rolls
+
+    def _refill(self, num_dice: int) -> None:
+        """Generate the next block after the dice left over"""
+        dice = self._dice[self._next :]
+        while len(dice) < num_dice:
+            block = self.randbytes(self.block_size)
+            dice += block.translate(_FACE_TABLE, _REJECTED)
+        self._dice = dice
+        self._next = 0
+
+    def getstate(self) -> tuple[Any, ...]:
+        return random.Random.getstate(self), self._dice[self._next :], self.block_size
+
+    def setstate(self, state: tuple[Any, ...]) -> None:
+        random_state, self._dice, self.block_size = state
+        random.Random.setstate(self, random_state)
+        self._next = 0
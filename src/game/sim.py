@@ -0,0 +1,440 @@
+"""
+Headless simulation engine on top of Game.
+
+Plays complete games without input(), print() or event publishing. Every decision
+a player can make (buy, auction bid, jail fine, raising cash, end of turn) is
+delegated to a pluggable Policy, so the same engine serves bot evaluation and
+throughput benchmarks.
+"""
+
+import random
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Optional
+
+import constants as c
+from game import card, space
+from game import positions as pos
+from game.actions import Action
+from game.game import Game
+from game.player import Player
+from game.rng import GameRng
+
+
+class Policy(ABC):
+    """Decision maker for one seat of the simulation"""
+
+    @abstractmethod
+    def should_buy(self, game: Game, player: Player, property_: space.Property) -> bool:
+        """Return True to buy the landed property, False to auction it"""
+
+    @abstractmethod
+    def bid(
+        self, game: Game, player: Player, property_: space.Property, price: int
+    ) -> int:
+        """Return the amount to raise the current bid price by, 0 to pass"""
+
+    def should_use_jail_card(self, game: Game, player: Player) -> bool:
+        return True
+
+    def should_pay_jail_fine(self, game: Game, player: Player) -> bool:
+        return player.cash >= c.CONST_JAIL_FINE
+
+    def raise_cash(self, game: Game, player: Player, amount: int) -> None:
+        """Called before a payment the player cannot afford. Sell buildings evenly,
+        then mortgage properties in purchase order until amount is covered."""
+        sold = True
+        while player.cash < amount and sold:
+            sold = False
+            for property_ in player.properties:
+                if player.cash >= amount or not isinstance(
+                    property_, space.PropertySpace
+                ):
+                    continue
+                if property_.allow_remove_hotel():
+                    game.add_player_cash(player.uid, game.sell_hotel(property_.id))
+                    sold = True
+                elif property_.allow_remove_house():
+                    game.add_player_cash(player.uid, game.sell_house(property_.id))
+                    sold = True
+        for property_ in player.properties:
+            if player.cash >= amount:
+                return
+            if property_.allow_mortgage():
+                game.add_player_cash(player.uid, game.mortgage_property(property_.id))
+
+    def end_turn(self, game: Game, player: Player) -> None:
+        """Called before passing the turn, e.g. to unmortgage or build"""
+
+    def reseed(self, seed: int) -> None:
+        """Called before every game of a seeded run. Reseed any random generator"""
+
+
+@dataclass(kw_only=True, slots=True)
+class GreedyPolicy(Policy):
+    """Buy everything while keeping a cash reserve, bid up to the list price
+    and build evenly on every monopoly at the end of the turn"""
+
+    reserve: int = 0
+
+    def should_buy(self, game: Game, player: Player, property_: space.Property) -> bool:
+        return player.cash - property_.price >= self.reserve
+
+    def bid(
+        self, game: Game, player: Player, property_: space.Property, price: int
+    ) -> int:
+        if price + 10 <= min(property_.price, player.cash - self.reserve):
+            return 10
+        return 0
+
+    def end_turn(self, game: Game, player: Player) -> None:
+        built = True
+        while built:
+            built = False
+            for property_ in player.properties:
+                if not isinstance(property_, space.PropertySpace):
+                    continue
+                if (
+                    property_.allow_add_hotel()
+                    and player.cash - property_.price_of_hotel >= self.reserve
+                ):
+                    game.sub_player_cash(player.uid, game.add_hotel(property_.id))
+                    built = True
+                elif (
+                    property_.allow_add_house()
+                    and player.cash - property_.price_of_house >= self.reserve
+                ):
+                    game.sub_player_cash(player.uid, game.add_house(property_.id))
+                    built = True
+
+
+@dataclass(kw_only=True, slots=True)
+class PassivePolicy(Policy):
+    """Never buy and always pass in auctions"""
+
+    def should_buy(self, game: Game, player: Player, property_: space.Property) -> bool:
+        return False
+
+    def bid(
+        self, game: Game, player: Player, property_: space.Property, price: int
+    ) -> int:
+        return 0
+
+
+@dataclass(kw_only=True, slots=True)
+class RandomPolicy(Policy):
+    """Make every decision by a coin flip"""
+
+    buy_probability: float = 0.5
+    bid_probability: float = 0.5
+    rng: random.Random = field(default_factory=random.Random)
+
+    def should_buy(self, game: Game, player: Player, property_: space.Property) -> bool:
+        return self.rng.random() < self.buy_probability
+
+    def bid(
+        self, game: Game, player: Player, property_: space.Property, price: int
+    ) -> int:
+        if self.rng.random() < self.bid_probability:
+            return self.rng.choice((1, 10, 50, 100))
+        return 0
+
+    def should_pay_jail_fine(self, game: Game, player: Player) -> bool:
+        return player.cash >= c.CONST_JAIL_FINE and self.rng.random() < 0.5
+
+    def reseed(self, seed: int) -> None:
+        self.rng.seed(seed)
+
+
+@dataclass(kw_only=True, slots=True)
+class GameResult:
+    winner_uid: Optional[int]  # None if the turn limit was reached
+    turns: int
+    cash: tuple[int, ...]  # final cash by player uid
+    active: tuple[bool, ...]  # whether the player is still in the game by player uid
+
+
+@dataclass(kw_only=True, slots=True)
+class SimStats:
+    games: int = 0
+    turns: int = 0
+    timeouts: int = 0  # games stopped by the turn limit
+    wins: list[int] = field(default_factory=list)  # win count by player uid
+    elapsed: float = 0.0  # seconds
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def turns_per_sec(self) -> float:
+        return self.turns / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        self.turns += result.turns
+        if len(self.wins) < len(result.cash):
+            self.wins.extend([0] * (len(result.cash) - len(self.wins)))
+        if result.winner_uid is None:
+            self.timeouts += 1
+        else:
+            self.wins[result.winner_uid] += 1
+
+
+@dataclass(kw_only=True, slots=True)
+class Simulator:
+    """Plays full games headlessly, one policy per seat"""
+
+    policies: list[Policy]
+    starting_cash: int = c.CONST_SIM_STARTING_CASH
+    max_turns: int = c.CONST_SIM_MAX_TURNS
+    auctions: bool = True  # auction the properties that are not bought
+
+    def new_game(self, rng: Optional[GameRng] = None) -> Game:
+        """Set up a game, rng drives its dice and decks if given"""
+        game = Game(rng=GameRng() if rng is None else rng)
+        for idx in range(len(self.policies)):
+            game.add_player(f"Bot {idx + 1}", cash=self.starting_cash)
+        game.initialize()
+        game.initialize_first_player()
+        return game
+
+    def run(self, n_games: int, seed: Optional[int] = None) -> SimStats:
+        """Play n_games games and return the aggregated statistics. The games of
+        a run with a seed are replayed by another run with the same seed."""
+        seeds = random.Random(seed)
+        stats = SimStats(wins=[0] * len(self.policies))
+        start = time.perf_counter()
+        for _ in range(n_games):
+            if seed is not None:
+                for policy in self.policies:
+                    policy.reseed(seeds.getrandbits(64))
+            game = self.new_game(rng=GameRng(seeds.getrandbits(64)))
+            stats.add(self.play_game(game))
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    def play_game(self, game: Optional[Game] = None) -> GameResult:
+        """Play the game until one player is left or the turn limit is reached"""
+        if game is None:
+            game = self.new_game()
+        turns = 0
+        while turns < self.max_turns and len(game.active_players) > 1:
+            self.play_turn(game)
+            turns += 1
+
+        active_players = game.active_players
+        return GameResult(
+            winner_uid=active_players[0].uid if len(active_players) == 1 else None,
+            turns=turns,
+            cash=tuple(player.cash for player in game.players),
+            active=tuple(player.active for player in game.players),
+        )
+
+    def play_turn(self, game: Game) -> None:
+        """Play the whole turn of the current player, including double rolls,
+        then pass the turn to the next player"""
+        player = game.current_player
+        policy = self.policies[player.uid]
+
+        if game.check_in_jail():
+            self._play_jail_turn(game, player, policy)
+        else:
+            self._play_rolls(game, player, policy)
+
+        if player.active:
+            policy.end_turn(game, player)
+        game.next_player_and_reset()
+
+    def _play_rolls(self, game: Game, player: Player, policy: Policy) -> None:
+        while True:
+            dice_1, dice_2 = game.roll_dice()
+            if game.check_double_roll(dice_1, dice_2) is Action.SEND_TO_JAIL:
+                game.send_player_to_jail()
+                return
+            self._move(game, steps=dice_1 + dice_2)
+            self._resolve_space(game, player, policy)
+            if not player.active or game.check_in_jail() or not game.has_double_roll:
+                return
+
+    def _play_jail_turn(self, game: Game, player: Player, policy: Policy) -> None:
+        """Leave jail by card or fine and play normally, otherwise try to roll doubles.
+        The fine is forced after CONST_MAX_JAIL_TURNS failed rolls."""
+        if len(player.jail_cards) > 0 and policy.should_use_jail_card(game, player):
+            game.use_player_jail_card(player.uid)
+            game.release_player_from_jail()
+            self._play_rolls(game, player, policy)
+            return
+        if policy.should_pay_jail_fine(game, player):
+            if not self._pay(game, player, c.CONST_JAIL_FINE):
+                return
+            game.release_player_from_jail()
+            self._play_rolls(game, player, policy)
+            return
+
+        dice_1, dice_2 = game.roll_dice()
+        if dice_1 != dice_2:
+            assert player.jail_turns is not None
+            player.jail_turns += 1
+            if player.jail_turns < c.CONST_MAX_JAIL_TURNS:
+                return
+            if not self._pay(game, player, c.CONST_JAIL_FINE):
+                return
+        game.release_player_from_jail()
+        # leaving jail by rolling does not give an extra roll
+        self._move(game, steps=dice_1 + dice_2)
+        self._resolve_space(game, player, policy)
+
+    def _move(
+        self, game: Game, steps: Optional[int] = None, position: Optional[int] = None
+    ) -> None:
+        game.move_player(steps=steps, position=position)
+        if game.check_go_pass() is Action.PASS_GO:
+            game.add_player_cash(game.current_player_id, c.CONST_GO_CASH)
+            game.offset_go_pos()
+
+    def _pay(
+        self, game: Game, player: Player, amount: int, payee_uid: Optional[int] = None
+    ) -> bool:
+        """Pay amount to the payee or the bank if payee_uid is None.
+        Bankrupt the player if it cannot be afforded. Return True if paid."""
+        if player.cash < amount:
+            self.policies[player.uid].raise_cash(game, player, amount)
+        if player.cash < amount:
+            game.bankrupt_player(player.uid, creditor_uid=payee_uid)
+            return False
+        game.sub_player_cash(player.uid, amount)
+        if payee_uid is not None:
+            game.add_player_cash(payee_uid, amount)
+        return True
+
+    def _resolve_space(self, game: Game, player: Player, policy: Policy) -> None:
+        space_action = game.trigger_space()
+        if space_action is Action.ASK_TO_BUY:
+            property_ = game.current_property
+            if player.cash >= property_.price and policy.should_buy(
+                game, player, property_
+            ):
+                game.buy_property()
+            elif self.auctions:
+                self._auction(game, property_)
+        elif space_action is Action.PAY_RENT:
+            payee_uid, rent = game.get_pay_rent_info()
+            self._pay(game, player, rent, payee_uid)
+        elif space_action is Action.DRAW_CHANCE_CARD:
+            self._process_card(game, player, policy, game.draw_chance_card())
+        elif space_action is Action.DRAW_CC_CARD:
+            self._process_card(game, player, policy, game.draw_cc_card())
+        elif space_action is Action.CHARGE_INCOME_TAX:
+            self._pay(game, player, c.CONST_INCOME_TAX)
+        elif space_action is Action.CHARGE_LUXURY_TAX:
+            self._pay(game, player, c.CONST_LUXURY_TAX)
+        elif space_action is Action.SEND_TO_JAIL:
+            game.send_player_to_jail()
+        elif space_action is not Action.NOTHING:  # pragma: no cover
+            raise ValueError(f"Unknown trigger {space_action}")
+
+    def _auction(self, game: Game, property_: space.Property) -> None:
+        game.auction_property(property_)
+        while len(game.bidders) > 1:
+            bidder = game.bidders[0]
+            amount = self.policies[bidder.uid].bid(
+                game, bidder, property_, game.current_bid_price
+            )
+            if amount > 0 and bidder.cash < game.current_bid_price + amount:
+                amount = 0
+            game.bid_property(amount)
+        winner = game.bidders[0]
+        if winner.cash >= game.current_bid_price:
+            game.buy_property_transaction(winner, property_, game.current_bid_price)
+        game.end_auction()
+
+    def _send_player(
+        self, game: Game, player: Player, policy: Policy, position: pos.Position
+    ) -> None:
+        if position is pos.Position.RAILROADS or position is pos.Position.UTILITIES:
+            pos_value = pos.find_nearest_position(player.position, position.value)
+        else:
+            pos_value = position.value
+        self._move(game, position=pos_value)
+        self._resolve_space(game, player, policy)
+
+    def _process_card(
+        self, game: Game, player: Player, policy: Policy, drawn_card: card.ChanceCard
+    ) -> None:
+        card_action = drawn_card.trigger()
+        match card_action:
+            case Action.SEND_TO_BOARDWALK:
+                self._send_player(game, player, policy, pos.Position.BOARDWALK)
+            case Action.SEND_TO_GO:
+                self._send_player(game, player, policy, pos.Position.GO)
+            case Action.SEND_TO_ILLINOIS_AVE:
+                self._send_player(game, player, policy, pos.Position.ILLINOIS_AVE)
+            case Action.SEND_TO_ST_CHARLES_PLACE:
+                self._send_player(game, player, policy, pos.Position.ST_CHARLES_PLACE)
+            case Action.SEND_TO_READING_RAILROAD:
+                self._send_player(game, player, policy, pos.Position.READING_RAILROAD)
+            case Action.SEND_TO_NEAREST_RAILROAD:
+                self._send_player(game, player, policy, pos.Position.RAILROADS)
+            case Action.SEND_TO_NEAREST_UTILITY:
+                self._send_player(game, player, policy, pos.Position.UTILITIES)
+            case Action.SEND_BACK_THREE_SPACES:
+                self._move(game, steps=-3)
+                self._resolve_space(game, player, policy)
+            case Action.SEND_TO_JAIL:
+                game.send_player_to_jail()
+            case Action.COLLECT_JAIL_CARD:
+                game.add_player_jail_card(player.uid, drawn_card)
+            case Action.CHARGE_GENERAL_REPAIR_FEE | Action.CHARGE_STREET_REPAIR_FEE:
+                if card_action is Action.CHARGE_GENERAL_REPAIR_FEE:
+                    house_fee = c.CONST_GENERAL_REPAIR_HOUSE
+                    hotel_fee = c.CONST_GENERAL_REPAIR_HOTEL
+                else:
+                    house_fee = c.CONST_STREET_REPAIR_HOUSE
+                    hotel_fee = c.CONST_STREET_REPAIR_HOTEL
+                house_count, hotel_count = game.get_player_house_and_hotel_counts(
+                    player.uid
+                )
+                self._pay(
+                    game, player, house_count * house_fee + hotel_count * hotel_fee
+                )
+            case Action.PAY_CHAIRMAN_FEE:
+                for o_player in game.active_players:
+                    if o_player.uid != player.uid and player.active:
+                        self._pay(game, player, c.CONST_CHAIRMAN_FEE, o_player.uid)
+            case Action.COLLECT_GRAND_OPERA_NIGHT | Action.COLLECT_BIRTHDAY:
+                if card_action is Action.COLLECT_GRAND_OPERA_NIGHT:
+                    amount = c.CONST_GRAND_OPERA_NIGHT
+                else:
+                    amount = c.CONST_BIRTHDAY
+                for o_player in game.active_players:
+                    if o_player.uid != player.uid:
+                        self._pay(game, o_player, amount, player.uid)
+            case _:
+                amount = _CARD_CASH.get(card_action)
+                if amount is None:  # pragma: no cover
+                    raise ValueError(f"Unknown action {card_action} in chance card")
+                if amount >= 0:
+                    game.add_player_cash(player.uid, amount)
+                else:
+                    self._pay(game, player, -amount)
+
+
+# cards that only add or charge a fixed amount, negative to charge
+_CARD_CASH: dict[Action, int] = {
+    Action.COLLECT_DIVIDEND: c.CONST_COLLECT_DIVIDEND,
+    Action.CHARGE_POOR_TAX: -c.CONST_POOR_TAX,
+    Action.COLLECT_LOAN: c.CONST_COLLECT_LOAN,
+    Action.COLLECT_BANK_ERROR: c.CONST_COLLECT_BANK_ERROR,
+    Action.CHARGE_DOCTOR_FEE: -c.CONST_DOCTOR_FEE,
+    Action.COLLECT_STOCK_SALE: c.CONST_COLLECT_STOCK_SALE,
+    Action.COLLECT_HOLIDAY_FUND: c.CONST_COLLECT_HOLIDAY_FUND,
+    Action.COLLECT_TAX_REFUND: c.CONST_COLLECT_TAX_REFUND,
+    Action.COLLECT_INSURANCE: c.CONST_COLLECT_INSURANCE,
+    Action.CHARGE_HOSPITAL_FEE: -c.CONST_HOSPITAL_FEE,
+    Action.CHARGE_SCHOOL_FEE: -c.CONST_SCHOOL_FEE,
+    Action.COLLECT_CONSULTANCY_FEE: c.CONST_COLLECT_CONSULTANCY_FEE,
+    Action.COLLECT_CONTEST_PRIZE: c.CONST_COLLECT_CONTEST_PRIZE,
+    Action.COLLECT_INHERITANCE: c.CONST_COLLECT_INHERITANCE,
+}
@@ -19,8 +19,14 @@ class Property(Space):
     owner_uid: Optional[int] = None
 
     def assign_owner(self, player_uid: int) -> None:
-        self.owner_uid = player_uid
-        self.property_set.update_monopoly()
+        prev_owner_uid, self.owner_uid = self.owner_uid, player_uid
+        self.property_set.change_owner(prev_owner_uid, player_uid)
+
+    def remove_owner(self) -> None:
+        """Return the property to the bank, e.g. after the owner went bankrupt"""
+        prev_owner_uid, self.owner_uid = self.owner_uid, None
+        self.mortgaged = False
+        self.property_set.change_owner(prev_owner_uid, None)
 
     @property
     def mortgage_value(self) -> int:
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from game import space
 
@@ -14,31 +14,60 @@ class PropertySet:
     id: int
     properties: list[Property] = field(default_factory=list)
     monopoly: bool = False
+    # owner_uid, number of properties owned, kept up to date by change_owner
+    _owner_counts: dict[int, int] = field(default_factory=dict, init=False, repr=False)
+
+    @property
+    def monopoly_owner(self) -> Optional[int]:
+        """Return the owner of all properties of the set, None if there is none"""
+        if not self.monopoly:
+            return None
+        return self.properties[0].owner_uid
 
     def add_property(self, property: Property) -> None:
         self.properties.append(property)
+        if property.owner_uid is not None:
+            self._add_count(property.owner_uid, 1)
+        self._refresh_monopoly()
+
+    def change_owner(
+        self, prev_owner_uid: Optional[int], new_owner_uid: Optional[int]
+    ) -> None:
+        """Record that a property of the set changed from prev_owner_uid to
+        new_owner_uid, None being the bank. Update the counts and monopoly in O(1)"""
+        if prev_owner_uid is not None:
+            self._add_count(prev_owner_uid, -1)
+        if new_owner_uid is not None:
+            self._add_count(new_owner_uid, 1)
+        self._refresh_monopoly()
 
     def update_monopoly(self):
-        if len(self.properties) == 0:
-            self.monopoly = False
-            return
-
-        owner_uid = self.properties[0].owner_uid
-        for property_ in self.properties[1:]:
-            if property_.owner_uid is None or property_.owner_uid != owner_uid:
-                self.monopoly = False
-                return
-        self.monopoly = True
-
-    def count_owned(self, owner_uid: int):
+        """Recount the owners of every property, e.g. after setting owner_uid
+        without assign_owner or remove_owner"""
+        self._owner_counts = {}
+        for property_ in self.properties:
+            if property_.owner_uid is not None:
+                self._add_count(property_.owner_uid, 1)
+        self._refresh_monopoly()
+
+    def _add_count(self, owner_uid: int, delta: int) -> None:
+        count = self._owner_counts.get(owner_uid, 0) + delta
+        if count == 0:
+            del self._owner_counts[owner_uid]
+        else:
+            self._owner_counts[owner_uid] = count
+
+    def _refresh_monopoly(self) -> None:
+        counts = self._owner_counts
+        self.monopoly = len(counts) == 1 and next(iter(counts.values())) == len(
+            self.properties
+        )
+
+    def count_owned(self, owner_uid: int) -> int:
         """
         Return the number of properties owned by this owner
         """
-        count = 0
-        for property_ in self.properties:
-            if property_.owner_uid == owner_uid:
-                count += 1
-        return count
+        return self._owner_counts.get(owner_uid, 0)
 
     def count_houses_and_hotels(self) -> tuple[int, int]:
         """
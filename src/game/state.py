@@ -0,0 +1,342 @@
+"""
+Compact, fixed-layout encoding of the mutable state of a Game.
+
+GameState keeps the state in flat typed arrays instead of the object graph of
+Player, Property, PropertySet and Deck:
+- per player: cash, position, jail turns, token and whether still in the game
+- per board position: owner byte, house level and a mortgage bit
+- the purchase order of the properties, the jail cards held and both decks as
+  card ids in draw order (the head of the deque being the next card)
+- turn scalars: current player, dice, double counter and the running auction
+- optionally the state of Game.rng, including the dice pre-generated by GameRng
+
+Derived data (PropertySet.monopoly, the owner counts and the player totals) is not
+stored and is recomputed by decode. to_bytes packs the state in a single buffer,
+e.g. to hash it or to send it to another process.
+"""
+
+import struct
+import sys
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import constants as c
+from game import card, data, game_initializer, space
+from game.data.chance_cards import CardData
+from game.game import Game
+from game.player import Player
+from game.rng import GameRng
+
+BANK = 0xFF  # owner byte of the properties owned by the bank and other spaces
+NONE = -1  # encoded None of the optional integers
+
+# current player, bid price, bid property id, dice 1, dice 2, double uid, double count
+_N_SCALARS = 7
+# players, positions, property order, jail cards, chance cards, cc cards, bidders,
+# rng words, has gauss_next, pending dice, dice block size, name bytes
+_HEADER = struct.Struct("<12I")
+
+_CARD_DATA: dict[int, CardData] = {
+    card_data["id"]: card_data
+    for card_data in (*data.CONST_CHANCE_CARDS, *data.CONST_CC_CARDS)
+}
+_CARDS: dict[int, card.ChanceCard] = {}  # shared by every decoded game
+_SWAP_BYTES = sys.byteorder != "little"  # buffers are little-endian
+
+
+@dataclass(kw_only=True, slots=True)
+class GameState:
+    names: tuple[str, ...]
+    cash: array = field(default_factory=lambda: array("q"))
+    position: array = field(default_factory=lambda: array("B"))
+    jail_turns: array = field(default_factory=lambda: array("b"))  # NONE if free
+    token: array = field(default_factory=lambda: array("h"))  # NONE if unassigned
+    active: array = field(default_factory=lambda: array("B"))
+    owner: array = field(default_factory=lambda: array("B"))  # by position
+    house_level: array = field(default_factory=lambda: array("B"))  # hotel: limit + 1
+    mortgaged: bytearray = field(default_factory=bytearray)  # bit set by position
+    property_order: array = field(default_factory=lambda: array("B"))  # positions
+    jail_cards: array = field(default_factory=lambda: array("h"))  # (uid, card id)
+    chance_cards: array = field(default_factory=lambda: array("h"))  # draw order
+    cc_cards: array = field(default_factory=lambda: array("h"))  # draw order
+    bidders: array = field(default_factory=lambda: array("B"))  # uids in bid order
+    scalars: array = field(default_factory=lambda: array("q", [NONE] * _N_SCALARS))
+    rng_state: Optional[tuple] = None  # GameRng.getstate()
+
+    @property
+    def n_players(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_positions(self) -> int:
+        return len(self.owner)
+
+    def is_mortgaged(self, position: int) -> bool:
+        return bool(self.mortgaged[position >> 3] & (1 << (position & 7)))
+
+    def to_bytes(self) -> bytes:
+        """Pack the state in a single little-endian buffer"""
+        name_bytes = b"\x00".join(name.encode() for name in self.names)
+        rng_words = array("I")
+        gauss_next: Optional[float] = None
+        pending_dice = b""
+        block_size = 0
+        if self.rng_state is not None:
+            random_state, pending_dice, block_size = self.rng_state
+            _version, internal_state, gauss_next = random_state
+            rng_words.extend(internal_state)
+        header = _HEADER.pack(
+            self.n_players,
+            self.n_positions,
+            len(self.property_order),
+            len(self.jail_cards) // 2,
+            len(self.chance_cards),
+            len(self.cc_cards),
+            len(self.bidders),
+            len(rng_words),
+            gauss_next is not None,
+            len(pending_dice),
+            block_size,
+            len(name_bytes),
+        )
+        parts = [header, name_bytes]
+        parts.extend(_to_bytes(values) for values in self._arrays())
+        parts.append(bytes(self.mortgaged))
+        parts.append(_to_bytes(rng_words))
+        if gauss_next is not None:
+            parts.append(struct.pack("<d", gauss_next))
+        parts.append(pending_dice)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes) -> "GameState":
+        (
+            n_players,
+            n_positions,
+            n_owned,
+            n_jail_cards,
+            n_chance,
+            n_cc,
+            n_bidders,
+            n_rng_words,
+            has_gauss_next,
+            n_pending_dice,
+            block_size,
+            n_name_bytes,
+        ) = _HEADER.unpack_from(buffer)
+        offset = _HEADER.size
+        names = buffer[offset : offset + n_name_bytes].decode().split("\x00")
+        offset += n_name_bytes
+        state = cls(names=tuple(names) if n_players > 0 else ())
+        lengths = (
+            n_players,
+            n_players,
+            n_players,
+            n_players,
+            n_players,
+            n_positions,
+            n_positions,
+            n_owned,
+            n_jail_cards * 2,
+            n_chance,
+            n_cc,
+            n_bidders,
+            _N_SCALARS,
+        )
+        for values, length in zip(state._arrays(), lengths):
+            del values[:]  # drop the defaults, keep the typecode
+            offset = _from_bytes(values, buffer, offset, length)
+        n_mortgage_bytes = (n_positions + 7) // 8
+        state.mortgaged = bytearray(buffer[offset : offset + n_mortgage_bytes])
+        offset += n_mortgage_bytes
+        if n_rng_words > 0:
+            rng_words = array("I")
+            offset = _from_bytes(rng_words, buffer, offset, n_rng_words)
+            gauss_next = None
+            if has_gauss_next:
+                (gauss_next,) = struct.unpack_from("<d", buffer, offset)
+                offset += 8
+            pending_dice = bytes(buffer[offset : offset + n_pending_dice])
+            random_state = (3, tuple(rng_words), gauss_next)
+            state.rng_state = (random_state, pending_dice, block_size)
+        return state
+
+    def _arrays(self) -> tuple[array, ...]:
+        """Arrays in buffer order"""
+        return (
+            self.cash,
+            self.position,
+            self.jail_turns,
+            self.token,
+            self.active,
+            self.owner,
+            self.house_level,
+            self.property_order,
+            self.jail_cards,
+            self.chance_cards,
+            self.cc_cards,
+            self.bidders,
+            self.scalars,
+        )
+
+
+def encode(game: Game, include_rng: bool = True) -> GameState:
+    """Return the compact state of the game"""
+    game_map = game.game_map
+    state = GameState(names=tuple(player.name for player in game.players))
+    for player in game.players:
+        state.cash.append(player.cash)
+        state.position.append(player.position)
+        state.jail_turns.append(
+            NONE if player.jail_turns is None else player.jail_turns
+        )
+        state.token.append(NONE if player.token is None else player.token)
+        state.active.append(player.active)
+        for property_ in player.properties:
+            state.property_order.append(game_map.get_property_position(property_.id))
+        for jail_card in player.jail_cards:
+            state.jail_cards.extend((player.uid, jail_card.id))
+
+    state.owner = array("B", bytes([BANK]) * game_map.size)
+    state.house_level = array("B", bytes(game_map.size))
+    state.mortgaged = bytearray((game_map.size + 7) // 8)
+    for position, map_space in enumerate(game_map.map_list):
+        if not isinstance(map_space, space.Property):
+            continue
+        if map_space.owner_uid is not None:
+            state.owner[position] = map_space.owner_uid
+        if map_space.mortgaged:
+            state.mortgaged[position >> 3] |= 1 << (position & 7)
+        if isinstance(map_space, space.PropertySpace):
+            state.house_level[position] = map_space.no_of_houses + (
+                map_space.no_of_hotels * (map_space.HOUSE_LIMIT + 1)
+            )
+
+    state.chance_cards.extend(chance_card.id for chance_card in game.chance_deck.cards)
+    state.cc_cards.extend(cc_card.id for cc_card in game.cc_deck.cards)
+    state.bidders.extend(bidder.uid for bidder in game.bidders)
+
+    scalars = state.scalars
+    scalars[0] = getattr(game, "current_player_uid", NONE)
+    scalars[1] = game.current_bid_price
+    if game.current_bid_property is not None:
+        scalars[2] = game.current_bid_property.id
+    if game.last_dice_rolls is not None:
+        scalars[3], scalars[4] = game.last_dice_rolls
+    if game._roll_double_counter is not None:
+        scalars[5], scalars[6] = game._roll_double_counter
+
+    if include_rng:
+        state.rng_state = game.rng.getstate()
+    return state
+
+
+def decode(state: GameState, game: Optional[Game] = None) -> Game:
+    """Return a Game in the state. If game is given, its objects are reused and
+    overwritten, which avoids building the map and the players again."""
+    if game is None:
+        game = Game()
+        game.game_map = game_initializer.build_game_map(
+            HOUSE_LIMIT=c.CONST_HOUSE_LIMIT, HOTEL_LIMIT=c.CONST_HOTEL_LIMIT
+        )
+        game.players = [
+            Player(name=name, uid=uid, cash=0) for uid, name in enumerate(state.names)
+        ]
+        game.chance_deck = card.Deck(name="Chance Cards")
+        game.cc_deck = card.Deck(name="Community Chest Cards")
+    game_map = game.game_map
+    if game_map.size != state.n_positions:
+        raise ValueError(
+            f"State of {state.n_positions} positions does not fit "
+            f"a map of {game_map.size}"
+        )
+    if len(game.players) != state.n_players:
+        raise ValueError(
+            f"State of {state.n_players} players does not fit "
+            f"{len(game.players)} players"
+        )
+
+    for uid, player in enumerate(game.players):
+        player.name = state.names[uid]
+        player.cash = state.cash[uid]
+        player.position = state.position[uid]
+        jail_turns = state.jail_turns[uid]
+        player.jail_turns = None if jail_turns == NONE else jail_turns
+        token = state.token[uid]
+        player.token = None if token == NONE else token
+        player.active = bool(state.active[uid])
+        player.properties = []
+        player.jail_cards = []
+
+    property_sets: dict[int, space.PropertySet] = {}
+    for position, map_space in enumerate(game_map.map_list):
+        if not isinstance(map_space, space.Property):
+            continue
+        owner = state.owner[position]
+        map_space.owner_uid = None if owner == BANK else owner
+        map_space.mortgaged = state.is_mortgaged(position)
+        if isinstance(map_space, space.PropertySpace):
+            level = state.house_level[position]
+            if level > map_space.HOUSE_LIMIT:
+                map_space.no_of_houses, map_space.no_of_hotels = 0, 1
+            else:
+                map_space.no_of_houses, map_space.no_of_hotels = level, 0
+        property_sets[id(map_space.property_set)] = map_space.property_set
+    for property_set in property_sets.values():
+        property_set.update_monopoly()
+
+    for position in state.property_order:
+        property_ = game_map.map_list[position]
+        assert isinstance(property_, space.Property)
+        if property_.owner_uid is None:
+            raise ValueError(f"Property at position {position} has no owner")
+        game.players[property_.owner_uid].properties.append(property_)
+    jail_cards = state.jail_cards
+    for idx in range(0, len(jail_cards), 2):
+        game.players[jail_cards[idx]].jail_cards.append(_get_card(jail_cards[idx + 1]))
+
+    game.chance_deck.cards = deque(_get_card(card_id) for card_id in state.chance_cards)
+    game.cc_deck.cards = deque(_get_card(card_id) for card_id in state.cc_cards)
+    game.bidders = deque(game.players[uid] for uid in state.bidders)
+
+    scalars = state.scalars
+    if scalars[0] != NONE:
+        game.current_player_uid = scalars[0]
+    game.current_bid_price = scalars[1]
+    game.current_bid_property = None
+    if scalars[2] != NONE:
+        game.current_bid_property = game_map.get_property(scalars[2])
+    game.last_dice_rolls = None if scalars[3] == NONE else (scalars[3], scalars[4])
+    game._roll_double_counter = None if scalars[5] == NONE else (scalars[5], scalars[6])
+
+    if state.rng_state is not None:
+        if not isinstance(game.rng, GameRng):  # fresh game or a plain random.Random
+            game.rng = GameRng()
+        game.rng.setstate(state.rng_state)
+    game.recompute_player_totals()
+    return game
+
+
+def _get_card(card_id: int) -> card.ChanceCard:
+    """Cards never change, so the decoded decks can share them"""
+    cached = _CARDS.get(card_id)
+    if cached is None:
+        cached = _CARDS[card_id] = card.ChanceCard(**_CARD_DATA[card_id])
+    return cached
+
+
+def _to_bytes(values: array) -> bytes:
+    if _SWAP_BYTES and values.itemsize > 1:  # pragma: no cover
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(values: array, buffer: bytes, offset: int, length: int) -> int:
+    end = offset + length * values.itemsize
+    values.frombytes(buffer[offset:end])
+    if _SWAP_BYTES and values.itemsize > 1:  # pragma: no cover
+        values.byteswap()
+    return end
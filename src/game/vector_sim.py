@@ -0,0 +1,610 @@
+"""
+Structure-of-arrays simulator that advances N games in lockstep with NumPy.
+
+Every step rolls the dice once for the current player of every unfinished game.
+Positions, cash, ownership, house levels and decks are NumPy arrays indexed by
+(game, ...), so a step costs a fixed number of array operations regardless of N.
+
+The rules are the ones of sim.Simulator with a fixed policy:
+- Movement and Go salary follow Game.move_player and Game.check_go_pass.
+- Rent follows PropertySpace, RailroadSpace and UtilitySpace.compute_rent.
+- Landed properties are bought when affordable and never auctioned.
+- Jail is left straight away with a jail card, otherwise by paying the fine.
+- Payments that cannot be afforded bankrupt the player, nothing is mortgaged.
+- Houses are never built, but house levels set beforehand are charged for.
+
+Bankruptcies are rare, so they are handled one game at a time in Python.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+import constants as c
+from game import data, enum_types, game_initializer, space
+from game import positions as pos
+from game.actions import Action
+from game.data.chance_cards import CardData
+
+# space kinds
+NOTHING = 0
+PROPERTY = 1
+RAILROAD = 2
+UTILITY = 3
+CHANCE = 4
+CC = 5
+INCOME_TAX = 6
+LUXURY_TAX = 7
+GO_TO_JAIL = 8
+
+# card effects
+CARD_NOTHING = 0
+CARD_MOVE_TO = 1  # value: position
+CARD_NEAREST_RAILROAD = 2
+CARD_NEAREST_UTILITY = 3
+CARD_BACK_THREE = 4
+CARD_JAIL = 5
+CARD_CASH = 6  # value: amount, negative to pay the bank
+CARD_PAY_EACH = 7  # value: amount paid to each other player
+CARD_COLLECT_EACH = 8  # value: amount collected from each other player
+CARD_GENERAL_REPAIR = 9
+CARD_STREET_REPAIR = 10
+
+HOTEL_LEVEL = c.CONST_HOUSE_LIMIT + 1  # house level of a property with a hotel
+MAX_SET_SIZE = 4
+
+_CARD_EFFECTS: dict[Action, tuple[int, int]] = {
+    Action.SEND_TO_BOARDWALK: (CARD_MOVE_TO, pos.Position.BOARDWALK.value),
+    Action.SEND_TO_GO: (CARD_MOVE_TO, pos.Position.GO.value),
+    Action.SEND_TO_ILLINOIS_AVE: (CARD_MOVE_TO, pos.Position.ILLINOIS_AVE.value),
+    Action.SEND_TO_ST_CHARLES_PLACE: (
+        CARD_MOVE_TO,
+        pos.Position.ST_CHARLES_PLACE.value,
+    ),
+    Action.SEND_TO_READING_RAILROAD: (
+        CARD_MOVE_TO,
+        pos.Position.READING_RAILROAD.value,
+    ),
+    Action.SEND_TO_NEAREST_RAILROAD: (CARD_NEAREST_RAILROAD, 0),
+    Action.SEND_TO_NEAREST_UTILITY: (CARD_NEAREST_UTILITY, 0),
+    Action.SEND_BACK_THREE_SPACES: (CARD_BACK_THREE, 0),
+    Action.SEND_TO_JAIL: (CARD_JAIL, 0),
+    Action.COLLECT_JAIL_CARD: (CARD_NOTHING, 0),
+    Action.CHARGE_GENERAL_REPAIR_FEE: (CARD_GENERAL_REPAIR, 0),
+    Action.CHARGE_STREET_REPAIR_FEE: (CARD_STREET_REPAIR, 0),
+    Action.PAY_CHAIRMAN_FEE: (CARD_PAY_EACH, c.CONST_CHAIRMAN_FEE),
+    Action.COLLECT_GRAND_OPERA_NIGHT: (CARD_COLLECT_EACH, c.CONST_GRAND_OPERA_NIGHT),
+    Action.COLLECT_BIRTHDAY: (CARD_COLLECT_EACH, c.CONST_BIRTHDAY),
+    Action.COLLECT_DIVIDEND: (CARD_CASH, c.CONST_COLLECT_DIVIDEND),
+    Action.CHARGE_POOR_TAX: (CARD_CASH, -c.CONST_POOR_TAX),
+    Action.COLLECT_LOAN: (CARD_CASH, c.CONST_COLLECT_LOAN),
+    Action.COLLECT_BANK_ERROR: (CARD_CASH, c.CONST_COLLECT_BANK_ERROR),
+    Action.CHARGE_DOCTOR_FEE: (CARD_CASH, -c.CONST_DOCTOR_FEE),
+    Action.COLLECT_STOCK_SALE: (CARD_CASH, c.CONST_COLLECT_STOCK_SALE),
+    Action.COLLECT_HOLIDAY_FUND: (CARD_CASH, c.CONST_COLLECT_HOLIDAY_FUND),
+    Action.COLLECT_TAX_REFUND: (CARD_CASH, c.CONST_COLLECT_TAX_REFUND),
+    Action.COLLECT_INSURANCE: (CARD_CASH, c.CONST_COLLECT_INSURANCE),
+    Action.CHARGE_HOSPITAL_FEE: (CARD_CASH, -c.CONST_HOSPITAL_FEE),
+    Action.CHARGE_SCHOOL_FEE: (CARD_CASH, -c.CONST_SCHOOL_FEE),
+    Action.COLLECT_CONSULTANCY_FEE: (CARD_CASH, c.CONST_COLLECT_CONSULTANCY_FEE),
+    Action.COLLECT_CONTEST_PRIZE: (CARD_CASH, c.CONST_COLLECT_CONTEST_PRIZE),
+    Action.COLLECT_INHERITANCE: (CARD_CASH, c.CONST_COLLECT_INHERITANCE),
+}
+
+
+@dataclass(kw_only=True, slots=True)
+class BoardTables:
+    """Static lookup tables of the board, indexed by position"""
+
+    kind: np.ndarray
+    price: np.ndarray
+    rent: np.ndarray  # [position, house level]
+    set_members: np.ndarray  # [position, MAX_SET_SIZE], padded with the position
+    set_size: np.ndarray
+    nearest_railroad: np.ndarray
+    nearest_utility: np.ndarray
+    property_ids: np.ndarray  # -1 if not a property
+
+    @classmethod
+    def from_game_map(cls) -> "BoardTables":
+        game_map = game_initializer.build_game_map(
+            HOUSE_LIMIT=c.CONST_HOUSE_LIMIT, HOTEL_LIMIT=c.CONST_HOTEL_LIMIT
+        )
+        size = game_map.size
+        kind = np.zeros(size, dtype=np.int8)
+        price = np.zeros(size, dtype=np.int64)
+        rent = np.zeros((size, HOTEL_LEVEL + 1), dtype=np.int64)
+        property_ids = np.full(size, -1, dtype=np.int64)
+        set_positions: dict[int, list[int]] = {}
+        set_of_position: dict[int, int] = {}
+        for position, map_space in enumerate(game_map.map_list):
+            if isinstance(map_space, space.Property):
+                price[position] = map_space.price
+                property_ids[position] = map_space.id
+                set_positions.setdefault(map_space.property_set_id, []).append(position)
+                set_of_position[position] = map_space.property_set_id
+            if isinstance(map_space, space.PropertySpace):
+                kind[position] = PROPERTY
+                rent[position, : len(map_space.rent)] = map_space.rent
+            elif isinstance(map_space, space.RailroadSpace):
+                kind[position] = RAILROAD
+                rent[position, : len(map_space.rent)] = map_space.rent
+            elif isinstance(map_space, space.UtilitySpace):
+                kind[position] = UTILITY
+            elif isinstance(map_space, space.DrawSpace):
+                if map_space.deck_type is enum_types.DeckType.CHANCE:
+                    kind[position] = CHANCE
+                else:
+                    kind[position] = CC
+            elif isinstance(map_space, space.TaxSpace):
+                if map_space.tax_type is enum_types.TaxType.INCOME:
+                    kind[position] = INCOME_TAX
+                else:
+                    kind[position] = LUXURY_TAX
+            elif isinstance(map_space, space.JailSpace):
+                kind[position] = GO_TO_JAIL
+
+        set_members = np.tile(np.arange(size)[:, None], (1, MAX_SET_SIZE))
+        set_size = np.zeros(size, dtype=np.int64)
+        for position, set_id in set_of_position.items():
+            members = set_positions[set_id]
+            set_members[position, : len(members)] = members
+            set_size[position] = len(members)
+
+        nearest_railroad = np.array(
+            [
+                pos.find_nearest_position(position, pos.Position.RAILROADS.value)
+                for position in range(size)
+            ]
+        )
+        nearest_utility = np.array(
+            [
+                pos.find_nearest_position(position, pos.Position.UTILITIES.value)
+                for position in range(size)
+            ]
+        )
+        return cls(
+            kind=kind,
+            price=price,
+            rent=rent,
+            set_members=set_members,
+            set_size=set_size,
+            nearest_railroad=nearest_railroad,
+            nearest_utility=nearest_utility,
+            property_ids=property_ids,
+        )
+
+
+@dataclass(kw_only=True, slots=True)
+class DeckTables:
+    """Static card tables of one deck, indexed by position in data"""
+
+    card_ids: np.ndarray
+    effect: np.ndarray
+    value: np.ndarray
+    ownable: np.ndarray
+
+    @classmethod
+    def from_data(cls, cards: list[CardData]) -> "DeckTables":
+        effects = [_CARD_EFFECTS[card["action"]] for card in cards]
+        return cls(
+            card_ids=np.array([card["id"] for card in cards]),
+            effect=np.array([effect for effect, _value in effects], dtype=np.int8),
+            value=np.array([value for _effect, value in effects], dtype=np.int64),
+            ownable=np.array([card["ownable"] for card in cards]),
+        )
+
+
+@dataclass(kw_only=True, slots=True)
+class VectorStats:
+    games: int
+    turns: int
+    steps: int
+    timeouts: int
+    wins: list[int]  # win count by player seat
+    landings: np.ndarray  # landing count by position, including card moves
+    elapsed: float  # seconds
+
+    @property
+    def games_per_sec(self) -> float:
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def turns_per_sec(self) -> float:
+        return self.turns / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@dataclass(kw_only=True, slots=True)
+class VectorSimulator:
+    n_games: int
+    n_players: int = 4
+    seed: Optional[int] = None
+    starting_cash: int = c.CONST_SIM_STARTING_CASH
+    max_turns: int = c.CONST_SIM_MAX_TURNS
+    record_dice: bool = False  # keep (games, dice) of every step in dice_log
+
+    board: BoardTables = field(init=False)
+    decks: tuple[DeckTables, DeckTables] = field(init=False)  # chance, cc
+    rng: np.random.Generator = field(init=False)
+
+    # per game
+    current: np.ndarray = field(init=False)
+    doubles: np.ndarray = field(init=False)
+    last_roll: np.ndarray = field(init=False)
+    turns: np.ndarray = field(init=False)
+    finished: np.ndarray = field(init=False)
+    # per game and player
+    position: np.ndarray = field(init=False)
+    cash: np.ndarray = field(init=False)
+    active: np.ndarray = field(init=False)
+    in_jail: np.ndarray = field(init=False)
+    jail_cards: np.ndarray = field(init=False)  # [game, player, deck], 0 if not held
+    # per game and position
+    owner: np.ndarray = field(init=False)  # -1 if owned by the bank
+    houses: np.ndarray = field(init=False)  # HOTEL_LEVEL for a hotel
+    mortgaged: np.ndarray = field(init=False)
+    # per game and deck, as circular buffers of card indices
+    deck_cards: list[np.ndarray] = field(init=False)
+    deck_head: np.ndarray = field(init=False)
+    deck_size: np.ndarray = field(init=False)
+    card_stamp: np.ndarray = field(init=False)  # acquisition order of jail cards
+
+    steps: int = field(init=False)
+    landings: np.ndarray = field(init=False)
+    dice_log: list[tuple[np.ndarray, np.ndarray]] = field(init=False)
+
+    def __post_init__(self):
+        self.board = BoardTables.from_game_map()
+        self.decks = (
+            DeckTables.from_data(data.CONST_CHANCE_CARDS),
+            DeckTables.from_data(data.CONST_CC_CARDS),
+        )
+        self.rng = np.random.default_rng(self.seed)
+        self.reset()
+
+    def reset(self) -> None:
+        n, p, size = self.n_games, self.n_players, len(self.board.kind)
+        self.current = self.rng.integers(0, p, size=n)
+        self.doubles = np.zeros(n, dtype=np.int64)
+        self.last_roll = np.zeros(n, dtype=np.int64)
+        self.turns = np.zeros(n, dtype=np.int64)
+        self.finished = np.zeros(n, dtype=bool)
+        self.position = np.zeros((n, p), dtype=np.int64)
+        self.cash = np.full((n, p), self.starting_cash, dtype=np.int64)
+        self.active = np.ones((n, p), dtype=bool)
+        self.in_jail = np.zeros((n, p), dtype=bool)
+        self.jail_cards = np.zeros((n, p, 2), dtype=np.int64)
+        self.owner = np.full((n, size), -1, dtype=np.int64)
+        self.houses = np.zeros((n, size), dtype=np.int64)
+        self.mortgaged = np.zeros((n, size), dtype=bool)
+        self.deck_cards = [
+            self.rng.permuted(np.tile(np.arange(len(deck.effect)), (n, 1)), axis=1)
+            for deck in self.decks
+        ]
+        self.deck_head = np.zeros((n, 2), dtype=np.int64)
+        self.deck_size = np.array(
+            [[len(deck.effect) for deck in self.decks]] * n, dtype=np.int64
+        )
+        self.card_stamp = np.zeros(n, dtype=np.int64)
+        self.steps = 0
+        self.landings = np.zeros(size, dtype=np.int64)
+        self.dice_log = []
+
+    @property
+    def winners(self) -> np.ndarray:
+        """Seat of the winner by game, -1 if unfinished or stopped by the turn limit"""
+        single = self.active.sum(axis=1) == 1
+        return np.where(self.finished & single, self.active.argmax(axis=1), -1)
+
+    def run(self) -> VectorStats:
+        """Step until every game is finished"""
+        start = time.perf_counter()
+        while not self.finished.all():
+            self.step()
+        elapsed = time.perf_counter() - start
+        winners = self.winners
+        return VectorStats(
+            games=self.n_games,
+            turns=int(self.turns.sum()),
+            steps=self.steps,
+            timeouts=int((winners < 0).sum()),
+            wins=np.bincount(winners[winners >= 0], minlength=self.n_players).tolist(),
+            landings=self.landings.copy(),
+            elapsed=elapsed,
+        )
+
+    def step(self) -> None:
+        """Roll once for the current player of every unfinished game"""
+        g = np.flatnonzero(~self.finished)
+        if g.size == 0:
+            return
+        self.steps += 1
+        p = self.current[g]
+
+        jailed = self.in_jail[g, p]
+        if jailed.any():
+            self._leave_jail(g[jailed], p[jailed])
+
+        rolling = self.active[g, p]
+        r, pr = g[rolling], p[rolling]
+        dice = self.rng.integers(1, 7, size=(r.size, 2))
+        if self.record_dice:
+            self.dice_log.append((r.copy(), dice.copy()))
+
+        is_double = dice[:, 0] == dice[:, 1]
+        self.doubles[r] = np.where(is_double, self.doubles[r] + 1, 0)
+        to_jail = self.doubles[r] >= c.CONST_MAX_DOUBLE_ROLL
+        if to_jail.any():
+            self._send_to_jail(r[to_jail], pr[to_jail])
+        moving = ~to_jail
+        rm, pm = r[moving], pr[moving]
+        steps = dice[moving].sum(axis=1)
+        self.last_roll[rm] = steps
+        self._move_steps(rm, pm, steps)
+        self._resolve(rm, pm)
+
+        again = self.active[g, p] & ~self.in_jail[g, p] & (self.doubles[g] > 0)
+        self._end_turn(g[~again])
+
+    def _end_turn(self, g: np.ndarray) -> None:
+        """Pass the turn to the next active player, same as Game.get_next_player"""
+        self.turns[g] += 1
+        self.doubles[g] = 0
+        nxt = self.current[g]
+        found = np.zeros(g.size, dtype=bool)
+        for _ in range(self.n_players):
+            nxt = np.where(found, nxt, (nxt + 1) % self.n_players)
+            found = self.active[g, nxt]
+        self.current[g] = nxt
+        self.finished[g] = (self.active[g].sum(axis=1) <= 1) | (
+            self.turns[g] >= self.max_turns
+        )
+
+    def _send_to_jail(self, g: np.ndarray, p: np.ndarray) -> None:
+        self.position[g, p] = pos.Position.JAIL.value
+        self.in_jail[g, p] = True
+        self.doubles[g] = 0
+
+    def _leave_jail(self, g: np.ndarray, p: np.ndarray) -> None:
+        """Use the earliest collected jail card, otherwise pay the fine"""
+        chance, cc = self.jail_cards[g, p, 0], self.jail_cards[g, p, 1]
+        use_chance = (chance > 0) & ((cc == 0) | (chance < cc))
+        use_cc = (cc > 0) & ~use_chance
+        for deck_idx, use in ((0, use_chance), (1, use_cc)):
+            if use.any():
+                self._return_jail_card(g[use], p[use], deck_idx)
+        pay = ~(use_chance | use_cc)
+        if pay.any():
+            fine = np.full(pay.sum(), c.CONST_JAIL_FINE)
+            self._pay(g[pay], p[pay], fine, np.full(pay.sum(), -1))
+        self.in_jail[g, p] = False
+
+    def _return_jail_card(self, g: np.ndarray, p: np.ndarray, deck_idx: int) -> None:
+        card = np.flatnonzero(self.decks[deck_idx].ownable)[0]
+        self._append_card(g, deck_idx, np.full(g.size, card))
+        self.jail_cards[g, p, deck_idx] = 0
+
+    def _append_card(self, g: np.ndarray, deck_idx: int, cards: np.ndarray) -> None:
+        capacity = len(self.decks[deck_idx].effect)
+        tail = (self.deck_head[g, deck_idx] + self.deck_size[g, deck_idx]) % capacity
+        self.deck_cards[deck_idx][g, tail] = cards
+        self.deck_size[g, deck_idx] += 1
+
+    def _move_steps(self, g: np.ndarray, p: np.ndarray, steps: np.ndarray) -> None:
+        size = len(self.board.kind)
+        new_pos = self.position[g, p] + steps
+        passed = new_pos >= size
+        self.cash[g[passed], p[passed]] += c.CONST_GO_CASH
+        self.position[g, p] = np.where(passed, new_pos - size, new_pos)
+
+    def _move_to(self, g: np.ndarray, p: np.ndarray, target: np.ndarray) -> None:
+        passed = target < self.position[g, p]
+        self.cash[g[passed], p[passed]] += c.CONST_GO_CASH
+        self.position[g, p] = target
+
+    def _pay(
+        self, g: np.ndarray, p: np.ndarray, amount: np.ndarray, payee: np.ndarray
+    ) -> None:
+        """Pay amount to payee, or the bank where payee is -1.
+        Bankrupt the players who cannot afford it."""
+        paid = self.cash[g, p] >= amount
+        gp, pp, ap, yp = g[paid], p[paid], amount[paid], payee[paid]
+        self.cash[gp, pp] -= ap
+        to_player = yp >= 0
+        self.cash[gp[to_player], yp[to_player]] += ap[to_player]
+        for game, player, creditor in zip(g[~paid], p[~paid], payee[~paid]):
+            self._bankrupt(int(game), int(player), int(creditor))
+
+    def _bankrupt(self, game: int, player: int, creditor: int) -> None:
+        """Same as Game.bankrupt_player for one game"""
+        owned = self.owner[game] == player
+        self.houses[game, owned] = 0
+        if creditor >= 0:
+            self.cash[game, creditor] += max(self.cash[game, player], 0)
+            self.owner[game, owned] = creditor
+        else:
+            self.owner[game, owned] = -1
+            self.mortgaged[game, owned] = False
+        stamps = self.jail_cards[game, player]
+        for deck_idx in np.argsort(
+            np.where(stamps > 0, stamps, np.iinfo(np.int64).max)
+        ):
+            if stamps[deck_idx] > 0:
+                self._return_jail_card(
+                    np.array([game]), np.array([player]), int(deck_idx)
+                )
+        self.cash[game, player] = 0
+        self.active[game, player] = False
+        self.in_jail[game, player] = False
+
+    def _resolve(self, g: np.ndarray, p: np.ndarray) -> None:
+        """Trigger the landed spaces until no card moves the players again"""
+        kind = self.board.kind
+        while g.size > 0:
+            position = self.position[g, p]
+            np.add.at(self.landings, position, 1)
+            landed = kind[position]
+            moved_g: list[np.ndarray] = []
+            moved_p: list[np.ndarray] = []
+
+            m = (landed == PROPERTY) | (landed == RAILROAD) | (landed == UTILITY)
+            if m.any():
+                self._land_on_property(g[m], p[m], position[m])
+            for tax_kind, tax in (
+                (INCOME_TAX, c.CONST_INCOME_TAX),
+                (LUXURY_TAX, c.CONST_LUXURY_TAX),
+            ):
+                m = landed == tax_kind
+                if m.any():
+                    self._pay(g[m], p[m], np.full(m.sum(), tax), np.full(m.sum(), -1))
+            m = landed == GO_TO_JAIL
+            if m.any():
+                self._send_to_jail(g[m], p[m])
+            for deck_idx, deck_kind in ((0, CHANCE), (1, CC)):
+                m = landed == deck_kind
+                if m.any():
+                    mg, mp = self._draw_card(g[m], p[m], deck_idx)
+                    moved_g.append(mg)
+                    moved_p.append(mp)
+
+            if len(moved_g) == 0:
+                return
+            g, p = np.concatenate(moved_g), np.concatenate(moved_p)
+
+    def _land_on_property(
+        self, g: np.ndarray, p: np.ndarray, position: np.ndarray
+    ) -> None:
+        owner = self.owner[g, position]
+        buy = (owner < 0) & (self.cash[g, p] >= self.board.price[position])
+        gb, pb, posb = g[buy], p[buy], position[buy]
+        self.cash[gb, pb] -= self.board.price[posb]
+        self.owner[gb, posb] = pb
+
+        rent_due = (owner >= 0) & (owner != p)
+        if rent_due.any():
+            gr, pr, posr, owr = (
+                g[rent_due],
+                p[rent_due],
+                position[rent_due],
+                owner[rent_due],
+            )
+            self._pay(gr, pr, self.compute_rent(gr, posr), owr)
+
+    def compute_rent(self, g: np.ndarray, position: np.ndarray) -> np.ndarray:
+        """Rent of the owned properties at position, same as the compute_rent methods"""
+        board = self.board
+        owner = self.owner[g, position]
+        members = board.set_members[position]
+        same_owner = self.owner[g[:, None], members] == owner[:, None]
+        monopoly = same_owner.all(axis=1)
+        kind = board.kind[position]
+        level = self.houses[g, position]
+
+        property_rent = board.rent[position, level]
+        property_rent = np.where(
+            (level == 0) & monopoly, property_rent * 2, property_rent
+        )
+        # only railroads use the count, their sets are never padded
+        owned_count = same_owner.sum(axis=1)
+        railroad_rent = board.rent[position, np.maximum(owned_count - 1, 0)]
+        utility_rent = self.last_roll[g] * np.where(monopoly, 10, 4)
+
+        rent = np.select(
+            [kind == PROPERTY, kind == RAILROAD, kind == UTILITY],
+            [property_rent, railroad_rent, utility_rent],
+            0,
+        )
+        return np.where(self.mortgaged[g, position], 0, rent)
+
+    def _draw_card(
+        self, g: np.ndarray, p: np.ndarray, deck_idx: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Draw and apply a card for every game. Return the games whose player moved
+        and needs the new space to be triggered"""
+        deck = self.decks[deck_idx]
+        capacity = len(deck.effect)
+        head = self.deck_head[g, deck_idx]
+        cards = self.deck_cards[deck_idx][g, head]
+        self.deck_head[g, deck_idx] = (head + 1) % capacity
+        self.deck_size[g, deck_idx] -= 1
+        ownable = deck.ownable[cards]
+        if (~ownable).any():
+            self._append_card(g[~ownable], deck_idx, cards[~ownable])
+        if ownable.any():
+            go, po = g[ownable], p[ownable]
+            self.card_stamp[go] += 1
+            self.jail_cards[go, po, deck_idx] = self.card_stamp[go]
+
+        effect = deck.effect[cards]
+        value = deck.value[cards]
+        position = self.position[g, p]
+        moved = np.zeros(g.size, dtype=bool)
+
+        m = effect == CARD_MOVE_TO
+        target = np.select(
+            [
+                m,
+                effect == CARD_NEAREST_RAILROAD,
+                effect == CARD_NEAREST_UTILITY,
+            ],
+            [
+                value,
+                self.board.nearest_railroad[position],
+                self.board.nearest_utility[position],
+            ],
+            -1,
+        )
+        m = target >= 0
+        if m.any():
+            self._move_to(g[m], p[m], target[m])
+            moved |= m
+        m = effect == CARD_BACK_THREE
+        if m.any():
+            self._move_steps(g[m], p[m], np.full(m.sum(), -3))
+            moved |= m
+        m = effect == CARD_JAIL
+        if m.any():
+            self._send_to_jail(g[m], p[m])
+        m = effect == CARD_CASH
+        if m.any():
+            gain = m & (value >= 0)
+            self.cash[g[gain], p[gain]] += value[gain]
+            loss = m & (value < 0)
+            self._pay(g[loss], p[loss], -value[loss], np.full(loss.sum(), -1))
+        for repair, house_fee, hotel_fee in (
+            (
+                CARD_GENERAL_REPAIR,
+                c.CONST_GENERAL_REPAIR_HOUSE,
+                c.CONST_GENERAL_REPAIR_HOTEL,
+            ),
+            (
+                CARD_STREET_REPAIR,
+                c.CONST_STREET_REPAIR_HOUSE,
+                c.CONST_STREET_REPAIR_HOTEL,
+            ),
+        ):
+            m = effect == repair
+            if m.any():
+                gm, pm = g[m], p[m]
+                owned = self.owner[gm] == pm[:, None]
+                levels = np.where(owned, self.houses[gm], 0)
+                house_count = np.where(levels < HOTEL_LEVEL, levels, 0).sum(axis=1)
+                hotel_count = (levels == HOTEL_LEVEL).sum(axis=1)
+                fee = house_count * house_fee + hotel_count * hotel_fee
+                self._pay(gm, pm, fee, np.full(gm.size, -1))
+        m = effect == CARD_PAY_EACH
+        if m.any():
+            gm, pm, vm = g[m], p[m], value[m]
+            for seat in range(self.n_players):
+                pays = self.active[gm, seat] & (pm != seat) & self.active[gm, pm]
+                self._pay(gm[pays], pm[pays], vm[pays], np.full(pays.sum(), seat))
+        m = effect == CARD_COLLECT_EACH
+        if m.any():
+            gm, pm, vm = g[m], p[m], value[m]
+            for seat in range(self.n_players):
+                pays = self.active[gm, seat] & (pm != seat)
+                self._pay(gm[pays], np.full(pays.sum(), seat), vm[pays], pm[pays])
+
+        return g[moved], p[moved]
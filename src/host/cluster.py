@@ -0,0 +1,500 @@
+"""
+Rooms sharded across worker processes.
+
+One process runs its games on one core. A FrontServer accepts the clients with
+the protocol of host.network and forwards their requests to a pool of worker
+processes, each an internal GameServer owning the GameModels of its rooms. The
+worker of a room is found by consistent hashing of Room.uid on a HashRing, so
+adding or removing a worker only moves the rooms of the arcs of the ring changing
+owner, about one room in n_workers.
+
+The front logs the users in itself. For every client it opens one connection to
+each worker hosting a room of its users and pipes what the worker writes back to
+the client unparsed, so the events of the games are not decoded at the front. The
+requests of the front itself on these connections have an id starting with "~",
+and their replies are taken out of the stream. create_room and join_room are sent
+as requests of the front, which seats the user in the room once the worker
+accepted it. When a client disconnects, the front forgets its users and has the
+workers remove the rooms they leave empty; every worker also evicts its idle rooms
+and users as a GameServer does.
+
+A room moves in steps: the front holds the new requests for the room, waits with
+a ping on the connections of its users to the old worker for the requests already
+sent, has the old worker export the room with the state of its game and the new
+worker import it, then sends the held requests to the new worker.
+"""
+
+import asyncio
+import bisect
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import uuid
+from collections.abc import Callable
+from multiprocessing.process import BaseProcess
+from typing import Any, Optional
+
+from host.network import BACKLOG, READ_SIZE, Connection, GameServer
+
+DEFAULT_REPLICAS = 64  # points of a worker on the ring, to even out the arcs
+_INTERNAL = (b'{"op":"done","id":"~', b'{"op":"error","id":"~')
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hashing of keys onto nodes"""
+
+    def __init__(self, replicas: int = DEFAULT_REPLICAS):
+        if replicas < 1:
+            raise ValueError("Number of replicas must be positive")
+        self.replicas = replicas
+        self._points: list[int] = []  # sorted
+        self._owners: list[str] = []  # node of every point
+        self._nodes: set[str] = set()
+
+    @property
+    def nodes(self) -> list[str]:
+        return sorted(self._nodes)
+
+    def add(self, node: str) -> None:
+        if node in self._nodes:
+            raise ValueError(f"Node {node} is already in the ring")
+        self._nodes.add(node)
+        for idx in range(self.replicas):
+            point = _hash(f"{node}#{idx}")
+            position = bisect.bisect(self._points, point)
+            self._points.insert(position, point)
+            self._owners.insert(position, node)
+
+    def remove(self, node: str) -> None:
+        if node not in self._nodes:
+            raise ValueError(f"Node {node} is not in the ring")
+        self._nodes.remove(node)
+        kept = [idx for idx, owner in enumerate(self._owners) if owner != node]
+        self._points = [self._points[idx] for idx in kept]
+        self._owners = [self._owners[idx] for idx in kept]
+
+    def node_of(self, key: str) -> str:
+        """Owner of the first point after the hash of the key, going round"""
+        if not self._points:
+            raise ValueError("The ring has no nodes")
+        position = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[position]
+
+
+def run_worker(path: str) -> None:
+    """Serve the rooms of a worker on the Unix socket path, until terminated"""
+
+    async def serve() -> None:
+        game_server = GameServer(internal=True)
+        unix_server = await game_server.start_unix(path)
+        eviction = asyncio.create_task(game_server.evict_forever())
+        try:
+            async with unix_server:
+                await unix_server.serve_forever()
+        finally:
+            eviction.cancel()
+            game_server.close()
+
+    asyncio.run(serve())
+
+
+class _Upstream:
+    """Connection of the front to a worker, piped back to a client"""
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        client: Optional[Connection],  # None for the connection of the front
+    ):
+        self.writer = writer
+        self.client = client
+        self.logged_in: set[str] = set()  # uids of the users
+        self._pending: dict[str, asyncio.Future[dict[str, Any]]] = {}
+        self._next_id = 0
+        self._buffer = bytearray()  # incomplete last line
+        self._task = asyncio.get_running_loop().create_task(self._pipe(reader))
+
+    def send(self, data: bytes) -> None:
+        self.writer.write(data)
+
+    def request(self, line: dict[str, Any]) -> asyncio.Future[dict[str, Any]]:
+        """Send a request of the front, the future of its reply"""
+        self._next_id += 1
+        request_id = f"~{self._next_id}"
+        future = asyncio.get_running_loop().create_future()
+        if self._task.done():
+            future.set_exception(ConnectionError("Worker disconnected"))
+            return future
+        self._pending[request_id] = future
+        self.writer.write(json.dumps({**line, "id": request_id}).encode() + b"\n")
+        return future
+
+    def close(self) -> None:
+        self.writer.close()
+        self._task.cancel()
+
+    async def _pipe(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while chunk := await reader.read(READ_SIZE):
+                self._buffer += chunk
+                end = self._buffer.rfind(b"\n") + 1
+                lines = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                if not self._pending:
+                    if lines:  # complete, the client may have other upstreams
+                        self._forward(lines)
+                    continue
+                for line in lines.splitlines(keepends=True):
+                    if line.startswith(_INTERNAL):
+                        self._resolve(json.loads(line))
+                    else:
+                        self._forward(line)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Worker disconnected"))
+            self._pending.clear()
+
+    def _forward(self, data: bytes) -> None:
+        if self.client is not None:
+            self.client.send(data)
+
+    def _resolve(self, reply: dict[str, Any]) -> None:
+        future = self._pending.pop(reply["id"], None)
+        if future is None or future.done():
+            return
+        if reply["op"] == "error":
+            future.set_exception(ValueError(reply["error"]))
+        else:
+            future.set_result(reply)
+
+
+class _Client:
+    def __init__(self, connection: Connection):
+        self.connection = connection
+        self.upstreams: dict[str, _Upstream] = {}  # worker name, _Upstream
+
+
+class _User:
+    __slots__ = ("uid", "name", "client", "room_uid")
+
+    def __init__(self, uid: str, name: str, client: _Client):
+        self.uid = uid
+        self.name = name
+        self.client = client
+        self.room_uid: Optional[str] = None
+
+
+class _Room:
+    __slots__ = ("uid", "worker", "users", "held", "waiting")
+
+    def __init__(self, uid: str, worker: str):
+        self.uid = uid
+        self.worker = worker
+        self.users: list[str] = []  # uids
+        # requests waiting for the room to move, None when not moving
+        self.held: Optional[list[tuple[_Client, _User, bytes]]] = None
+        self.waiting: list[asyncio.Future[None]] = []  # requests of the front
+
+
+class _Worker:
+    def __init__(self, name: str, path: str, process: BaseProcess, control: _Upstream):
+        self.name = name
+        self.path = path
+        self.process = process
+        self.control = control  # connection of the front for the room moves
+
+
+class FrontServer:
+    """Forwards the requests of the clients to the worker of their room"""
+
+    def __init__(
+        self,
+        replicas: int = DEFAULT_REPLICAS,
+        worker_target: Callable[[str], None] = run_worker,
+    ):
+        self.ring = HashRing(replicas)
+        self.workers: dict[str, _Worker] = {}
+        self.users: dict[str, _User] = {}
+        self.rooms: dict[str, _Room] = {}
+        self.moved_count = 0
+        self._worker_target = worker_target
+        self._context = multiprocessing.get_context("spawn")
+        self._dir = tempfile.mkdtemp()
+        self._next_worker = 0
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self._serve, host, port, backlog=BACKLOG)
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        return await asyncio.start_unix_server(self._serve, path, backlog=BACKLOG)
+
+    def worker_of(self, room_uid: str) -> str:
+        return self.rooms[room_uid].worker
+
+    def room_counts(self) -> dict[str, int]:
+        counts = dict.fromkeys(self.workers, 0)
+        for room in self.rooms.values():
+            counts[room.worker] += 1
+        return counts
+
+    async def add_worker(self) -> str:
+        """Start a worker process and move the rooms it now owns to it"""
+        name = f"worker-{self._next_worker}"
+        self._next_worker += 1
+        path = os.path.join(self._dir, f"{name}.sock")
+        process = self._context.Process(
+            target=self._worker_target, args=(path,), daemon=True
+        )
+        process.start()
+        control = _Upstream(*await _connect(path, process), None)
+        self.workers[name] = _Worker(name, path, process, control)
+        self.ring.add(name)
+        await self.rebalance()
+        return name
+
+    async def remove_worker(self, name: str) -> None:
+        """Move the rooms of the worker to the others and stop it"""
+        if name not in self.workers:
+            raise ValueError(f"Unknown worker {name}")
+        if len(self.workers) == 1:
+            raise ValueError("Cannot remove the last worker")
+        self.ring.remove(name)
+        await self.rebalance()
+        worker = self.workers.pop(name)
+        for user in self.users.values():
+            upstream = user.client.upstreams.pop(name, None)
+            if upstream is not None:
+                upstream.close()
+        await _stop(worker)
+
+    async def rebalance(self) -> int:
+        """Move every room to its worker on the ring, return the rooms moved"""
+        moves = [
+            (room, worker)
+            for room in list(self.rooms.values())
+            if (worker := self.ring.node_of(room.uid)) != room.worker
+        ]
+        await asyncio.gather(*(self._move(room, worker) for room, worker in moves))
+        return len(moves)
+
+    async def close(self) -> None:
+        for worker in list(self.workers.values()):
+            await _stop(worker)
+        self.workers.clear()
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        client = _Client(Connection(writer))
+        buffer = bytearray()
+        try:
+            while chunk := await reader.read(READ_SIZE):
+                buffer += chunk
+                end = buffer.rfind(b"\n") + 1
+                lines = bytes(buffer[:end]).splitlines(keepends=True)
+                del buffer[:end]
+                for line in lines:
+                    if line.strip():
+                        await self._route(client, line)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            client.connection.close()
+            for upstream in client.upstreams.values():
+                upstream.close()
+            self._drop_users(client)
+
+    def _drop_users(self, client: _Client) -> None:
+        """Forget the users of a closed client, and their rooms left empty"""
+        for user_uid in client.connection.users:
+            user = self.users.pop(user_uid, None)
+            if user is None or user.room_uid is None:
+                continue
+            room = self.rooms.get(user.room_uid)
+            if room is None:
+                continue
+            room.users.remove(user_uid)
+            if not room.users:
+                del self.rooms[room.uid]
+                if room.held is None:  # else left to the eviction of the worker
+                    self._remove_room(room)
+
+    def _remove_room(self, room: _Room) -> None:
+        """Have the worker of the room free it, without waiting"""
+        worker = self.workers.get(room.worker)
+        if worker is None:
+            return  # stopped
+        reply = worker.control.request({"op": "remove_room", "room": room.uid})
+        reply.add_done_callback(_report)
+
+    async def _route(self, client: _Client, line: bytes) -> None:
+        connection = client.connection
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Invalid request")
+        except ValueError:
+            connection.reply({"op": "error", "id": None, "error": "Invalid request"})
+            return
+        request_id = request.get("id")
+        op = request.get("op")
+        try:
+            if isinstance(request_id, str) and request_id.startswith("~"):
+                raise ValueError("Request ids starting with ~ are reserved")
+            if op == "login":
+                user = _User(uuid.uuid4().hex, str(request.get("name", "")), client)
+                self.users[user.uid] = user
+                connection.users.add(user.uid)
+                connection.reply({"op": "done", "id": request_id, "user": user.uid})
+                return
+            user = self._user(client, request)
+            if op in ("create_room", "join_room"):
+                await self._seat(client, user, request)
+                return
+            if op not in ("start", "command"):
+                raise ValueError(f"Unknown op {op}")
+            if user.room_uid is None:
+                raise ValueError(f"User {user.uid} is not in a room")
+            room = self.rooms[user.room_uid]
+        except (ValueError, ConnectionError) as error:
+            connection.reply({"op": "error", "id": request_id, "error": str(error)})
+            return
+        await self._forward(client, user, room, line)
+
+    async def _seat(
+        self, client: _Client, user: _User, request: dict[str, Any]
+    ) -> None:
+        """Create or join the room on its worker, then seat the user at the front"""
+        if user.room_uid is not None:
+            raise ValueError(f"User '{user.uid}' already in room '{user.room_uid}'")
+        if request.get("op") == "create_room":
+            room_uid = str(uuid.uuid4())
+            room = _Room(room_uid, self.ring.node_of(room_uid))
+        else:
+            room_uid = request.get("room")
+            if room_uid not in self.rooms:
+                raise ValueError(f"Unknown room {room_uid}")
+            room = self.rooms[room_uid]
+        reply = await self._request(client, user, room, {**request, "room": room.uid})
+        self.rooms.setdefault(room.uid, room)
+        user.room_uid = room.uid
+        room.users.append(user.uid)
+        client.connection.reply({**reply, "id": request.get("id")})
+
+    def _user(self, client: _Client, request: dict[str, Any]) -> _User:
+        user_uid = request.get("user")
+        if user_uid not in client.connection.users:
+            raise ValueError(f"User {user_uid} is not logged in on this connection")
+        return self.users[user_uid]
+
+    async def _forward(
+        self, client: _Client, user: _User, room: _Room, line: bytes
+    ) -> None:
+        if room.held is None:
+            upstream = await self._upstream(client, user, room.worker)
+            if room.held is None:  # not moving since
+                upstream.send(line)
+                return
+        room.held.append((client, user, line))
+
+    async def _request(
+        self, client: _Client, user: _User, room: _Room, request: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Send the request of the user to the worker of the room, its reply"""
+        while True:
+            if room.held is None:
+                upstream = await self._upstream(client, user, room.worker)
+                if room.held is None:  # not moving since
+                    return await upstream.request(request)
+            moved = asyncio.get_running_loop().create_future()
+            room.waiting.append(moved)
+            await moved
+
+    async def _upstream(self, client: _Client, user: _User, worker: str) -> _Upstream:
+        """Connection of the client to the worker, the user logged in on it"""
+        upstream = client.upstreams.get(worker)
+        if upstream is None:
+            path = self.workers[worker].path
+            reader, writer = await asyncio.open_unix_connection(path)
+            upstream = client.upstreams.setdefault(
+                worker, _Upstream(reader, writer, client.connection)
+            )
+        if user.uid not in upstream.logged_in:
+            upstream.logged_in.add(user.uid)
+            upstream.request({"op": "login", "user": user.uid, "name": user.name})
+        return upstream
+
+    async def _move(self, room: _Room, worker: str) -> None:
+        old = self.workers[room.worker]
+        room.held = []
+        users = [
+            self.users[user_uid]
+            for user_uid in room.users
+            if not self.users[user_uid].client.connection.closed
+        ]
+        try:
+            # the requests sent to the old worker are handled before the export
+            await asyncio.gather(
+                *(
+                    user.client.upstreams[old.name].request({"op": "ping"})
+                    for user in users
+                    if old.name in user.client.upstreams
+                )
+            )
+            reply = await old.control.request({"op": "export_room", "room": room.uid})
+            logins = []
+            for user in users:
+                upstream = await self._upstream(user.client, user, worker)
+                logins.append(upstream.request({"op": "ping"}))
+            await asyncio.gather(*logins)  # on other connections than the import
+            await self.workers[worker].control.request(
+                {"op": "import_room", "room": reply["room"]}
+            )
+            room.worker = worker
+            self.moved_count += 1
+        finally:
+            held, room.held = room.held, None
+            waiting, room.waiting = room.waiting, []
+            for moved in waiting:
+                if not moved.done():
+                    moved.set_result(None)
+            for client, user, line in held:
+                await self._forward(client, user, room, line)
+
+
+def _report(reply: asyncio.Future[dict[str, Any]]) -> None:
+    """Print the error of a request of the front nobody waits for"""
+    if reply.cancelled():
+        return
+    error = reply.exception()
+    if error is not None and not isinstance(error, ConnectionError):  # stopped
+        print(f"FrontServer - Error: {error}")
+
+
+async def _connect(
+    path: str, process: BaseProcess
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to a worker once it listens"""
+    while True:
+        try:
+            return await asyncio.open_unix_connection(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if not process.is_alive():
+                raise RuntimeError(f"Worker {path} exited") from None
+            await asyncio.sleep(0.01)
+
+
+async def _stop(worker: _Worker) -> None:
+    worker.control.close()
+    worker.process.terminate()
+    await asyncio.get_running_loop().run_in_executor(None, worker.process.join)
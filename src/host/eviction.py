@@ -0,0 +1,141 @@
+"""
+Eviction of the idle users, rooms and games of a server.
+
+The server keeps the last activity of its users outside of a room and of its
+rooms in IdleTrackers, one per state of the rooms. A tracker is a dict in order
+of last activity, a touch moving the key to its end, so the idle keys are the
+first ones and a sweep stops at the first key still active: it only costs the
+evicted objects. The users of a room are active with their room, and are evicted
+with it.
+
+A finished game is archived as the bytes of its game.state, in a bounded
+GameArchive, and the Topic of its publisher is closed.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import event
+import model
+
+DEFAULT_ARCHIVE_SIZE = 1000
+
+
+@dataclass(kw_only=True, slots=True)
+class EvictionPolicy:
+    """Seconds of inactivity before an object is evicted"""
+
+    user_ttl: float = 15 * 60  # a user outside of any room
+    room_ttl: float = 30 * 60  # an open room nobody joined or left
+    game_ttl: float = 60 * 60  # a game without commands, abandoned
+    finished_ttl: float = 5 * 60  # a finished game, for its players to see
+    archive_size: int = DEFAULT_ARCHIVE_SIZE  # finished games kept
+
+    def __post_init__(self) -> None:
+        for name in ("user_ttl", "room_ttl", "game_ttl", "finished_ttl"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative")
+        if self.archive_size < 0:
+            raise ValueError("archive_size must not be negative")
+
+
+class IdleTracker:
+    """Last activity of the keys, the least recently active first"""
+
+    __slots__ = ("_last_active",)
+
+    def __init__(self) -> None:
+        self._last_active: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._last_active)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._last_active
+
+    def touch(self, key: str, now: float) -> None:
+        """now must not go back in time, e.g. time.monotonic"""
+        self._last_active.pop(key, None)
+        self._last_active[key] = now
+
+    def discard(self, key: str) -> None:
+        self._last_active.pop(key, None)
+
+    def pop_idle(self, deadline: float) -> list[str]:
+        """Remove and return the keys last active before the deadline"""
+        idle = []
+        for key, last_active in self._last_active.items():
+            if last_active >= deadline:
+                break
+            idle.append(key)
+        for key in idle:
+            del self._last_active[key]
+        return idle
+
+
+@dataclass(kw_only=True, slots=True)
+class ArchivedGame:
+    id: str
+    room_uid: str
+    room_name: str
+    users: list[str]  # uids
+    state: bytes  # game.state.encode(game).to_bytes(), empty if never started
+
+
+class GameArchive:
+    """The last finished games, the oldest dropped beyond size"""
+
+    def __init__(self, size: int = DEFAULT_ARCHIVE_SIZE):
+        self.size = size
+        self._games: dict[str, ArchivedGame] = {}  # game id, in archiving order
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._games
+
+    def get(self, game_id: str) -> ArchivedGame:
+        return self._games[game_id]
+
+    def add(self, archived: ArchivedGame) -> None:
+        self._games[archived.id] = archived
+        while len(self._games) > self.size:
+            del self._games[next(iter(self._games))]
+
+
+@dataclass(kw_only=True, slots=True)
+class EvictionCounters:
+    users: int = 0  # evicted
+    rooms: int = 0
+    games: int = 0  # abandoned, archived with the finished ones
+    archived_games: int = 0
+    closed_topics: int = 0
+
+    def to_dict(self) -> dict[str, int]:
+        return {
+            "evicted_users": self.users,
+            "evicted_rooms": self.rooms,
+            "evicted_games": self.games,
+            "archived_games": self.archived_games,
+            "closed_topics": self.closed_topics,
+        }
+
+
+@dataclass(kw_only=True, slots=True)
+class Evicted:
+    """uids of the objects evicted by a sweep"""
+
+    users: list[str] = field(default_factory=list)
+    rooms: list[str] = field(default_factory=list)
+
+
+def close_topic(game_model: model.GameModel) -> bool:
+    """Close the Topic of the publisher of the game, if any. Return whether it
+    was open"""
+    publisher = getattr(game_model, "publisher", None)
+    topic: Any = getattr(publisher, "topic", None)
+    if not isinstance(topic, event.Topic) or topic.closed:
+        return False
+    topic.close()
+    return True
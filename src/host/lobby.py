@@ -0,0 +1,210 @@
+"""
+Index of the rooms listed in the lobby.
+
+The server updates the index when a room is created, joined, left, started or
+ended, so listing the rooms does not walk over all of them. The listing of every
+room is kept in a bucket of all the rooms, in the bucket of its state and in the
+one of the rooms that can be joined, and the rooms are sorted by casefolded name
+for prefix search. A bucket keeps its rooms sorted by creation, so a page of
+rooms is a slice of its list at any offset. The JSON of a page is cached in its
+bucket until a room of the bucket changes, so polling the lobby costs a dict
+lookup, and a game being played does not clear the pages of the open rooms.
+"""
+
+import bisect
+import enum
+import itertools
+import json
+from dataclasses import dataclass
+from typing import Any, Optional, Protocol, Sequence
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_CACHED_PAGES = 1024  # of a bucket, cleared when more pages are asked for
+
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+class RoomState(enum.Enum):
+    OPEN = "open"  # waiting for players
+    PLAYING = "playing"
+    FINISHED = "finished"
+
+
+class Listed(Protocol):
+    """A room as seen by the index"""
+
+    uid: str
+    name: str
+    host: Any  # with a name
+    users: Sequence[Any]
+    max_users: int
+    state: RoomState
+
+
+@dataclass(kw_only=True, slots=True)
+class LobbyPage:
+    rooms: list[dict[str, Any]]
+    page: int
+    page_size: int
+    total: int  # rooms matching the filters
+
+
+class _Bucket:
+    """Listings of some rooms in creation order, with the JSON of their pages"""
+
+    __slots__ = ("order", "listings", "pages")
+
+    def __init__(self) -> None:
+        self.order: list[tuple[int, str]] = []  # sorted creation number, room uid
+        self.listings: dict[str, dict[str, Any]] = {}  # room uid, listing
+        self.pages: dict[tuple, bytes] = {}  # JSON of the pages asked for
+
+    def __len__(self) -> int:
+        return len(self.listings)
+
+    def put(self, created: int, listing: dict[str, Any]) -> None:
+        uid = listing["uid"]
+        if uid not in self.listings:
+            bisect.insort(self.order, (created, uid))
+        self.listings[uid] = listing
+        self.pages.clear()
+
+    def discard(self, created: int, uid: str) -> None:
+        if self.listings.pop(uid, None) is None:
+            return
+        del self.order[bisect.bisect_left(self.order, (created, uid))]
+        self.pages.clear()
+
+    def slice(self, start: int, stop: int) -> list[dict[str, Any]]:
+        return [self.listings[uid] for _, uid in self.order[start:stop]]
+
+
+class LobbyIndex:
+    def __init__(self) -> None:
+        self._created: dict[str, int] = {}  # room uid, creation number
+        self._counter = itertools.count()
+        self._all = _Bucket()
+        self._by_state = {state: _Bucket() for state in RoomState}
+        self._joinable = _Bucket()  # open with a seat left
+        self._nothing = _Bucket()  # e.g. the joinable rooms being played
+        self._names: list[tuple[str, str]] = []  # casefolded name, room uid
+        self.version = 0  # changes of the index
+
+    def __len__(self) -> int:
+        return len(self._all)
+
+    def __contains__(self, room_uid: str) -> bool:
+        return room_uid in self._all.listings
+
+    def add(self, room: Listed) -> None:
+        if room.uid in self._all.listings:
+            raise ValueError(f"Room '{room.uid}' is already listed")
+        self._created[room.uid] = next(self._counter)
+        bisect.insort(self._names, (room.name.casefold(), room.uid))
+        self._set(room)
+
+    def update(self, room: Listed) -> None:
+        """List the users and state of the room as they are now"""
+        previous = RoomState(self._all.listings[room.uid]["state"])
+        if previous is not room.state:
+            self._by_state[previous].discard(self._created[room.uid], room.uid)
+        self._set(room)
+
+    def remove(self, room_uid: str) -> None:
+        listing = self._all.listings[room_uid]
+        created = self._created.pop(room_uid)
+        for bucket in (
+            self._all,
+            self._by_state[RoomState(listing["state"])],
+            self._joinable,
+        ):
+            bucket.discard(created, room_uid)
+        key = (listing["name"].casefold(), room_uid)
+        del self._names[bisect.bisect_left(self._names, key)]
+        self.version += 1
+
+    def page(
+        self,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        state: Optional[RoomState] = None,
+        open_seats: bool = False,
+        prefix: str = "",
+    ) -> LobbyPage:
+        """Rooms of the page, in creation order, or by name when searching by
+        prefix. open_seats keeps the rooms that can be joined"""
+        if page < 0:
+            raise ValueError("Page must not be negative")
+        if not 0 < page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {MAX_PAGE_SIZE}")
+        start = page * page_size
+        source = self._source(state, open_seats)
+        if prefix:
+            matches = [
+                source.listings[uid]
+                for uid in self._prefixed(prefix.casefold())
+                if uid in source.listings
+            ]
+            rooms, total = matches[start : start + page_size], len(matches)
+        else:
+            rooms, total = source.slice(start, start + page_size), len(source)
+        return LobbyPage(rooms=rooms, page=page, page_size=page_size, total=total)
+
+    def page_json(
+        self,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        state: Optional[RoomState] = None,
+        open_seats: bool = False,
+        prefix: str = "",
+    ) -> bytes:
+        """JSON of the page, cached until a room of its listing changes"""
+        pages = self._source(state, open_seats).pages
+        key = (page, page_size, state, open_seats, prefix)
+        cached = pages.get(key)
+        if cached is None:
+            lobby_page = self.page(page, page_size, state, open_seats, prefix)
+            if len(pages) >= MAX_CACHED_PAGES:
+                pages.clear()
+            cached = pages[key] = _encode(
+                {
+                    "rooms": lobby_page.rooms,
+                    "page": page,
+                    "page_size": page_size,
+                    "total": lobby_page.total,
+                }
+            ).encode()
+        return cached
+
+    def _source(self, state: Optional[RoomState], open_seats: bool) -> _Bucket:
+        if open_seats:
+            return self._joinable if state in (None, RoomState.OPEN) else self._nothing
+        return self._all if state is None else self._by_state[state]
+
+    def _set(self, room: Listed) -> None:
+        created = self._created[room.uid]
+        listing = {
+            "uid": room.uid,
+            "name": room.name,
+            "host": room.host.name,
+            "users": len(room.users),
+            "max_users": room.max_users,
+            "state": room.state.value,
+        }
+        self._all.put(created, listing)
+        self._by_state[room.state].put(created, listing)
+        if room.state is RoomState.OPEN and len(room.users) < room.max_users:
+            self._joinable.put(created, listing)
+        else:
+            self._joinable.discard(created, room.uid)
+        self.version += 1
+
+    def _prefixed(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._names, (prefix,))
+        uids = []
+        for name, uid in itertools.islice(self._names, start, None):
+            if not name.startswith(prefix):
+                break
+            uids.append(uid)
+        return uids
@@ -0,0 +1,568 @@
+"""
+Game server over the network: JSON lines over TCP or a Unix socket.
+
+Every line is a JSON object with an "op". A client logs users in, creates or joins
+a room, starts the game of the room and sends the V_* commands of its users:
+
+    {"op": "login", "name": "alice"}                     -> "user": uid
+    {"op": "create_room", "user": uid, "name": "room"}   -> "room": uid
+    {"op": "join_room", "user": uid, "room": uid}
+    {"op": "start", "user": uid}
+    {"op": "command", "user": uid, "type": "v_mortgage", "property_id": 3}
+    {"op": "lobby", "page": 0, "page_size": 20, "state": "open",
+     "open_seats": true, "prefix": "ro"}                 -> "lobby": page of rooms
+
+Every request is answered by {"op": "done", "id": ...} with the results above, or
+{"op": "error", "id": ..., "error": "..."}, where id is the "id" of the request if
+it has one. The connections of a room receive the G_* events of its game, the
+events of a request before its reply:
+
+    {"op": "event", "type": "g_move", "seq": 1, "message": {...}}
+
+A connection can log in several users, e.g. the players sharing one screen.
+
+A worker behind a FrontServer, see host.cluster, is an internal GameServer: the
+front gives the uids of the users and rooms, a user logs in again on every
+connection of the front to the worker, export_room and import_room move a room
+with its game to another worker, and remove_room frees a room all its users left.
+
+Every room drives a GameModel through a ControllerListener. The commands of the
+rooms are handled one at a time on the loop of the server, in the order they
+arrive, and the events of a command are written as one batch to the connections
+of the room. The writes to a connection are buffered until the end of the
+current iteration of the loop, so the replies to many requests share a syscall.
+A lobby page is sent as the JSON cached by the lobby index of the server.
+
+serve sweeps the idle users and rooms of the server every EVICTION_INTERVAL, see
+host.eviction; the requests of an evicted user fail as if it had not logged in.
+
+A GameServer given a GameStore writes its rooms behind and restores them when it
+is created, see host.persistence. The users of a restored room log in again with
+their uid: {"op": "login", "user": uid}.
+"""
+
+import asyncio
+import base64
+import contextlib
+import json
+import sys
+from collections.abc import Callable, Iterator
+from typing import Any, Optional
+
+import model
+from controller import ControllerListener, GameController
+from event import Event, EventType, Publisher, payload
+from game import state
+from host.eviction import Evicted
+from host.lobby import DEFAULT_PAGE_SIZE, RoomState
+from host.persistence import GameStore, StoredRoom
+from host.server import Room, server
+from host.user import User
+
+MAX_LINE = 64 * 1024  # a longer request closes the connection
+MAX_WRITE_BUFFER = 1024 * 1024  # a client that falls further behind is dropped
+READ_SIZE = 64 * 1024
+BACKLOG = 4096  # connections waiting to be accepted, e.g. a burst of reconnects
+EVICTION_INTERVAL = 10.0  # seconds between the sweeps of the idle objects
+
+_USER_COMMANDS = frozenset(
+    event_type
+    for event_type, payload_type in payload.PAYLOAD_TYPES.items()
+    if payload_type is payload.UserCommand
+)
+Reply = dict[str, Any]  # results of a request, sent with its reply
+RawReply = bytes  # results already encoded, e.g. b'"lobby":{...}'
+_encode = json.JSONEncoder(separators=(",", ":")).encode
+
+
+def encode_event(event: Event) -> bytes:
+    """Line of the event"""
+    message = event.message
+    if isinstance(message, payload.Payload):
+        message = message.to_dict()
+    line = {
+        "op": "event",
+        "type": event.event_type.value,
+        "seq": event.seq,
+        "message": message,
+    }
+    return _encode(line).encode() + b"\n"
+
+
+class Connection:
+    """Buffered writer of the lines to a client"""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.users: set[str] = set()  # uids of the users logged in
+        self._buffer = bytearray()
+        self._flush_scheduled = False
+        self.closed = False
+
+    def send(self, data: bytes) -> None:
+        """Write after the current iteration of the loop"""
+        if self.closed:
+            return
+        self._buffer += data
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_soon(self._flush)
+
+    def reply(self, line: dict[str, Any]) -> None:
+        self.send(_encode(line).encode() + b"\n")
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        if self.closed:
+            return
+        self.writer.write(self._buffer)
+        self._buffer.clear()
+        if self.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+            self.close()
+
+
+class RoomPublisher(Publisher):
+    """Sends the events of the game of a room to its connections, the events of
+    a batch in one write"""
+
+    def __init__(self, journal: bool = False) -> None:
+        self.connections: list[Connection] = []
+        self._lines: list[bytes] = []
+        self._depth = 0
+        self.seq = 0  # of the last event of the room
+        # seq and line of the events not yet persisted, if persisting
+        self.journal: Optional[list[tuple[int, bytes]]] = [] if journal else None
+
+    def publish(self, event: Event) -> None:
+        self.seq += 1
+        event.seq = self.seq
+        line = encode_event(event)
+        self._lines.append(line)
+        if self.journal is not None:
+            self.journal.append((self.seq, line))
+        if self._depth == 0:
+            self._flush()
+
+    @contextlib.contextmanager
+    def batch(self) -> Iterator[None]:
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                self._flush()
+
+    def _flush(self) -> None:
+        if not self._lines:
+            return
+        data = b"".join(self._lines)
+        self._lines.clear()
+        for connection in self.connections:
+            connection.send(data)
+
+
+class RoomSession:
+    """The game of a room and the connections of its users"""
+
+    def __init__(self, journal: bool = False) -> None:
+        self.publisher = RoomPublisher(journal)
+        self.listener: Optional[ControllerListener] = None  # once started
+
+
+class GameServer:
+    """Serves the rooms of a server to the clients connected over the network"""
+
+    def __init__(
+        self,
+        lobby: Optional[server] = None,
+        internal: bool = False,
+        store: Optional[GameStore] = None,
+    ):
+        self.lobby = server() if lobby is None else lobby
+        self.internal = internal  # a worker trusting the requests of its front
+        self.store = store
+        self.sessions: dict[str, RoomSession] = {}  # room uid, RoomSession
+        self.connections: set[Connection] = set()
+        self.command_count = 0
+        self._dirty: set[str] = set()  # uids of the rooms changed since the flush
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._recovered: set[str] = set()  # users of restored rooms to log in
+        self._ops: dict[
+            str, Callable[[Connection, dict[str, Any]], Reply | RawReply]
+        ] = {
+            "login": self._login,
+            "create_room": self._create_room,
+            "join_room": self._join_room,
+            "start": self._start,
+            "command": self._command,
+            "ping": self._ping,
+            "lobby": self._lobby,
+        }
+        if internal:
+            self._ops["export_room"] = self._export_room
+            self._ops["import_room"] = self._import_room
+            self._ops["remove_room"] = self._remove_room
+        if store is not None:
+            for stored in store.load():
+                room = self._restore_room(stored.record, stored.game)
+                self._recovered.update(user.uid for user in room.users)
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.Server:
+        return await asyncio.start_server(self._serve, host, port, backlog=BACKLOG)
+
+    async def start_unix(self, path: str) -> asyncio.Server:
+        return await asyncio.start_unix_server(self._serve, path, backlog=BACKLOG)
+
+    def evict_idle(self) -> Evicted:
+        """Evict the idle users and rooms of the server with their sessions"""
+        self.flush()
+        evicted = self.lobby.evict_idle()
+        for room_uid in evicted.rooms:
+            self.sessions.pop(room_uid, None)
+            self._changed(room_uid)
+        return evicted
+
+    async def evict_forever(self, interval: float = EVICTION_INTERVAL) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.evict_idle()
+            except Exception as error:  # the next sweep tries again
+                print(f"GameServer - Error in eviction: {error}")
+
+    def flush(self) -> None:
+        """Queue the dirty rooms and their new events to the store"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self.store is None or not self._dirty:
+            return
+        rooms, deleted = [], []
+        for room_uid in self._dirty:
+            room = self.lobby.rooms.get(room_uid)
+            if room is None:
+                deleted.append(room_uid)
+                continue
+            # a restored game rolls fresh dice, and encodes twice as fast
+            record, game_data = self._record(room, include_rng=False)
+            stored = StoredRoom(uid=room.uid, record=record, game=game_data)
+            session = self.sessions.get(room_uid)
+            if session is not None and session.publisher.journal:
+                stored.events = session.publisher.journal
+                session.publisher.journal = []
+            rooms.append(stored)
+        self._dirty.clear()
+        self.store.write(rooms, deleted)
+
+    def close(self) -> None:
+        """Write the dirty rooms and close the store"""
+        self.flush()
+        if self.store is not None:
+            self.store.close()
+
+    def handle(self, connection: Connection, request: dict[str, Any]) -> None:
+        """Handle one request of the connection and reply to it"""
+        request_id = request.get("id")
+        try:
+            op = self._ops.get(request.get("op"))  # type: ignore[arg-type]
+            if op is None:
+                raise ValueError(f"Unknown op {request.get('op')}")
+            result = op(connection, request)
+        except Exception as error:
+            connection.reply({"op": "error", "id": request_id, "error": str(error)})
+            return
+        if isinstance(result, bytes):
+            encoded_id = _encode(request_id).encode()
+            connection.send(b'{"op":"done","id":%b,%b}\n' % (encoded_id, result))
+            return
+        connection.reply({"op": "done", "id": request_id, **result})
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        connection = Connection(writer)
+        self.connections.add(connection)
+        buffer = bytearray()
+        try:
+            while not connection.closed and (chunk := await reader.read(READ_SIZE)):
+                buffer += chunk
+                end = buffer.rfind(b"\n") + 1
+                if end == 0:
+                    if len(buffer) > MAX_LINE:
+                        break
+                    continue
+                for line in bytes(buffer[:end]).splitlines():
+                    if line.strip():
+                        self._handle_line(connection, line)
+                del buffer[:end]
+        except (ConnectionError, asyncio.CancelledError):
+            pass  # dropped by the client, or the server is closing
+        finally:
+            self._disconnect(connection)
+
+    def _handle_line(self, connection: Connection, line: bytes) -> None:
+        try:
+            request = json.loads(line)
+        except ValueError:
+            connection.reply({"op": "error", "id": None, "error": "Invalid JSON"})
+            return
+        if not isinstance(request, dict):
+            connection.reply({"op": "error", "id": None, "error": "Invalid request"})
+            return
+        self.handle(connection, request)
+
+    def _disconnect(self, connection: Connection) -> None:
+        connection.close()
+        self.connections.discard(connection)
+        for user_uid in connection.users:
+            user = self.lobby.active_users.get(user_uid)
+            if user is not None and user.room_uid in self.sessions:
+                connections = self.sessions[user.room_uid].publisher.connections
+                if connection in connections:
+                    connections.remove(connection)
+
+    def _user(self, connection: Connection, request: dict[str, Any]) -> User:
+        user_uid = request.get("user")
+        user = self.lobby.active_users.get(user_uid)  # type: ignore[arg-type]
+        if user is None:
+            connection.users.discard(user_uid)  # type: ignore[arg-type]
+        if user is None or user_uid not in connection.users:
+            raise ValueError(f"User {user_uid} is not logged in on this connection")
+        return user
+
+    def _session(self, connection: Connection, room_uid: str) -> RoomSession:
+        session = self.sessions.get(room_uid)
+        if session is None:
+            session = self.sessions[room_uid] = RoomSession(
+                journal=self.store is not None
+            )
+        if connection not in session.publisher.connections:
+            session.publisher.connections.append(connection)
+        return session
+
+    def _changed(self, room_uid: str) -> None:
+        """Write the room behind, at the next flush"""
+        if self.store is None:
+            return
+        self._dirty.add(room_uid)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.store.flush_interval, self.flush
+            )
+
+    def _login(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        user_uid = request.get("user")
+        recovered = user_uid in self._recovered
+        if not (self.internal or recovered):
+            user_uid = None
+        user = self.lobby.active_users.get(user_uid)  # type: ignore[arg-type]
+        if user is None:
+            user = self.lobby.add_user(str(request.get("name", "")), uid=user_uid)
+        else:
+            self.lobby.touch(user.uid)
+        connection.users.add(user.uid)
+        if recovered:
+            self._recovered.discard(user.uid)
+            if user.room_uid in self.sessions:
+                self._session(connection, user.room_uid)
+        return {"user": user.uid}
+
+    def _create_room(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        user = self._user(connection, request)
+        room_uid = self.lobby.create_room(
+            user.uid,
+            str(request.get("name", "")),
+            uid=request.get("room") if self.internal else None,
+        )
+        self.lobby.join_room(user.uid, room_uid)
+        self._session(connection, room_uid)
+        self._changed(room_uid)
+        return {"room": room_uid}
+
+    def _join_room(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        user = self._user(connection, request)
+        room_uid = request.get("room")
+        if room_uid not in self.lobby.rooms:
+            raise ValueError(f"Unknown room {room_uid}")
+        if user.room_uid != room_uid:
+            self.lobby.join_room(user.uid, room_uid)
+            self._changed(room_uid)
+        self._session(connection, room_uid)
+        return {"room": room_uid}
+
+    def _start(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        user = self._user(connection, request)
+        if user.room_uid is None:
+            raise ValueError(f"User {user.uid} is not in a room")
+        room = self.lobby.rooms[user.room_uid]
+        if room.host is not user:
+            raise ValueError(f"Only the host can start room {room.uid}")
+        session = self._session(connection, room.uid)
+        game_model = self.lobby.start_game(room.uid, session.publisher)
+        session.listener = ControllerListener(GameController(game_model))
+        user_ids = [room_user.uid for room_user in room.users]
+        session.listener.listen(
+            Event(EventType.V_ADD_PLAYER, payload.AddUsers(user_ids=user_ids))
+        )
+        session.listener.listen(Event(EventType.V_START_GAME, payload.Empty()))
+        self._changed(room.uid)
+        return {}
+
+    def _command(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        user = self._user(connection, request)
+        try:
+            event_type = EventType(request.get("type"))
+        except ValueError:
+            event_type = None
+        if event_type not in _USER_COMMANDS:
+            raise ValueError(f"Unknown command {request.get('type')}")
+        session = self.sessions.get(user.room_uid)  # type: ignore[arg-type]
+        if session is None or session.listener is None:
+            raise ValueError(f"The game of user {user.uid} has not started")
+        command = payload.UserCommand(
+            user_id=user.uid, property_id=request.get("property_id")
+        )
+        self.command_count += 1
+        self.lobby.touch(user.uid)
+        session.listener.listen(Event(event_type, command))
+        self._changed(user.room_uid)  # type: ignore[arg-type]
+        return {}
+
+    def _ping(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        """Reply once the earlier requests of the connection are handled"""
+        return {}
+
+    def _lobby(self, connection: Connection, request: dict[str, Any]) -> RawReply:
+        state = request.get("state")
+        page = self.lobby.lobby_index.page_json(
+            page=int(request.get("page", 0)),
+            page_size=int(request.get("page_size", DEFAULT_PAGE_SIZE)),
+            state=None if state is None else RoomState(state),
+            open_seats=bool(request.get("open_seats", False)),
+            prefix=str(request.get("prefix", "")),
+        )
+        return b'"lobby":' + page
+
+    def _export_room(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        """Remove the room and return it with its users and the state of its game"""
+        room_uid = request.get("room")
+        if room_uid not in self.lobby.rooms:
+            raise ValueError(f"Unknown room {room_uid}")
+        self.flush()
+        exported, game_data = self._record(self.lobby.rooms[room_uid])
+        self.lobby.remove_room(room_uid)
+        self.sessions.pop(room_uid, None)
+        self._changed(room_uid)
+        if game_data is not None:
+            exported["game"]["data"] = base64.b64encode(game_data).decode()
+        return {"room": exported}
+
+    def _import_room(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        """Add a room returned by export_room, its game continues where it was"""
+        exported = request["room"]
+        game_data = None
+        if exported["game"] is not None:
+            game_data = base64.b64decode(exported["game"]["data"])
+        room = self._restore_room(exported, game_data)
+        self._changed(room.uid)
+        return {"room": room.uid}
+
+    def _remove_room(self, connection: Connection, request: dict[str, Any]) -> Reply:
+        """Remove the room with its users and game, left by all its users"""
+        room_uid = request.get("room")
+        if room_uid not in self.lobby.rooms:
+            raise ValueError(f"Unknown room {room_uid}")
+        self.lobby.remove_room(room_uid)
+        self.sessions.pop(room_uid, None)
+        self._changed(room_uid)
+        return {"room": room_uid}
+
+    def _record(
+        self, room: Room, include_rng: bool = True
+    ) -> tuple[dict[str, Any], Optional[bytes]]:
+        """The room with its users, and the state of its game as bytes"""
+        record: dict[str, Any] = {
+            "uid": room.uid,
+            "name": room.name,
+            "host": room.host.uid,
+            "users": [[user.uid, user.name] for user in room.users],
+            "max_users": room.max_users,
+            "state": room.state.value,
+            "game": None,
+        }
+        session = self.sessions.get(room.uid)
+        if room.game_model is None or session is None:
+            return record, None
+        record["game"] = {
+            "id": room.game_model.id,
+            "state": room.game_model.state.name,
+            "seq": session.publisher.seq,
+        }
+        game_state = state.encode(room.game_model.game, include_rng)
+        return record, game_state.to_bytes()
+
+    def _restore_room(self, record: dict[str, Any], game_data: Optional[bytes]) -> Room:
+        """Add the room of a record, its game continues where it was"""
+        users = {}
+        for user_uid, name in record["users"]:
+            user = self.lobby.active_users.get(user_uid)
+            users[user_uid] = (
+                self.lobby.add_user(name, user_uid) if user is None else user
+            )
+        room = Room(
+            host=users[record["host"]],
+            name=record["name"],
+            uid=record["uid"],
+            users=list(users.values()),
+            max_users=record["max_users"],
+        )
+        session = RoomSession(journal=self.store is not None)
+        session.publisher.connections = [
+            other for other in self.connections if not other.users.isdisjoint(users)
+        ]
+        if record["game"] is not None and game_data is not None:
+            game_record = record["game"]
+            game_model = room.start_game_model(session.publisher)
+            game_model.id = game_record["id"]
+            game_model.game = state.decode(state.GameState.from_bytes(game_data))
+            game_model.state = model.game_model.GameState[game_record["state"]]
+            session.publisher.seq = game_record["seq"]
+            session.listener = ControllerListener(
+                GameController(game_model),
+                {player.name: player.uid for player in game_model.game.players},
+            )
+        room.state = RoomState(record["state"])
+        self.lobby.add_room(room)
+        self.sessions[room.uid] = session
+        return room
+
+
+async def serve(host: str, port: int, database: Optional[str] = None) -> None:
+    """Serve until cancelled, persisting the rooms to the SQLite database if
+    given"""
+    store = None if database is None else GameStore(database)
+    game_server = GameServer(store=store)
+    tcp_server = await game_server.start_tcp(host, port)
+    eviction = asyncio.create_task(game_server.evict_forever())
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        eviction.cancel()
+        game_server.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        serve(
+            "127.0.0.1",
+            int(sys.argv[1]) if len(sys.argv) > 1 else 8765,
+            sys.argv[2] if len(sys.argv) > 2 else None,
+        )
+    )
@@ -0,0 +1,185 @@
+"""
+Write-behind persistence of the rooms and games of a server to SQLite.
+
+A GameServer given a GameStore marks a room dirty when it changes, e.g. on every
+command, and every flush_interval encodes the dirty rooms once each: the record
+of the room, as exported to move it to another worker, the state of its game as
+game.state bytes, and the lines of the events published since the last flush.
+GameStore.write queues them without waiting, and the writer thread of the store
+commits everything queued in one transaction, so the writes of many games and
+commands share a commit. Commands are answered before their changes are written:
+a crash loses at most the changes of the last flush_interval and commit. A failed
+commit is retried every flush_interval with the batches queued since, and
+GameStore.flush returns False when a commit fails while it waits.
+
+The database is in WAL mode with synchronous=NORMAL, which survives the crash of
+the process. On startup the GameServer restores the rooms of GameStore.load, and
+the users of these rooms log in again with their uid. The state of Game.rng is not
+written, so a restored game rolls fresh dice.
+"""
+
+import json
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+FLUSH_INTERVAL = 0.1  # seconds between the snapshots of the dirty rooms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    uid TEXT PRIMARY KEY,
+    record TEXT NOT NULL,
+    game BLOB
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    game_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    line BLOB NOT NULL,
+    PRIMARY KEY (game_id, seq)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(kw_only=True, slots=True)
+class StoredRoom:
+    uid: str
+    record: dict[str, Any]  # the room as exported, without the game data
+    game: Optional[bytes] = None  # game.state bytes, once the game has started
+    events: list[tuple[int, bytes]] = field(default_factory=list)  # seq, line
+
+
+@dataclass(kw_only=True, slots=True)
+class _Batch:
+    rooms: list[StoredRoom]
+    deleted: list[str]  # room uids
+
+
+class GameStore:
+    """SQLite database of the rooms of a server, written by a thread of its own"""
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.commit_count = 0
+        self.written_count = 0  # batches
+        self.failed_count = 0  # commits
+        self.error: Optional[sqlite3.Error] = None  # of the last commit, retried
+        self._queued_count = 0
+        self._pending: list[_Batch] = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._lock = threading.Lock()  # of the connection
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._writer = threading.Thread(
+            target=self._write_behind, name=f"GameStore {path}", daemon=True
+        )
+        self._writer.start()
+
+    def load(self) -> list[StoredRoom]:
+        """The rooms written so far"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT uid, record, game FROM rooms"
+            ).fetchall()
+        return [
+            StoredRoom(uid=uid, record=json.loads(record), game=game)
+            for uid, record, game in rows
+        ]
+
+    def events(self, game_id: str, after_seq: int = 0) -> list[bytes]:
+        """Lines of the events of the game written so far, after after_seq"""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT line FROM events WHERE game_id = ? AND seq > ? ORDER BY seq",
+                (game_id, after_seq),
+            ).fetchall()
+        return [line for (line,) in rows]
+
+    def write(self, rooms: list[StoredRoom], deleted: list[str]) -> None:
+        """Queue the rooms to write and the uids of the rooms to delete"""
+        with self._condition:
+            if self._closed:
+                raise ValueError(f"GameStore {self.path} is closed")
+            self._pending.append(_Batch(rooms=rooms, deleted=deleted))
+            self._queued_count += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the batches queued so far are committed. Return False on
+        timeout or if a commit fails meanwhile, see error"""
+        with self._condition:
+            queued, failed = self._queued_count, self.failed_count
+            self._condition.wait_for(
+                lambda: self.written_count >= queued or self.failed_count > failed,
+                timeout,
+            )
+            return self.written_count >= queued
+
+    def close(self) -> None:
+        """Commit the queued batches and close the database. Raise ValueError if
+        they could not be committed"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+        self._connection.close()
+        if self._pending:
+            raise ValueError(
+                f"GameStore {self.path} - {len(self._pending)} batches not written"
+            ) from self.error
+
+    def _write_behind(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                batches, self._pending = self._pending, []
+                closed = self._closed
+            if not batches:
+                return  # closed
+            try:
+                with self._lock, self._connection:  # one transaction
+                    for batch in batches:
+                        self._write(batch)
+            except sqlite3.Error as error:
+                print(f"GameStore {self.path} - Error: {error}")
+                with self._condition:
+                    self.failed_count += 1
+                    self.error = error
+                    self._pending[:0] = batches  # retried with the next commit
+                    self._condition.notify_all()
+                    if closed:
+                        return  # given up, reported by close
+                    self._condition.wait_for(lambda: self._closed, self.flush_interval)
+                continue
+            with self._condition:
+                self.error = None
+                self.commit_count += 1
+                self.written_count += len(batches)
+                self._condition.notify_all()
+
+    def _write(self, batch: _Batch) -> None:
+        deleted = [(uid,) for uid in batch.deleted]
+        self._connection.executemany(
+            "DELETE FROM events WHERE game_id = "
+            "(SELECT json_extract(record, '$.game.id') FROM rooms WHERE uid = ?)",
+            deleted,
+        )
+        self._connection.executemany("DELETE FROM rooms WHERE uid = ?", deleted)
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO rooms VALUES (?, ?, ?)",
+            [(room.uid, json.dumps(room.record), room.game) for room in batch.rooms],
+        )
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO events VALUES (?, ?, ?)",
+            [
+                (room.record["game"]["id"], seq, line)
+                for room in batch.rooms
+                for seq, line in room.events
+            ],
+        )
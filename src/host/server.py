@@ -1,8 +1,25 @@
+import time
 import uuid
+from collections.abc import Callable
 from dataclasses import dataclass, field
+from typing import Optional
 
+import constants as c
+import event
 import game
+import model
+from game import state as game_state
 
+from host.eviction import (
+    ArchivedGame,
+    Evicted,
+    EvictionCounters,
+    EvictionPolicy,
+    GameArchive,
+    IdleTracker,
+    close_topic,
+)
+from host.lobby import DEFAULT_PAGE_SIZE, LobbyIndex, LobbyPage, RoomState
 from host.localhost import LocalHost
 from host.user import User
 
@@ -19,11 +36,17 @@ class Room:
     uid: str = field(default_factory=lambda: str(uuid.uuid4()))
     users: list[User] = field(default_factory=list)
     localhost: LocalHost = field(init=False)
-    # NOTE MAYBE add user num limit
+    game_model: Optional[model.GameModel] = None  # once the game has started
+    max_users: int = c.CONST_ROOM_SIZE
+    state: RoomState = RoomState.OPEN
 
     def add_user(self, user: User) -> None:
         if user in self.users:
             raise ValueError(f"User '{user.uid}' already in room '{self.uid}'")
+        if self.state is not RoomState.OPEN:
+            raise ValueError(f"Room '{self.uid}' is {self.state.value}")
+        if len(self.users) >= self.max_users:
+            raise ValueError(f"Room '{self.uid}' is full")
         self.users.append(user)
 
     def remove_user(self, user: User) -> None:
@@ -34,6 +57,15 @@ class Room:
         dice_rolls = self.localhost.start_game()
         print(f"Dice rolls for deciding playing orders: {dice_rolls}")
 
+    def start_game_model(self, publisher: event.Publisher) -> model.GameModel:
+        """Create the GameModel of the room, publishing its events to publisher"""
+        if self.game_model is not None:
+            raise ValueError(f"Room '{self.uid}' already has a game")
+        self.game_model = model.GameModel(local=False)
+        self.game_model.publisher = publisher
+        self.state = RoomState.PLAYING
+        return self.game_model
+
 
 @dataclass(kw_only=True, slots=True)
 class server:
@@ -49,40 +81,192 @@ class server:
     active_users: dict[str, User] = field(default_factory=dict)  # user_uid, User
     games: dict[str, game.Game] = field(default_factory=dict)  # game_uid, Game
     rooms: dict[str, Room] = field(default_factory=dict)  # room_uid, Room
+    lobby_index: LobbyIndex = field(default_factory=LobbyIndex)  # of the rooms
+    eviction: EvictionPolicy = field(default_factory=EvictionPolicy)
+    clock: Callable[[], float] = time.monotonic  # of the idle tracking
+    archive: GameArchive = field(init=False)  # of the finished games
+    evicted: EvictionCounters = field(init=False, default_factory=EvictionCounters)
+    _idle_users: IdleTracker = field(init=False)  # outside of a room
+    _idle_rooms: dict[RoomState, IdleTracker] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.archive = GameArchive(self.eviction.archive_size)
+        self._idle_users = IdleTracker()
+        self._idle_rooms = {state: IdleTracker() for state in RoomState}
 
-    def add_user(self, name: str) -> User:
-        new_user = User(name=name)
+    def add_user(self, name: str, uid: Optional[str] = None) -> User:
+        """uid is given by a front server routing the user to this server"""
+        new_user = User(name=name) if uid is None else User(name=name, uid=uid)
         self.active_users[new_user.uid] = new_user
+        self._idle_users.touch(new_user.uid, self.clock())
         return new_user
 
-    def create_room(self, user_uid: str, name: str) -> str:
+    def touch(self, user_uid: str) -> None:
+        """Record an activity of the user, e.g. a command, and of its room"""
+        user = self.active_users[user_uid]
+        if user.room_uid is None:
+            self._idle_users.touch(user.uid, self.clock())
+        else:
+            self._touch_room(self.rooms[user.room_uid])
+
+    def create_room(self, user_uid: str, name: str, uid: Optional[str] = None) -> str:
         user = self.active_users[user_uid]
         if user.room_uid is not None:
             raise ValueError(f"User '{user_uid}' already in room '{user.room_uid}'")
-        new_room = Room(host=user, name=name)
+        if uid in self.rooms:
+            raise ValueError(f"Room '{uid}' already exists")
+        new_room = (
+            Room(host=user, name=name)
+            if uid is None
+            else Room(host=user, name=name, uid=uid)
+        )
         self.rooms[new_room.uid] = new_room
+        self.lobby_index.add(new_room)
+        self._touch_room(new_room)
+        self._idle_users.touch(user.uid, self.clock())
         return new_room.uid
 
-    def list_rooms(self):
-        return [
-            {
-                "name": room.name,
-                "host": room.host.name,
-                "uid": room.uid,
-            }
-            for room in self.rooms.values()
-        ]
+    def list_rooms(
+        self,
+        page: int = 0,
+        page_size: int = DEFAULT_PAGE_SIZE,
+        state: Optional[RoomState] = None,
+        open_seats: bool = False,
+        prefix: str = "",
+    ) -> LobbyPage:
+        return self.lobby_index.page(page, page_size, state, open_seats, prefix)
 
     def join_room(self, user_uid: str, uid: str) -> None:
         user = self.active_users[user_uid]
-        self.rooms[uid].add_user(user)
+        if user.room_uid is not None:
+            raise ValueError(f"User '{user_uid}' already in room '{user.room_uid}'")
+        room = self.rooms[uid]
+        room.add_user(user)
         user.room_uid = uid
+        self.lobby_index.update(room)
+        self._idle_users.discard(user.uid)
+        self._touch_room(room)
+
+    def start_game(self, room_uid: str, publisher: event.Publisher) -> model.GameModel:
+        room = self.rooms[room_uid]
+        self._idle_rooms[room.state].discard(room.uid)
+        game_model = room.start_game_model(publisher)
+        self.games[game_model.id] = game_model.game
+        self.lobby_index.update(room)
+        self._touch_room(room)
+        return game_model
+
+    def end_game(self, room_uid: str) -> None:
+        """Archive the game of the room, the room is kept for finished_ttl"""
+        room = self.rooms[room_uid]
+        if room.state is not RoomState.PLAYING:
+            raise ValueError(f"Room '{room_uid}' is {room.state.value}")
+        self._idle_rooms[room.state].discard(room.uid)
+        room.state = RoomState.FINISHED
+        self._archive(room)
+        self.lobby_index.update(room)
+        self._touch_room(room)
+
+    def add_room(self, room: Room) -> None:
+        """Add a room moved from another server, with its users and game"""
+        if room.uid in self.rooms:
+            raise ValueError(f"Room '{room.uid}' already exists")
+        self.rooms[room.uid] = room
+        self.lobby_index.add(room)
+        self._touch_room(room)
+        for user in room.users:
+            self.active_users[user.uid] = user
+            self._idle_users.discard(user.uid)
+            user.room_uid = room.uid
+        if room.game_model is not None and room.state is RoomState.PLAYING:
+            self.games[room.game_model.id] = room.game_model.game
+
+    def remove_room(self, room_uid: str) -> Room:
+        """Remove the room with its users and game, e.g. to move it to another
+        server"""
+        room = self.rooms.pop(room_uid)
+        self.lobby_index.remove(room_uid)
+        self._idle_rooms[room.state].discard(room_uid)
+        for user in room.users:
+            self.active_users.pop(user.uid, None)
+        if room.game_model is not None:
+            self.games.pop(room.game_model.id, None)
+        return room
 
     def leave_room(self, user_uid: str) -> None:
         user = self.active_users[user_uid]
         assert user.room_uid is not None
-        self.rooms[user.room_uid].remove_user(user)
+        room = self.rooms[user.room_uid]
+        room.remove_user(user)
         user.room_uid = None
+        self.lobby_index.update(room)
+        self._idle_users.touch(user.uid, self.clock())
+        self._touch_room(room)
+
+    def evict_idle(self) -> Evicted:
+        """Evict the users, rooms and games idle for longer than their TTL. A
+        room is evicted with its users, and an abandoned game is archived"""
+        now = self.clock()
+        evicted = Evicted()
+        ttls = {
+            RoomState.OPEN: self.eviction.room_ttl,
+            RoomState.PLAYING: self.eviction.game_ttl,
+            RoomState.FINISHED: self.eviction.finished_ttl,
+        }
+        for state, ttl in ttls.items():
+            for room_uid in self._idle_rooms[state].pop_idle(now - ttl):
+                room = self.rooms.pop(room_uid)
+                self.lobby_index.remove(room_uid)
+                if state is RoomState.PLAYING:
+                    self._archive(room)
+                    self.evicted.games += 1
+                for user in room.users:
+                    if self.active_users.pop(user.uid, None) is not None:
+                        evicted.users.append(user.uid)
+                evicted.rooms.append(room_uid)
+        for user_uid in self._idle_users.pop_idle(now - self.eviction.user_ttl):
+            if self.active_users.pop(user_uid, None) is not None:
+                evicted.users.append(user_uid)
+        self.evicted.users += len(evicted.users)
+        self.evicted.rooms += len(evicted.rooms)
+        return evicted
+
+    def counters(self) -> dict[str, int]:
+        """Evictions so far and the objects resident now"""
+        return {
+            **self.evicted.to_dict(),
+            "resident_users": len(self.active_users),
+            "resident_rooms": len(self.rooms),
+            "resident_games": len(self.games),
+            "resident_archived_games": len(self.archive),
+        }
+
+    def _touch_room(self, room: Room) -> None:
+        self._idle_rooms[room.state].touch(room.uid, self.clock())
+
+    def _archive(self, room: Room) -> None:
+        """Archive the game of the room and close its topic"""
+        game_model = room.game_model
+        assert game_model is not None
+        self.games.pop(game_model.id, None)
+        not_started = game_model.state is model.game_model.GameState.NOT_STARTED
+        self.archive.add(
+            ArchivedGame(
+                id=game_model.id,
+                room_uid=room.uid,
+                room_name=room.name,
+                users=[user.uid for user in room.users],
+                # the board of a game is only set up when it starts
+                state=(
+                    b""
+                    if not_started
+                    else game_state.encode(game_model.game).to_bytes()
+                ),
+            )
+        )
+        self.evicted.archived_games += 1
+        if close_topic(game_model):
+            self.evicted.closed_topics += 1
 
     # def create_game(self, room_uid: str) -> None:
     #     self.rooms[room_uid].create_game()
@@ -5,6 +5,7 @@ from typing import Any, Callable, Optional
 
 import constants as c
 import event
+from event import payload
 from game import Game, card
 from game import positions as pos
 from game.actions import Action
@@ -40,6 +41,17 @@ def require_current_player(fn: Callable[..., Any]):
     return inner
 
 
+def batch_events(fn: Callable[..., Any]):
+    """Publish the events of the command as one batch of the publisher"""
+
+    def inner(*args: Any, **kwargs: Any) -> Any | None:
+        model = args[0]
+        with model.publisher.batch():
+            return fn(*args, **kwargs)
+
+    return inner
+
+
 @dataclass(slots=True)
 class GameModel:
     id: str
@@ -47,16 +59,20 @@ class GameModel:
     state: GameState
     publisher: event.Publisher
 
-    def __init__(self, local: bool) -> None:
+    def __init__(self, local: bool, coalesce: bool = False) -> None:
+        """coalesce merges the cash changes and moves of a player within a command"""
         self.id = uuid.uuid4().hex
         self.game = Game()
         self.state = GameState.NOT_STARTED
         if local:
             self.publisher = event.LocalPublisher()
+            if coalesce:
+                self.publisher = event.CoalescingPublisher(self.publisher)
 
     def register_publisher_topic(self, topic: event.Topic) -> None:
         self.publisher.register_topic(topic)
 
+    @batch_events
     def add_players(self, user_ids: list[str]) -> dict[str, int]:
         """add user to the game and set up user-player mapping"""
         user_to_player: dict[str, int] = {}
@@ -65,7 +81,8 @@ class GameModel:
             user_to_player[user_id] = player_id
         self.publisher.publish(
             event.Event(
-                event.EventType.G_ADD_PLAYER, {"user_to_player": user_to_player}
+                event.EventType.G_ADD_PLAYER,
+                payload.AddPlayers(user_to_player=user_to_player),
             )
         )
         return user_to_player
@@ -76,6 +93,7 @@ class GameModel:
             raise ValueError("Cannot assign token after the game has already started")
         self.game.assign_player_token(player_id, token=token)
 
+    @batch_events
     def start_game(self) -> None:
         if self.state is not GameState.NOT_STARTED:
             raise ValueError("The game has already started")
@@ -85,6 +103,7 @@ class GameModel:
         self._publish_current_player_event()
         # TODO send data about current states of the game and initialize view, and send first player roll_result
 
+    @batch_events
     @require_current_player
     def handle_end_turn_event(self, player_id: int) -> None:
         """receive input from player and handle end turn"""
@@ -110,6 +129,7 @@ class GameModel:
             self.state = GameState.WAIT_FOR_ROLL
             self._publish_wait_for_roll_event()
 
+    @batch_events
     @require_current_player
     def handle_roll_and_move_event(self, player_id: int):
         """receive input from player and handle roll and move"""
@@ -291,7 +311,7 @@ class GameModel:
             return
         player_pos = self.game.current_position
         if position is pos.Position.RAILROADS or position is pos.Position.UTILITIES:
-            pos_value = self._find_nearest_position(player_pos, position.value)
+            pos_value = pos.find_nearest_position(player_pos, position.value)
         else:
             pos_value = position.value
         self._move_player(self.game.current_player_id, position=pos_value)
@@ -303,16 +323,7 @@ class GameModel:
         self.state = GameState.WAIT_FOR_END_TURN
         self._publish_wait_for_end_turn_event()
 
-    @staticmethod
-    def _find_nearest_position(player_pos: int, search_pos: list[int]) -> int:
-        """Find the nearest position from search_pos that is ahead of the
-        player's current position."""
-        for position in search_pos:
-            assert position != player_pos, "Impossible for this"  # pragma: no cover
-            if player_pos < position:
-                return position
-        return search_pos[0]  # returns the first one after passing Go
-
+    @batch_events
     @require_current_player
     def handle_buy_event(self, player_id: int) -> None:
         """Handle event when a player buy a property after landing on it.
@@ -326,6 +337,7 @@ class GameModel:
 
         self._check_double_roll_or_end()
 
+    @batch_events
     @require_current_player
     def handle_auction_event(self, player_id: int) -> None:
         """Handle event when the player decided to auction the landed property"""
@@ -338,6 +350,7 @@ class GameModel:
         self._publish_start_auction_event(property_.id)
         self._publish_current_auction_event(property_.id)
 
+    @batch_events
     def handle_bid_event(self, player_id: int, amount: int) -> None:
         """Handle event when the player decided to bid on the property. Amount = 0 if pass"""
         if self.state is not GameState.AUCTION:
@@ -352,6 +365,7 @@ class GameModel:
             self._end_auction()
             self._check_double_roll_or_end()
 
+    @batch_events
     @require_current_player
     def handle_pay_event(self, player_id: int) -> None:
         if self.state not in (GameState.WAIT_FOR_PAY_RENT,):
@@ -361,17 +375,20 @@ class GameModel:
             self._transfer_player_cash(player_id, payee_id, rent)
             self._check_double_roll_or_end()
 
+    @batch_events
     @require_current_player
     def handle_property_status_event(self, player_id: int) -> None:
         property_status = self.game.get_player_property_status(player_id)
         self._publish_property_status_event(player_id, property_status)
 
+    @batch_events
     @require_current_player
     def handle_mortgage_event(self, player_id: int, property_id: int) -> None:
         mortgaged_value = self.game.mortgage_property(property_id)
         self._change_player_cash(player_id, mortgaged_value)
         self.handle_property_status_event(player_id)
 
+    @batch_events
     @require_current_player
     def handle_unmortgage_event(self, player_id: int, property_id: int) -> None:
         unmortgaged_value = self.game.unmortgage_property(property_id)
@@ -499,11 +516,11 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_MOVE,
-                {
-                    "player_id": player_id,
-                    "old_position": old_position,
-                    "new_position": new_position,
-                },
+                payload.Move(
+                    player_id=player_id,
+                    old_position=old_position,
+                    new_position=new_position,
+                ),
             )
         )
 
@@ -514,14 +531,18 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_CASH_CHANGE,
-                {"player_id": player_id, "old_cash": old_cash, "new_cash": new_cash},
+                payload.CashChange(
+                    player_id=player_id, old_cash=old_cash, new_cash=new_cash
+                ),
             )
         )
 
     def _publish_dice_event(self, dice_1: int, dice_2: int) -> None:
         """publish a dice roll event"""
         self.publisher.publish(
-            event.Event(event.EventType.G_DICE_ROLL, {"dices": (dice_1, dice_2)})
+            event.Event(
+                event.EventType.G_DICE_ROLL, payload.DiceRoll(dices=(dice_1, dice_2))
+            )
         )
 
     def _publish_game_state_event(self) -> event.Event:
@@ -535,7 +556,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_CURRENT_PLAYER,
-                {"player_id": self.game.current_player_id},
+                payload.PlayerPayload(player_id=self.game.current_player_id),
             )
         )
 
@@ -544,7 +565,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_WAIT_FOR_ROLL,
-                {"player_id": self.game.current_player_id},
+                payload.PlayerPayload(player_id=self.game.current_player_id),
             )
         )
 
@@ -553,7 +574,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_WAIT_FOR_END_TURN,
-                {"player_id": self.game.current_player_id},
+                payload.PlayerPayload(player_id=self.game.current_player_id),
             )
         )
 
@@ -562,7 +583,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_ASK_TO_BUY,
-                {"player_id": player_id, "property_id": property_id},
+                payload.PropertyPayload(player_id=player_id, property_id=property_id),
             )
         )
 
@@ -571,7 +592,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_BUY_PROPERTY,
-                {"player_id": player_id, "property_id": property_id},
+                payload.PropertyPayload(player_id=player_id, property_id=property_id),
             )
         )
 
@@ -580,9 +601,7 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_START_AUCTION,
-                {
-                    "property_id": property_id,
-                },
+                payload.StartAuction(property_id=property_id),
             )
         )
 
@@ -591,12 +610,12 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_CURRENT_AUCTION,
-                {
-                    "player_id": self.game.current_bidder_id,
-                    "bidders": [player.uid for player in self.game.bidders],
-                    "property_id": property_id,
-                    "price": self.game.current_bid_price,
-                },
+                payload.CurrentAuction(
+                    player_id=self.game.current_bidder_id,
+                    bidders=[player.uid for player in self.game.bidders],
+                    property_id=property_id,
+                    price=self.game.current_bid_price,
+                ),
             )
         )
 
@@ -607,11 +626,9 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_END_AUCTION,
-                {
-                    "player_id": player_id,
-                    "property_id": property_id,
-                    "price": price,
-                },
+                payload.EndAuction(
+                    player_id=player_id, property_id=property_id, price=price
+                ),
             )
         )
 
@@ -622,12 +639,12 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_ASK_FOR_RENT,
-                {
-                    "payer_id": payer_id,
-                    "payee_id": payee_id,
-                    "rent": rent,
-                    "property_id": property_id,
-                },
+                payload.AskForRent(
+                    payer_id=payer_id,
+                    payee_id=payee_id,
+                    rent=rent,
+                    property_id=property_id,
+                ),
             )
         )
 
@@ -638,11 +655,11 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_DRAW_CHANCE_CARD,
-                {
-                    "player_id": player_id,
-                    "description": drawn_card.description,
-                    "ownable": drawn_card.ownable,
-                },
+                payload.DrawChanceCard(
+                    player_id=player_id,
+                    description=drawn_card.description,
+                    ownable=drawn_card.ownable,
+                ),
             )
         )
 
@@ -653,11 +670,9 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_CHARGE_TAX,
-                {
-                    "player_id": player_id,
-                    "tax_amount": tax_amount,
-                    "tax_type": tax_type,
-                },
+                payload.ChargeTax(
+                    player_id=player_id, tax_amount=tax_amount, tax_type=tax_type
+                ),
             )
         )
 
@@ -668,10 +683,9 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_COLLECT_JAIL_CARD,
-                {
-                    "player_id": player_id,
-                    "current_card_amount": current_card_amount,
-                },
+                payload.CollectJailCard(
+                    player_id=player_id, current_card_amount=current_card_amount
+                ),
             )
         )
 
@@ -682,6 +696,8 @@ class GameModel:
         self.publisher.publish(
             event.Event(
                 event.EventType.G_PROPERTY_STATUS,
-                {"player_id": player_id, "property_status": property_status},
+                payload.PropertyStatus(
+                    player_id=player_id, property_status=property_status
+                ),
             )
         )
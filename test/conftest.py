@@ -116,6 +116,7 @@ def game_middle(game_beginning: Game) -> Game:
 
     monopoly_properties[0].no_of_houses = 4
     monopoly_properties[1].no_of_hotels = 1
+    game_beginning.recompute_player_totals()
 
     return game_beginning
 
@@ -129,23 +129,23 @@ class TestPropertySetCountOwner:
         self,
         prop_set_four_unowned: space.PropertySet,
     ):
-        prop_set_four_unowned.properties[2].owner_uid = 1
+        prop_set_four_unowned.properties[2].assign_owner(1)
         assert prop_set_four_unowned.count_owned(1) == 1
 
     def test_property_set_count_owner_unowned_with_other_owned(
         self,
         prop_set_four_unowned: space.PropertySet,
     ):
-        prop_set_four_unowned.properties[2].owner_uid = 1
-        prop_set_four_unowned.properties[3].owner_uid = 10
+        prop_set_four_unowned.properties[2].assign_owner(1)
+        prop_set_four_unowned.properties[3].assign_owner(10)
         assert prop_set_four_unowned.count_owned(5) == 0
 
     def test_property_set_count_owner_three_owned(
         self, prop_set_four_unowned: space.PropertySet
     ):
-        prop_set_four_unowned.properties[0].owner_uid = 1
-        prop_set_four_unowned.properties[2].owner_uid = 1
-        prop_set_four_unowned.properties[3].owner_uid = 1
+        prop_set_four_unowned.properties[0].assign_owner(1)
+        prop_set_four_unowned.properties[2].assign_owner(1)
+        prop_set_four_unowned.properties[3].assign_owner(1)
         assert prop_set_four_unowned.count_owned(1) == 3
 
 
@@ -183,3 +183,47 @@ class TestPropertySetCheckEvenHousesOrHotels:
     ):
         prop_set_monopoly.monopoly = False
         assert prop_set_monopoly.check_evenly_remove_house_or_hotel(0) is False
+
+
+class TestPropertySetOwnerCounts:
+    def test_assign_owner_counts(self, prop_set_four_unowned: space.PropertySet):
+        properties = prop_set_four_unowned.properties
+        for property_ in properties[:3]:
+            property_.assign_owner(1)
+        assert prop_set_four_unowned.count_owned(1) == 3
+        assert prop_set_four_unowned.monopoly is False
+        assert prop_set_four_unowned.monopoly_owner is None
+
+        properties[3].assign_owner(1)
+        assert prop_set_four_unowned.monopoly is True
+        assert prop_set_four_unowned.monopoly_owner == 1
+
+    def test_transfer_owner(self, prop_set_four_unowned: space.PropertySet):
+        for property_ in prop_set_four_unowned.properties:
+            property_.assign_owner(1)
+        prop_set_four_unowned.properties[0].assign_owner(2)
+        assert prop_set_four_unowned.count_owned(1) == 3
+        assert prop_set_four_unowned.count_owned(2) == 1
+        assert prop_set_four_unowned.monopoly is False
+
+        for property_ in prop_set_four_unowned.properties[1:]:
+            property_.assign_owner(2)
+        assert prop_set_four_unowned.count_owned(1) == 0
+        assert prop_set_four_unowned.monopoly_owner == 2
+
+    def test_remove_owner(self, prop_set_four_unowned: space.PropertySet):
+        for property_ in prop_set_four_unowned.properties:
+            property_.assign_owner(1)
+        prop_set_four_unowned.properties[2].remove_owner()
+        assert prop_set_four_unowned.count_owned(1) == 3
+        assert prop_set_four_unowned.monopoly is False
+
+    def test_reassign_same_owner(self, prop_set_four_unowned: space.PropertySet):
+        prop_set_four_unowned.properties[0].assign_owner(1)
+        prop_set_four_unowned.properties[0].assign_owner(1)
+        assert prop_set_four_unowned.count_owned(1) == 1
+
+    def test_add_owned_property(self, prop_set_monopoly: space.PropertySet):
+        prop_set_monopoly.update_monopoly()
+        assert prop_set_monopoly.count_owned(1) == 2
+        assert prop_set_monopoly.monopoly_owner == 1
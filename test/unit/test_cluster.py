@@ -0,0 +1,181 @@
+import asyncio
+import json
+import os
+import tempfile
+from collections import Counter
+from typing import Any
+
+import pytest
+
+from host.cluster import FrontServer, HashRing, _Upstream
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.events: list[dict[str, Any]] = []
+        self._next_id = 0
+
+    async def request(self, op: str, **fields: Any) -> dict[str, Any]:
+        self._next_id += 1
+        line = {"op": op, "id": self._next_id, **fields}
+        self.writer.write(json.dumps(line).encode() + b"\n")
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if reply["op"] != "event":
+                return reply
+            self.events.append(reply)
+
+
+def next_command(events: list[dict[str, Any]]) -> tuple[str, str]:
+    """Command expected by the game after the events, and the player field"""
+    return {
+        "g_wait_for_roll": ("v_roll_and_move", "player_id"),
+        "g_wait_for_end_turn": ("v_end_turn", "player_id"),
+        "g_ask_to_buy": ("v_buy_property", "player_id"),
+        "g_ask_for_rent": ("v_pay", "payer_id"),
+    }[events[-1]["type"]]
+
+
+def test_hash_ring():
+    ring = HashRing(replicas=64)
+    with pytest.raises(ValueError, match="The ring has no nodes"):
+        ring.node_of("room")
+    for node in ("a", "b", "c"):
+        ring.add(node)
+    with pytest.raises(ValueError, match="Node a is already in the ring"):
+        ring.add("a")
+    keys = [f"room-{idx}" for idx in range(3000)]
+    owners = {key: ring.node_of(key) for key in keys}
+    assert all(600 < count < 1400 for count in Counter(owners.values()).values())
+
+    ring.add("d")
+    moved = {key for key in keys if ring.node_of(key) != owners[key]}
+    assert {ring.node_of(key) for key in moved} == {"d"}
+    assert 300 < len(moved) < 1200  # about a quarter
+
+    ring.remove("a")
+    assert ring.nodes == ["b", "c", "d"]
+    for key in keys:
+        if owners[key] != "a" and key not in moved:
+            assert ring.node_of(key) == owners[key]
+    with pytest.raises(ValueError, match="Node a is not in the ring"):
+        ring.remove("a")
+
+
+class RecordingConnection:
+    def __init__(self) -> None:
+        self.sent: list[bytes] = []
+
+    def send(self, data: bytes) -> None:
+        self.sent.append(data)
+
+
+def test_upstream_forwards_complete_lines():
+    async def main() -> None:
+        async def worker(
+            reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+        ) -> None:
+            for part in (b'{"op":"event","seq":1}\n{"op":"ev', b'ent","seq":2}\n'):
+                writer.write(part)
+                await writer.drain()
+                await asyncio.sleep(0.01)
+            writer.close()
+
+        path = os.path.join(tempfile.mkdtemp(), "worker.sock")
+        unix_server = await asyncio.start_unix_server(worker, path)
+        client = RecordingConnection()
+        reader, writer = await asyncio.open_unix_connection(path)
+        upstream = _Upstream(reader, writer, client)  # type: ignore[arg-type]
+        await upstream._task
+        upstream.close()
+        unix_server.close()
+        assert client.sent == [b'{"op":"event","seq":1}\n', b'{"op":"event","seq":2}\n']
+
+    asyncio.run(main())
+
+
+def test_move_room_between_workers():
+    async def main() -> None:
+        front = FrontServer()
+        for _ in range(2):
+            await front.add_worker()
+        path = os.path.join(tempfile.mkdtemp(), "front.sock")
+        unix_server = await front.start_unix(path)
+        client = Client(*await asyncio.open_unix_connection(path))
+        try:
+            users = [
+                (await client.request("login", name=name))["user"]
+                for name in ("alice", "bob")
+            ]
+            reply = await client.request("create_room", user=users[0], name="r")
+            room_uid = reply["room"]
+            await client.request("join_room", user=users[1], room=room_uid)
+            assert (await client.request("start", user=users[0]))["op"] == "done"
+            players = client.events[0]["message"]["user_to_player"]
+            current = client.events[-1]["message"]["player_id"]
+            user = next(uid for uid, player in players.items() if player == current)
+            reply = await client.request("command", user=user, type="v_roll_and_move")
+            assert reply["op"] == "done"
+            reply = await client.request("fly", user=user)
+            assert reply["error"] == "Unknown op fly"
+
+            old_worker = front.worker_of(room_uid)
+            await front.remove_worker(old_worker)
+            assert front.worker_of(room_uid) != old_worker
+            assert front.moved_count == 1
+            assert list(front.room_counts().values()) == [1]
+
+            # the game goes on from its state on the old worker
+            n_events = len(client.events)
+            command, field = next_command(client.events)
+            player = client.events[-1]["message"][field]
+            user = next(uid for uid, other in players.items() if other == player)
+            reply = await client.request("command", user=user, type=command)
+            assert reply["op"] == "done"
+            assert len(client.events) > n_events
+            seqs = [event["seq"] for event in client.events]
+            assert seqs == list(range(1, len(seqs) + 1))
+        finally:
+            client.writer.close()
+            unix_server.close()
+            await front.close()
+
+    asyncio.run(main())
+
+
+def test_seat_users_accepted_by_the_worker():
+    async def main() -> None:
+        front = FrontServer()
+        await front.add_worker()
+        path = os.path.join(tempfile.mkdtemp(), "front.sock")
+        unix_server = await front.start_unix(path)
+        client = Client(*await asyncio.open_unix_connection(path))
+        try:
+            users = [
+                (await client.request("login", name=name))["user"]
+                for name in ("alice", "bob", "carol")
+            ]
+            room_uid = (await client.request("create_room", user=users[0]))["room"]
+            reply = await client.request("create_room", user=users[0])
+            assert reply["error"] == f"User '{users[0]}' already in room '{room_uid}'"
+            reply = await client.request("join_room", user=users[1], room=room_uid)
+            assert reply == {"op": "done", "id": reply["id"], "room": room_uid}
+            assert (await client.request("start", user=users[0]))["op"] == "done"
+            reply = await client.request("join_room", user=users[2], room=room_uid)
+            assert reply["error"] == f"Room '{room_uid}' is playing"
+            assert front.users[users[2]].room_uid is None
+            assert list(front.rooms) == [room_uid]
+            assert front.rooms[room_uid].users == users[:2]
+        finally:
+            client.writer.close()
+        while front.users or front.rooms:  # dropped with the client
+            await asyncio.sleep(0.01)
+        control = front.workers[front.ring.nodes[0]].control
+        with pytest.raises(ValueError, match="Unknown room"):  # removed
+            await control.request({"op": "remove_room", "room": room_uid})
+        unix_server.close()
+        await front.close()
+
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+import pytest
+
+import constants as c
+import model
+from event import CoalescingPublisher, Event, EventType, Publisher
+
+
+class RecordingPublisher(Publisher):
+    def __init__(self):
+        self.events: list[Event] = []
+
+    def publish(self, event: Event) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder() -> RecordingPublisher:
+    return RecordingPublisher()
+
+
+@pytest.fixture
+def coalescer(recorder: RecordingPublisher) -> CoalescingPublisher:
+    return CoalescingPublisher(recorder)
+
+
+def cash_event(player_id: int, old_cash: int, new_cash: int) -> Event:
+    return Event(
+        EventType.G_CASH_CHANGE,
+        {"player_id": player_id, "old_cash": old_cash, "new_cash": new_cash},
+    )
+
+
+def move_event(player_id: int, old_position: int, new_position: int) -> Event:
+    return Event(
+        EventType.G_MOVE,
+        {
+            "player_id": player_id,
+            "old_position": old_position,
+            "new_position": new_position,
+        },
+    )
+
+
+def dice_event() -> Event:
+    return Event(EventType.G_DICE_ROLL, {"dices": (1, 2)})
+
+
+def test_publish_outside_batch(
+    coalescer: CoalescingPublisher, recorder: RecordingPublisher
+):
+    events = [cash_event(0, 1500, 1700), cash_event(0, 1700, 1500)]
+    for event in events:
+        coalescer.publish(event)
+    assert recorder.events == events
+
+
+def test_merge_per_player(coalescer: CoalescingPublisher, recorder: RecordingPublisher):
+    with coalescer.batch():
+        coalescer.publish(dice_event())
+        coalescer.publish(move_event(0, 35, 42))
+        coalescer.publish(cash_event(0, 1500, 1700))
+        coalescer.publish(move_event(0, 42, 2))
+        coalescer.publish(cash_event(1, 1500, 1450))
+        coalescer.publish(cash_event(0, 1700, 1750))
+        assert recorder.events == []
+    assert [event.event_type for event in recorder.events] == [
+        EventType.G_DICE_ROLL,
+        EventType.G_MOVE,
+        EventType.G_CASH_CHANGE,
+        EventType.G_CASH_CHANGE,
+    ]
+    assert recorder.events[1].message == {
+        "player_id": 0,
+        "old_position": 35,
+        "new_position": 2,
+    }
+    assert recorder.events[2].message == {
+        "player_id": 0,
+        "old_cash": 1500,
+        "new_cash": 1750,
+    }
+    assert recorder.events[3].message["player_id"] == 1
+    assert coalescer.merged_count == 2
+
+
+def test_other_event_ends_run(
+    coalescer: CoalescingPublisher, recorder: RecordingPublisher
+):
+    with coalescer.batch():
+        coalescer.publish(cash_event(0, 1500, 1700))
+        coalescer.publish(dice_event())
+        coalescer.publish(cash_event(0, 1700, 1800))
+    assert len(recorder.events) == 3
+    assert coalescer.merged_count == 0
+
+
+def test_nested_batches(coalescer: CoalescingPublisher, recorder: RecordingPublisher):
+    with coalescer.batch():
+        coalescer.publish(cash_event(0, 1500, 1700))
+        with coalescer.batch():
+            coalescer.publish(cash_event(0, 1700, 1800))
+        assert recorder.events == []
+    assert len(recorder.events) == 1
+    assert recorder.events[0].message["new_cash"] == 1800
+
+
+def test_flush_on_error(coalescer: CoalescingPublisher, recorder: RecordingPublisher):
+    with pytest.raises(ValueError):
+        with coalescer.batch():
+            coalescer.publish(cash_event(0, 1500, 1700))
+            raise ValueError("failed command")
+    assert len(recorder.events) == 1
+
+
+def test_game_model_pass_go(
+    recorder: RecordingPublisher, monkeypatch: pytest.MonkeyPatch
+):
+    game_model = model.GameModel(local=True, coalesce=True)
+    assert isinstance(game_model.publisher, CoalescingPublisher)
+    game_model.publisher.publisher = recorder
+    game_model.add_players(["a", "b"])
+    game_model.start_game()
+    player_id = game_model.game.current_player_id
+    game_model.game.players[player_id].position = 35
+    recorder.events.clear()
+
+    monkeypatch.setattr("game.dice.roll", lambda **_: (2, 3))  # lands on Go
+    game_model.handle_roll_and_move_event(player_id)
+    assert [event.event_type for event in recorder.events] == [
+        EventType.G_DICE_ROLL,
+        EventType.G_MOVE,
+        EventType.G_CASH_CHANGE,
+        EventType.G_WAIT_FOR_END_TURN,
+    ]
+    assert recorder.events[1].message["old_position"] == 35
+    assert recorder.events[1].message["new_position"] == 0
+    assert recorder.events[2].message["new_cash"] == (
+        recorder.events[2].message["old_cash"] + c.CONST_GO_CASH
+    )
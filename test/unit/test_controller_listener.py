@@ -0,0 +1,57 @@
+import pytest
+
+from controller import ControllerListener
+from event import Event, EventType, payload
+
+
+class RecordingController:
+    def __init__(self):
+        self.calls: list[tuple] = []
+
+    def add_players(self, user_ids: list[str]) -> dict[str, int]:
+        return {user_id: idx for idx, user_id in enumerate(user_ids)}
+
+    def __getattr__(self, name: str):
+        return lambda *args: self.calls.append((name, *args))
+
+
+@pytest.fixture
+def listener() -> ControllerListener:
+    listener = ControllerListener(RecordingController())  # type: ignore[arg-type]
+    listener.listen(
+        Event(EventType.V_ADD_PLAYER, payload.AddUsers(user_ids=["a", "b"]))
+    )
+    return listener
+
+
+def test_handlers_cover_user_commands(listener: ControllerListener):
+    commands = {
+        event_type
+        for event_type, payload_type in payload.PAYLOAD_TYPES.items()
+        if payload_type is payload.UserCommand
+    }
+    assert commands < set(listener.handlers)
+    assert not any(
+        event_type.value.startswith("g_") for event_type in listener.handlers
+    )
+
+
+@pytest.mark.parametrize(
+    ("event_type", "call"),
+    [
+        (EventType.V_ROLL_AND_MOVE, ("roll_and_move", 1)),
+        (EventType.V_BID_50, ("bid_property", 1, 50)),
+        (EventType.V_BID_PASS, ("bid_property", 1, 0)),
+        (EventType.V_MORTGAGE, ("mortgage", 1, 3)),
+    ],
+)
+def test_dispatch(listener: ControllerListener, event_type: EventType, call: tuple):
+    command = payload.UserCommand(user_id="b", property_id=3)
+    listener.listen(Event(event_type, command))
+    assert listener.game_controller.calls == [call]  # type: ignore[attr-defined]
+
+
+def test_ignore_game_events(listener: ControllerListener):
+    message = payload.DiceRoll(dices=(1, 2))
+    listener.listen(Event(EventType.G_DICE_ROLL, message))
+    assert listener.game_controller.calls == []  # type: ignore[attr-defined]
@@ -1,3 +1,5 @@
+import random
+
 import pytest
 from game import card
 
@@ -53,3 +55,10 @@ def test_deck_append_owned_card(chance_cards_deck: card.Deck):
 
     assert len(chance_cards_deck.cards) == original_length
     assert chance_cards_deck.cards[-1] == drawn_card
+
+
+def test_deck_shuffle_with_rng(chance_cards_full: list[card.ChanceCard]):
+    decks = [card.Deck(name="Chance Cards") for _ in range(2)]
+    decks[0].shuffle_add_cards(cards=list(chance_cards_full), rng=random.Random(3))
+    decks[1].shuffle_add_cards(cards=list(chance_cards_full), seed=3)
+    assert decks[0].cards == decks[1].cards
@@ -0,0 +1,107 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from event import (
+    CoalescingPublisher,
+    Event,
+    EventRuntime,
+    EventType,
+    Publisher,
+    Topic,
+    payload,
+)
+
+
+class RecordingSubscriber:
+    def __init__(self):
+        self.events: list[Event] = []
+
+    async def listen(self, event: Event) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture
+def runtime():
+    runtime = EventRuntime()
+    yield runtime
+    runtime.close()
+
+
+def test_event_defaults():
+    before = time.monotonic_ns()
+    event = Event(EventType.G_DICE_ROLL, payload.DiceRoll(dices=(1, 2)))
+    assert event.seq == -1
+    assert before <= event.timestamp_ns <= time.monotonic_ns()
+
+
+def test_event_timestamp():
+    event = Event(EventType.V_START_GAME, payload.Empty())
+    timestamp = event.timestamp
+    assert timestamp.tzinfo is timezone.utc
+    assert abs(datetime.now(timezone.utc) - timestamp) < timedelta(seconds=1)
+
+
+def test_topic_sequence(runtime: EventRuntime):
+    topics = [Topic("first", runtime=runtime), Topic("second", runtime=runtime)]
+    subscribers = [RecordingSubscriber(), RecordingSubscriber()]
+    for topic, subscriber in zip(topics, subscribers):
+        topic.register_subscriber(subscriber)
+        for player_id in range(5):
+            topic.publish(
+                Event(
+                    EventType.G_CURRENT_PLAYER,
+                    payload.PlayerPayload(player_id=player_id),
+                )
+            )
+        assert topic.drain(timeout=5)
+    for subscriber in subscribers:
+        assert [event.seq for event in subscriber.events] == list(range(1, 6))
+
+
+def test_payload_access():
+    message = payload.Move(player_id=1, old_position=35, new_position=2)
+    assert message["player_id"] == 1
+    assert message["new_position"] == 2
+    assert message.to_dict() == {
+        "player_id": 1,
+        "old_position": 35,
+        "new_position": 2,
+    }
+    with pytest.raises(AttributeError):
+        message["cash"]
+    assert not hasattr(message, "__dict__")
+
+
+def test_payload_types_cover_event_types():
+    assert set(payload.PAYLOAD_TYPES) == set(EventType)
+    user_command = payload.PAYLOAD_TYPES[EventType.V_BID_10](user_id="user")
+    assert user_command.to_dict() == {"user_id": "user", "property_id": None}
+
+
+class RecordingPublisher(Publisher):
+    def __init__(self):
+        self.events: list[Event] = []
+
+    def publish(self, event: Event) -> None:
+        self.events.append(event)
+
+
+def test_coalesce_payloads():
+    recorder = RecordingPublisher()
+    coalescer = CoalescingPublisher(recorder)
+    with coalescer.batch():
+        for old_cash, new_cash in ((1500, 1700), (1700, 1650)):
+            coalescer.publish(
+                Event(
+                    EventType.G_CASH_CHANGE,
+                    payload.CashChange(
+                        player_id=0, old_cash=old_cash, new_cash=new_cash
+                    ),
+                )
+            )
+    assert len(recorder.events) == 1
+    assert recorder.events[0].message == payload.CashChange(
+        player_id=0, old_cash=1500, new_cash=1650
+    )
@@ -0,0 +1,158 @@
+import gc
+import tracemalloc
+
+import pytest
+
+from event import LocalPublisher, Topic
+from event.runtime import EventRuntime
+from host.eviction import EvictionPolicy, IdleTracker
+from host.lobby import RoomState
+from host.server import server
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_idle_tracker():
+    tracker = IdleTracker()
+    for idx, key in enumerate("abc"):
+        tracker.touch(key, idx)
+    tracker.touch("a", 3)
+    assert tracker.pop_idle(2) == ["b"]
+    assert tracker.pop_idle(2) == []
+    tracker.discard("c")
+    assert "c" not in tracker
+    assert tracker.pop_idle(10) == ["a"]
+    assert len(tracker) == 0
+    with pytest.raises(ValueError, match="user_ttl must not be negative"):
+        EvictionPolicy(user_ttl=-1)
+
+
+def test_evict_idle_objects():
+    clock = Clock()
+    policy = EvictionPolicy(user_ttl=10, room_ttl=20, game_ttl=30, finished_ttl=5)
+    lobby = server(eviction=policy, clock=clock)
+    runtime = EventRuntime()
+    try:
+        idle = lobby.add_user("idle")
+        host = lobby.add_user("host")
+        open_uid = lobby.create_room(host.uid, "open")
+        lobby.join_room(host.uid, open_uid)
+        players = [lobby.add_user(name) for name in ("alice", "bob")]
+        game_uid = lobby.create_room(players[0].uid, "game")
+        for player in players:
+            lobby.join_room(player.uid, game_uid)
+        publisher = LocalPublisher()
+        topic = Topic("game", runtime=runtime)
+        publisher.register_topic(topic)
+        game_model = lobby.start_game(game_uid, publisher)
+        game_model.add_players([player.uid for player in players])
+        game_model.start_game()
+
+        clock.now = 9
+        lobby.touch(idle.uid)
+        clock.now = 15
+        assert lobby.evict_idle().users == []
+        clock.now = 25  # the open room and idle user are idle for over their TTL
+        lobby.touch(players[1].uid)
+        evicted = lobby.evict_idle()
+        assert evicted.rooms == [open_uid]
+        assert evicted.users == [host.uid, idle.uid]
+        assert lobby.lobby_index.page().total == 1
+
+        clock.now = 60  # the game is abandoned
+        evicted = lobby.evict_idle()
+        assert evicted.rooms == [game_uid]
+        assert topic.closed
+        assert topic.drain(timeout=1)
+        archived = lobby.archive.get(game_model.id)
+        assert archived.users == [player.uid for player in players]
+        assert archived.state
+        assert lobby.counters() == {
+            "evicted_users": 4,
+            "evicted_rooms": 2,
+            "evicted_games": 1,
+            "archived_games": 1,
+            "closed_topics": 1,
+            "resident_users": 0,
+            "resident_rooms": 0,
+            "resident_games": 0,
+            "resident_archived_games": 1,
+        }
+    finally:
+        runtime.close(timeout=1)
+
+
+def test_finished_game():
+    clock = Clock()
+    lobby = server(eviction=EvictionPolicy(finished_ttl=5, archive_size=1), clock=clock)
+    game_ids = []
+    for name in ("first", "second"):
+        user = lobby.add_user(name)
+        room_uid = lobby.create_room(user.uid, name)
+        lobby.join_room(user.uid, room_uid)
+        game_ids.append(lobby.start_game(room_uid, LocalPublisher()).id)
+        lobby.end_game(room_uid)
+    assert lobby.games == {}
+    assert game_ids[0] not in lobby.archive and game_ids[1] in lobby.archive
+    assert lobby.archive.get(game_ids[1]).state == b""  # not started
+    assert lobby.list_rooms(state=RoomState.FINISHED).total == 2
+    clock.now = 6
+    assert len(lobby.evict_idle().rooms) == 2
+    assert lobby.counters()["evicted_games"] == 0
+
+
+def test_evict_rooms_of_a_user_joining_twice():
+    clock = Clock()
+    lobby = server(eviction=EvictionPolicy(room_ttl=5), clock=clock)
+    user = lobby.add_user("alice")
+    room_uids = [lobby.create_room(user.uid, name) for name in ("first", "second")]
+    lobby.join_room(user.uid, room_uids[0])
+    with pytest.raises(ValueError, match="already in room"):
+        lobby.join_room(user.uid, room_uids[1])
+    assert lobby.rooms[room_uids[1]].users == []
+    lobby.rooms[room_uids[1]].users.append(user)  # seated by an older version
+    clock.now = 6
+    evicted = lobby.evict_idle()
+    assert sorted(evicted.rooms) == sorted(room_uids)
+    assert evicted.users == [user.uid]
+    assert lobby.active_users == {}
+
+
+def test_soak_abandoned_users_and_rooms():
+    clock = Clock()
+    lobby = server(eviction=EvictionPolicy(user_ttl=1, room_ttl=1), clock=clock)
+
+    def abandon(n: int) -> None:
+        for idx in range(n):
+            user = lobby.add_user(f"user-{idx}")
+            if idx % 2:
+                room_uid = lobby.create_room(user.uid, f"room-{idx}")
+                lobby.join_room(user.uid, room_uid)
+            if idx % 1000 == 999:
+                clock.now += 1
+                lobby.evict_idle()
+
+    abandon(90_000)
+    tracemalloc.start()  # slows the allocations down, so only for the last ones
+    try:
+        abandon(5000)  # the objects resident when tracing started are not traced
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        abandon(5000)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    counters = lobby.counters()
+    assert counters["evicted_users"] + counters["resident_users"] == 100_000
+    assert counters["evicted_rooms"] + counters["resident_rooms"] == 50_000
+    assert counters["resident_users"] <= 2000
+    assert counters["resident_rooms"] <= 1000
+    assert len(lobby.lobby_index) == counters["resident_rooms"]
+    assert growth < 256 * 1024  # holding them would take 3 MiB
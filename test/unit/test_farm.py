@@ -0,0 +1,73 @@
+import pytest
+
+from game import farm, sim
+
+
+@pytest.fixture
+def farm_greedy() -> farm.SimulationFarm:
+    return farm.SimulationFarm(
+        policies=[sim.GreedyPolicy() for _ in range(4)],
+        master_seed=9001,
+        workers=1,
+        chunk_size=3,
+        max_turns=300,
+    )
+
+
+def test_derive_seed():
+    assert farm.derive_seed(1, 2) == farm.derive_seed(1, 2)
+    assert farm.derive_seed(1, 2) != farm.derive_seed(1, 3)
+    assert farm.derive_seed(1, 2) != farm.derive_seed(2, 1)
+    assert farm.derive_seed(1) != farm.derive_seed(1, 0)
+    assert 0 <= farm.derive_seed(-5, 7) < 2**64
+
+
+def test_run_stats(farm_greedy: farm.SimulationFarm):
+    stats = farm_greedy.run(10)
+    assert stats.games == 10
+    assert stats.timeouts + sum(stats.wins) == 10
+    assert 0 < stats.turns <= 10 * farm_greedy.max_turns
+
+
+def test_run_reproducible(farm_greedy: farm.SimulationFarm):
+    chunk_1 = farm_greedy.play_chunk((0, 5))
+    chunk_2 = farm_greedy.play_chunk((0, 5))
+    assert chunk_1.winners == chunk_2.winners
+    assert chunk_1.turns == chunk_2.turns
+    # a game plays the same in another chunk
+    chunk_3 = farm_greedy.play_chunk((3, 5))
+    assert chunk_3.turns == chunk_1.turns[3:]
+
+
+def test_run_independent_of_workers(farm_greedy: farm.SimulationFarm):
+    stats_1 = farm_greedy.run(12)
+    farm_greedy.workers = 3
+    stats_3 = farm_greedy.run(12)
+    assert (stats_1.games, stats_1.turns, stats_1.timeouts, stats_1.wins) == (
+        stats_3.games,
+        stats_3.turns,
+        stats_3.timeouts,
+        stats_3.wins,
+    )
+
+
+def test_run_master_seed(farm_greedy: farm.SimulationFarm):
+    turns = farm_greedy.play_chunk((0, 6)).turns
+    farm_greedy.master_seed = 1
+    assert farm_greedy.play_chunk((0, 6)).turns != turns
+
+
+def test_random_policy_reseeded():
+    simulation_farm = farm.SimulationFarm(
+        policies=[sim.RandomPolicy() for _ in range(3)], workers=1, max_turns=50
+    )
+    assert simulation_farm.play_chunk((0, 4)) == simulation_farm.play_chunk((0, 4))
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(0, 1), (1, 0)])
+def test_run_invalid(workers: int, chunk_size: int):
+    simulation_farm = farm.SimulationFarm(
+        policies=[sim.PassivePolicy()], workers=workers, chunk_size=chunk_size
+    )
+    with pytest.raises(ValueError):
+        simulation_farm.run(1)
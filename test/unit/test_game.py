@@ -7,6 +7,7 @@ from game.actions import Action
 from game.enum_types import DeckType
 from game.game import Game
 from game.game_map import GameMap
+from game.rng import GameRng
 
 
 def fn_test_initialize_deck(
@@ -28,6 +29,18 @@ def fn_test_initialize_game_map(game: Game, map_list: list[str]):
 
 
 class TestGameInitialization:
+    def test_initialize_seeded(self):
+        def card_ids(rng_seed: int) -> tuple[list[int], list[int]]:
+            game = Game(rng=GameRng(rng_seed))
+            game.initialize()
+            return (
+                [card.id for card in game.chance_deck.cards],
+                [card.id for card in game.cc_deck.cards],
+            )
+
+        assert card_ids(1) == card_ids(1)
+        assert card_ids(1) != card_ids(2)
+
     def test_game_init(self, game_init: Game, game_map_simple: GameMap):
         assert id(game_init.game_map) == id(game_map_simple)
         assert game_init.players == []
@@ -116,6 +129,12 @@ class TestRoll:
             for roll in dice_rolls:
                 assert roll in list(range(1, 7))
 
+    def test_roll_dice_seeded(self, game_with_players: Game):
+        game_with_players.rng = GameRng(5)
+        rolls = [game_with_players.roll_dice() for _ in range(20)]
+        game_with_players.rng = GameRng(5)
+        assert [game_with_players.roll_dice() for _ in range(20)] == rolls
+
     def test_check_double_roll_with_none(self, game_with_players: Game):
         action = game_with_players.check_double_roll(player_uid=2, dice_1=5, dice_2=5)
         assert action is Action.ASK_TO_ROLL
@@ -464,3 +483,204 @@ def test_next_player(game_with_players: Game):
     next_player = game_with_players.next_player_and_reset()
     assert cur_player is not None
     assert next_player.uid == (cur_player + 1) % len(game_with_players.players)
+
+
+def test_next_player_skips_inactive(game_with_players: Game):
+    game_with_players.current_player_uid = 0
+    game_with_players.players[1].active = False
+    assert game_with_players.next_player_and_reset().uid == 2
+    assert len(game_with_players.active_players) == 3
+
+
+class TestJail:
+    def test_send_player_to_jail(self, game_beginning: Game):
+        game_beginning.players[0].position = 30
+        old_cash = game_beginning.players[0].cash
+        game_beginning._roll_double_counter = (0, 1)
+        game_beginning.send_player_to_jail(player_uid=0)
+        assert game_beginning.players[0].position == 10
+        assert game_beginning.players[0].cash == old_cash
+        assert game_beginning.check_in_jail(0) is True
+        assert game_beginning.has_double_roll is False
+
+    def test_release_player_from_jail(self, game_beginning: Game):
+        game_beginning.send_player_to_jail(player_uid=0)
+        game_beginning.release_player_from_jail(player_uid=0)
+        assert game_beginning.check_in_jail(0) is False
+
+
+class TestBankruptcy:
+    def test_bankrupt_player_to_creditor(self, game_middle: Game):
+        old_cash = game_middle.players[2].cash
+        bankrupt_cash = game_middle.players[1].cash
+        properties = list(game_middle.players[1].properties)
+        game_middle.bankrupt_player(1, creditor_uid=2)
+
+        assert game_middle.players[1].active is False
+        assert game_middle.players[1].cash == 0
+        assert game_middle.players[1].properties == []
+        assert game_middle.players[2].cash == old_cash + bankrupt_cash
+        for property_ in properties:
+            assert isinstance(property_, space.PropertySpace)
+            assert property_.owner_uid == 2
+            assert property_.no_of_houses == property_.no_of_hotels == 0
+            assert property_ in game_middle.players[2].properties
+        assert properties[0].property_set.monopoly is True
+
+    def test_bankrupt_player_to_bank(
+        self, game_middle: Game, fake_jail_card: card.ChanceCard
+    ):
+        properties = list(game_middle.players[1].properties)
+        properties[0].mortgaged = True
+        game_middle.add_player_jail_card(1, fake_jail_card)
+        chance_count = len(game_middle.chance_deck.cards)
+        game_middle.bankrupt_player(1)
+
+        assert game_middle.players[1].active is False
+        assert len(game_middle.chance_deck.cards) == chance_count + 1
+        for property_ in properties:
+            assert property_.owner_uid is None
+            assert property_.mortgaged is False
+        assert properties[0].property_set.monopoly is False
+
+    def test_auction_skips_bankrupt(self, game_middle: Game):
+        game_middle.bankrupt_player(1)
+        game_middle.auction_property(game_middle.get_property(position=8))
+        assert game_middle.players[1] not in game_middle.bidders
+        assert len(game_middle.bidders) == 3
+
+
+class TestBuildings:
+    def test_add_and_sell_house(self, game_middle: Game):
+        property_ = game_middle.get_property(position=3)
+        assert isinstance(property_, space.PropertySpace)
+        property_.no_of_hotels = 0
+        property_.no_of_houses = 3
+        assert game_middle.add_house(property_.id) == property_.price_of_house
+        assert property_.no_of_houses == 4
+        assert game_middle.sell_house(property_.id) == property_.price_of_house // 2
+        assert property_.no_of_houses == 3
+
+    def test_add_and_sell_hotel(self, game_middle: Game):
+        property_ = game_middle.get_property(position=1)
+        assert isinstance(property_, space.PropertySpace)
+        assert game_middle.add_hotel(property_.id) == property_.price_of_hotel
+        assert property_.no_of_hotels == 1
+        assert game_middle.sell_hotel(property_.id) == property_.price_of_hotel // 2
+        assert property_.no_of_houses == property_.HOUSE_LIMIT
+
+    def test_add_house_not_property_space(self, game_middle: Game):
+        with pytest.raises(ValueError, match="cannot have buildings"):
+            game_middle.add_house(101)
+
+
+class TestPlayerTotals:
+    @pytest.fixture
+    def game_checked(self, game_middle: Game) -> Game:
+        game_middle.check_invariants = True
+        return game_middle
+
+    def test_recomputed_totals(self, game_checked: Game):
+        player = game_checked.players[1]
+        # 4 houses of 50 on Mediterranean, a hotel of 50 replacing 4 houses on Baltic
+        assert player.get_totals() == (4, 1, 0, 60 + 200 + 60 + 250)
+        assert player.net_worth == player.cash + 570
+        assert game_checked.get_player_house_and_hotel_counts(1) == (4, 1)
+
+    def test_buy_property(self, game_checked: Game):
+        player = game_checked.players[0]
+        game_checked.buy_property(player_uid=0, position=5)
+        assert player.get_totals() == (0, 0, 0, 200)
+
+    def test_buildings(self, game_checked: Game):
+        player = game_checked.players[1]
+        game_checked.sell_hotel(1)
+        assert player.get_totals() == (8, 0, 0, 520)
+        game_checked.sell_house(0)
+        game_checked.sell_house(1)
+        assert player.get_totals() == (6, 0, 0, 420)
+        game_checked.add_house(0)
+        assert player.get_totals() == (7, 0, 0, 470)
+
+    def test_mortgage(self, game_checked: Game):
+        player = game_checked.players[0]
+        game_checked.buy_property(player_uid=0, position=5)
+        game_checked.mortgage_property(101)
+        assert player.get_totals() == (0, 0, 1, 100)
+        game_checked.unmortgage_property(101)
+        assert player.get_totals() == (0, 0, 0, 200)
+
+    def test_failed_change_keeps_totals(self, game_checked: Game):
+        with pytest.raises(ValueError):
+            game_checked.mortgage_property(0)  # the set has buildings
+        assert game_checked.players[1].get_totals() == (4, 1, 0, 570)
+
+    def test_bankrupt_transfers_totals(self, game_checked: Game):
+        game_checked.bankrupt_player(1, creditor_uid=2)
+        assert game_checked.players[1].get_totals() == (0, 0, 0, 0)
+        assert game_checked.players[2].get_totals() == (0, 0, 0, 120)
+
+    def test_verify_detects_drift(self, game_checked: Game):
+        property_ = game_checked.get_property(position=1)
+        assert isinstance(property_, space.PropertySpace)
+        property_.no_of_houses = 3
+        with pytest.raises(exc.InvariantError, match="do not match the recount"):
+            game_checked.verify_player_totals()
+        game_checked.recompute_player_totals()
+        game_checked.verify_player_totals()
+
+    def test_verify_detects_wrong_owner(self, game_checked: Game):
+        game_checked.get_property(position=1).owner_uid = 3
+        with pytest.raises(exc.InvariantError, match="owned by 3"):
+            game_checked.verify_player_totals()
+
+
+class TestFork:
+    @pytest.fixture
+    def game_seeded(self, game_middle: Game) -> Game:
+        game_middle.rng = GameRng(11)
+        game_middle.current_player_uid = 0
+        return game_middle
+
+    def test_fork_is_independent(self, game_seeded: Game):
+        forked = game_seeded.fork()
+        assert forked.game_map is not game_seeded.game_map
+        assert forked.chance_deck is not game_seeded.chance_deck
+        assert forked.rng is not game_seeded.rng
+        forked.buy_property(player_uid=0, position=5)
+        forked.sell_hotel(1)
+        drawn = forked.draw_chance_card()
+        forked.roll_dice()
+        assert game_seeded.get_property(position=5).owner_uid is None
+        assert game_seeded.players[0].properties == []
+        assert game_seeded.players[1].get_totals() == (4, 1, 0, 570)
+        assert game_seeded.chance_deck.cards[0].id == drawn.id
+        forked_ids = [chance_card.id for chance_card in forked.chance_deck.cards]
+        if drawn.ownable:  # kept by the player until used
+            assert drawn.id not in forked_ids
+        else:
+            assert forked_ids[-1] == drawn.id
+
+    def test_fork_replays_the_same(self, game_seeded: Game):
+        forked = game_seeded.fork()
+        for game in (game_seeded, forked):
+            game.move_player(steps=sum(game.roll_dice()))
+        assert forked.last_dice_rolls == game_seeded.last_dice_rolls
+        assert forked.get_player_position(0) == game_seeded.get_player_position(0)
+        assert forked.draw_cc_card().id == game_seeded.draw_cc_card().id
+
+    def test_fork_into(self, game_seeded: Game):
+        scratch = game_seeded.fork()
+        scratch.buy_property(player_uid=0, position=5)
+        scratch.roll_dice()
+        game_map = scratch.game_map
+        forked = game_seeded.fork(into=scratch)
+        assert forked is scratch
+        assert forked.game_map is game_map
+        assert forked.get_property(position=5).owner_uid is None
+        assert forked.players[0].get_totals() == (0, 0, 0, 0)
+        assert forked.roll_dice() == game_seeded.roll_dice()
+
+    def test_fork_check_invariants(self, game_middle: Game):
+        game_middle.check_invariants = True
+        assert game_middle.fork().check_invariants
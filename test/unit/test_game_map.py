@@ -1,6 +1,6 @@
 import constants as c
 import pytest
-from game import player, space
+from game import game_initializer, player, space
 from game.game_map import GameMap
 
 
@@ -50,3 +50,34 @@ def test_game_map_trigger(prop_spaces: list[space.Space], player_simple: player.
     assert game_map.trigger(player_simple) == prop_spaces[0].trigger(player_simple)
     player_simple.position = 1
     assert game_map.trigger(player_simple) == prop_spaces[1].trigger(player_simple)
+
+
+def test_game_map_property_index(prop_spaces: list[space.Property]):
+    game_map = GameMap(map_list=prop_spaces)
+    assert game_map.get_property(1) is prop_spaces[0]
+    assert game_map.get_property(2) is prop_spaces[1]
+    assert game_map.get_property_position(1) == 0
+    assert game_map.get_property_position(2) == 1
+
+
+def test_game_map_property_index_full_map():
+    game_map = game_initializer.build_game_map(
+        HOUSE_LIMIT=c.CONST_HOUSE_LIMIT, HOTEL_LIMIT=c.CONST_HOTEL_LIMIT
+    )
+    for position, map_space in enumerate(game_map.map_list):
+        if isinstance(map_space, space.Property):
+            assert game_map.get_property(map_space.id) is map_space
+            assert game_map.get_property_position(map_space.id) == position
+
+
+def test_game_map_property_index_invalid(prop_spaces: list[space.Property]):
+    game_map = GameMap(map_list=prop_spaces)
+    with pytest.raises(ValueError, match="Invalid property id: 3"):
+        game_map.get_property(3)
+    with pytest.raises(ValueError, match="Invalid property id: 3"):
+        game_map.get_property_position(3)
+
+
+def test_game_map_duplicate_property_id(prop_spaces: list[space.Property]):
+    with pytest.raises(ValueError, match="Duplicate property id: 1"):
+        GameMap(map_list=[prop_spaces[0], prop_spaces[0]])
@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from event import Publisher
+from host.lobby import RoomState
+from host.server import server
+
+
+class NullPublisher(Publisher):
+    def publish(self, event) -> None:
+        pass
+
+
+def make_server(names: list[str]) -> tuple[server, list[str]]:
+    """A server with a room of the given name per host"""
+    lobby = server()
+    room_uids = []
+    for name in names:
+        user = lobby.add_user(f"host of {name}")
+        room_uids.append(lobby.create_room(user.uid, name))
+        lobby.join_room(user.uid, room_uids[-1])
+    return lobby, room_uids
+
+
+def test_pages_follow_the_rooms():
+    lobby, room_uids = make_server([f"room {idx}" for idx in range(25)])
+    page = lobby.list_rooms(page=1, page_size=10)
+    assert [room["uid"] for room in page.rooms] == room_uids[10:20]
+    assert page.total == 25
+    assert page.rooms[0] == {
+        "uid": room_uids[10],
+        "name": "room 10",
+        "host": "host of room 10",
+        "users": 1,
+        "max_users": 8,
+        "state": "open",
+    }
+    assert lobby.list_rooms(page=3, page_size=10).rooms == []
+
+    guest = lobby.add_user("guest")
+    lobby.join_room(guest.uid, room_uids[0])
+    assert lobby.list_rooms(page_size=1).rooms[0]["users"] == 2
+    lobby.leave_room(guest.uid)
+    assert lobby.list_rooms(page_size=1).rooms[0]["users"] == 1
+
+    lobby.start_game(room_uids[1], NullPublisher())
+    with pytest.raises(ValueError, match="is open"):
+        lobby.end_game(room_uids[2])
+    playing = lobby.list_rooms(state=RoomState.PLAYING)
+    assert [room["uid"] for room in playing.rooms] == [room_uids[1]]
+    open_rooms = lobby.list_rooms(state=RoomState.OPEN, page_size=100)
+    assert open_rooms.total == 24
+    lobby.end_game(room_uids[1])
+    assert lobby.list_rooms(state=RoomState.PLAYING).total == 0
+    assert lobby.list_rooms(state=RoomState.FINISHED).total == 1
+
+    room = lobby.remove_room(room_uids[0])
+    assert lobby.list_rooms().total == 24
+    lobby.add_room(room)
+    assert lobby.list_rooms(page=1).rooms[-1]["uid"] == room_uids[0]
+
+
+def test_open_seats_and_prefix():
+    lobby, room_uids = make_server(["Alpha", "alps", "Beta", "al", "gamma"])
+    lobby.rooms[room_uids[1]].max_users = 2
+    guest = lobby.add_user("guest")
+    lobby.join_room(guest.uid, room_uids[1])
+    with pytest.raises(ValueError, match="is full"):
+        lobby.join_room(lobby.add_user("late").uid, room_uids[1])
+    lobby.start_game(room_uids[2], NullPublisher())
+    with pytest.raises(ValueError, match="is playing"):
+        lobby.join_room(lobby.add_user("late").uid, room_uids[2])
+
+    joinable = lobby.list_rooms(open_seats=True)
+    assert [room["name"] for room in joinable.rooms] == ["Alpha", "al", "gamma"]
+    assert lobby.list_rooms(open_seats=True, state=RoomState.PLAYING).total == 0
+
+    names = [room["name"] for room in lobby.list_rooms(prefix="AL").rooms]
+    assert names == ["al", "Alpha", "alps"]  # by name
+    page = lobby.list_rooms(prefix="al", open_seats=True, page=1, page_size=1)
+    assert [room["name"] for room in page.rooms] == ["Alpha"]
+    assert page.total == 2
+    assert lobby.list_rooms(prefix="alz").total == 0
+    assert lobby.list_rooms(prefix="g").rooms[0]["name"] == "gamma"
+    with pytest.raises(ValueError, match="Page size must be between 1 and 100"):
+        lobby.list_rooms(page_size=0)
+
+
+def test_cached_pages():
+    lobby, room_uids = make_server(["a", "b", "c"])
+    index = lobby.lobby_index
+    page = index.page_json(page_size=2)
+    assert json.loads(page) == {
+        "rooms": index.page(page_size=2).rooms,
+        "page": 0,
+        "page_size": 2,
+        "total": 3,
+    }
+    assert index.page_json(page_size=2) is page
+    version = index.version
+    lobby.join_room(lobby.add_user("guest").uid, room_uids[0])
+    assert index.version == version + 1
+    updated = index.page_json(page_size=2)
+    assert updated is not page
+    assert json.loads(updated)["rooms"][0]["users"] == 2
+
+
+def test_cached_pages_of_other_buckets():
+    lobby, room_uids = make_server([f"room {idx}" for idx in range(30)])
+    index = lobby.lobby_index
+    lobby.start_game(room_uids[3], NullPublisher())
+    playing = index.page_json(state=RoomState.PLAYING)
+    joinable = index.page_json(page=1, page_size=5, open_seats=True)
+    lobby.join_room(lobby.add_user("guest").uid, room_uids[0])
+    assert index.page_json(state=RoomState.PLAYING) is playing
+    assert index.page_json(page=1, page_size=5, open_seats=True) is not joinable
+    lobby.end_game(room_uids[3])
+    assert index.page_json(state=RoomState.PLAYING) is not playing
+    # the rooms stay in creation order as they leave and come back to a bucket
+    full = lobby.rooms[room_uids[10]]
+    while len(full.users) < full.max_users:
+        lobby.join_room(lobby.add_user("late").uid, full.uid)
+    lobby.leave_room(full.users[-1].uid)
+    page = index.page(page=2, page_size=4, open_seats=True)
+    assert [room["uid"] for room in page.rooms] == room_uids[9:13]  # not room 3
+    assert page.total == 29
@@ -0,0 +1,75 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from game import game_initializer, markov, sim  # noqa: E402
+from game import positions as pos  # noqa: E402
+from game.game import Game  # noqa: E402
+from game.game_map import GameMap  # noqa: E402
+
+
+@pytest.fixture
+def game_map_full() -> GameMap:
+    return game_initializer.build_game_map(HOUSE_LIMIT=4, HOTEL_LIMIT=1)
+
+
+def test_board_labels(game_map_full: GameMap):
+    labels = markov.board_labels(game_map_full)
+    assert len(labels) == 40
+    assert labels[30] == markov.GO_TO_JAIL
+    assert labels[7] == labels[22] == labels[36] == markov.CHANCE
+    assert labels[2] == labels[17] == labels[33] == markov.CC
+    assert [i for i, label in enumerate(labels) if label == markov.RAILROAD] == [
+        5,
+        15,
+        25,
+        35,
+    ]
+    assert labels[0] == markov.OTHER
+
+
+def test_landing_probabilities(game_map_full: GameMap):
+    probs = game_map_full.landing_probabilities()
+    assert len(probs) == 40
+    assert sum(probs) == pytest.approx(1.0)
+    assert probs[30] == 0.0
+    assert max(probs) == probs[pos.Position.JAIL.value]
+    # chance spaces send most of the players away
+    assert probs[7] < probs[6]
+    # staying in jail makes the jail space more likely
+    assert probs[10] > game_map_full.landing_probabilities(max_jail_turns=0)[10]
+
+
+def test_landing_probabilities_cached(game_map_full: GameMap):
+    markov.landing_probabilities.cache_clear()
+    probs = game_map_full.landing_probabilities()
+    assert game_map_full.landing_probabilities() is probs
+    assert markov.landing_probabilities.cache_info().hits == 1
+
+
+def test_landing_probabilities_invalid(game_map_simple: GameMap):
+    with pytest.raises(ValueError, match="has no jail space"):
+        game_map_simple.landing_probabilities()
+
+
+def test_landing_probabilities_match_simulation(
+    game_map_full: GameMap, monkeypatch: pytest.MonkeyPatch
+):
+    """Count the positions at every roll of passive games, which pay the fine at once"""
+    counts = [0] * 40
+    roll_dice = Game.roll_dice
+
+    def counting_roll_dice(game: Game) -> tuple[int, ...]:
+        counts[game.current_position] += 1
+        return roll_dice(game)
+
+    monkeypatch.setattr(Game, "roll_dice", counting_roll_dice)
+    simulator = sim.Simulator(
+        policies=[sim.PassivePolicy() for _ in range(4)], max_turns=1000, auctions=False
+    )
+    simulator.run(20, seed=9001)
+
+    probs = game_map_full.landing_probabilities(max_jail_turns=0)
+    total = sum(counts)
+    for position in range(40):
+        assert counts[position] / total == pytest.approx(probs[position], abs=0.005)
@@ -0,0 +1,91 @@
+import asyncio
+from collections.abc import Iterator
+
+import pytest
+
+from event import Event, EventRuntime, EventType, Topic, openmetrics
+from event.metrics import LATENCY_BUCKETS, Histogram
+
+
+class SyncSubscriber:
+    def listen(self, event: Event) -> None:
+        if event.message.get("fail"):
+            raise RuntimeError("failed")
+
+
+class AsyncSubscriber:
+    async def listen(self, event: Event) -> None:
+        await asyncio.sleep(0.002)
+
+
+@pytest.fixture
+def topic() -> Iterator[Topic]:
+    runtime = EventRuntime()
+    topic = Topic('game "1"', runtime=runtime)
+    yield topic
+    runtime.close(timeout=1)
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value_ns in (500, 1023, 1024, 3000, 10**10):
+        histogram.observe(value_ns)
+    snapshot = histogram.snapshot()
+    assert snapshot.bounds == LATENCY_BUCKETS
+    assert snapshot.counts[:3] == (2, 1, 1)
+    assert snapshot.counts[-1] == 1  # above 8.6 s
+    assert snapshot.count == 5
+    assert snapshot.sum == pytest.approx((500 + 1023 + 1024 + 3000 + 10**10) / 1e9)
+    assert snapshot.quantile(0.4) == LATENCY_BUCKETS[0]
+    assert snapshot.quantile(0.8) == LATENCY_BUCKETS[2]
+    assert snapshot.quantile(1) == float("inf")
+    with pytest.raises(ValueError, match="Quantile must be between 0 and 1"):
+        snapshot.quantile(1.5)
+
+
+def test_topic_snapshot(topic: Topic):
+    topic.register_subscriber(SyncSubscriber(), name="sync")
+    topic.register_subscriber(
+        AsyncSubscriber(), name="async", event_types=[EventType.G_MOVE]
+    )
+    for _ in range(3):
+        topic.publish(Event(EventType.G_DICE_ROLL, {}))
+    topic.publish(Event(EventType.G_MOVE, {"fail": True}))
+    assert topic.drain(timeout=1)
+
+    snapshot = topic.snapshot()
+    assert snapshot.published == 4
+    assert {
+        event_type: histogram.count
+        for event_type, histogram in snapshot.dispatch_latency.items()
+    } == {EventType.G_DICE_ROLL: 3, EventType.G_MOVE: 1}
+    sync, slow = snapshot.subscribers
+    assert (sync.delivered, sync.errors) == (4, 1)
+    assert sync.handle_latency[EventType.G_DICE_ROLL].count == 3
+    assert list(slow.handle_latency) == [EventType.G_MOVE]
+    assert slow.handle_latency[EventType.G_MOVE].sum >= 0.002
+
+
+def test_openmetrics(topic: Topic):
+    topic.register_subscriber(SyncSubscriber(), name="view")
+    topic.publish(Event(EventType.G_DICE_ROLL, {}))
+    assert topic.drain(timeout=1)
+    text = openmetrics([topic.snapshot()])
+    lines = text.splitlines()
+    assert lines[0] == "# TYPE event_published counter"
+    assert lines[-1] == "# EOF"
+    assert 'event_published_total{topic="game \\"1\\""} 1' in lines
+    labels = 'topic="game \\"1\\"",subscriber="view",event_type="g_dice_roll"'
+    assert f'event_handle_latency_seconds_bucket{{{labels},le="+Inf"}} 1' in lines
+    assert f"event_handle_latency_seconds_count{{{labels}}} 1" in lines
+    assert (
+        'event_subscriber_errors_total{topic="game \\"1\\"",subscriber="view"} 0'
+        in (lines)
+    )
+    assert 'event_queue_depth{topic="game \\"1\\"",subscriber="view"} 0' in lines
+    buckets = [
+        int(line.rsplit(" ", 1)[1])
+        for line in lines
+        if line.startswith("event_dispatch_latency_seconds_bucket")
+    ]
+    assert buckets == sorted(buckets) and buckets[-1] == 1
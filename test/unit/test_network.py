@@ -0,0 +1,145 @@
+import asyncio
+import json
+import os
+import tempfile
+from typing import Any
+
+from event import Event, EventType, payload
+from host.network import GameServer, encode_event
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.events: list[dict[str, Any]] = []
+        self._next_id = 0
+
+    async def request(self, op: str, **fields: Any) -> dict[str, Any]:
+        """Send the request, return its reply and keep the events before it"""
+        self._next_id += 1
+        line = {"op": op, "id": self._next_id, **fields}
+        self.writer.write(json.dumps(line).encode() + b"\n")
+        return await self.reply()
+
+    async def reply(self) -> dict[str, Any]:
+        while True:
+            line = json.loads(await self.reader.readline())
+            if line["op"] != "event":
+                return line
+            self.events.append(line)
+
+
+async def connect(path: str) -> Client:
+    return Client(*await asyncio.open_unix_connection(path))
+
+
+def run(test) -> None:
+    async def main():
+        path = os.path.join(tempfile.mkdtemp(), "server.sock")
+        game_server = GameServer()
+        unix_server = await game_server.start_unix(path)
+        async with unix_server:
+            await test(game_server, path)
+
+    asyncio.run(main())
+
+
+def test_encode_event():
+    event = Event(EventType.G_DICE_ROLL, payload.DiceRoll(dices=(1, 2)), seq=3)
+    assert json.loads(encode_event(event)) == {
+        "op": "event",
+        "type": "g_dice_roll",
+        "seq": 3,
+        "message": {"dices": [1, 2]},
+    }
+
+
+def test_play_a_room():
+    async def test(game_server: GameServer, path: str) -> None:
+        alice, bob = await connect(path), await connect(path)
+        alice_uid = (await alice.request("login", name="alice"))["user"]
+        bob_uid = (await bob.request("login", name="bob"))["user"]
+        reply = await alice.request("create_room", user=alice_uid, name="r")
+        room_uid = reply["room"]
+        reply = await bob.request("join_room", user=bob_uid, room=room_uid)
+        assert reply["op"] == "done"
+        assert (await alice.request("start", user=alice_uid))["op"] == "done"
+        assert [event["type"] for event in alice.events] == [
+            "g_add_player",
+            "g_current_player",
+        ]
+        assert alice.events[0]["message"]["user_to_player"] == {
+            alice_uid: 0,
+            bob_uid: 1,
+        }
+
+        current = alice.events[-1]["message"]["player_id"]
+        player, other = (alice, bob) if current == 0 else (bob, alice)
+        player_uid, other_uid = (
+            (alice_uid, bob_uid) if current == 0 else (bob_uid, alice_uid)
+        )
+        reply = await other.request("command", user=other_uid, type="v_roll_and_move")
+        assert reply["op"] == "error"
+        assert "is not the current player" in reply["error"]
+
+        reply = await player.request("command", user=player_uid, type="v_roll_and_move")
+        assert reply == {"op": "done", "id": reply["id"]}
+        types = [event["type"] for event in player.events[2:]]
+        assert types[:2] == ["g_dice_roll", "g_move"]
+        seqs = [event["seq"] for event in player.events]
+        assert seqs == list(range(1, len(seqs) + 1))
+        assert game_server.command_count == 2
+        assert game_server.lobby.rooms[room_uid].game_model is not None
+
+        reply = await bob.request("lobby", state="playing", page_size=5)
+        assert reply["lobby"]["total"] == 1
+        assert reply["lobby"]["rooms"][0]["uid"] == room_uid
+        assert (await bob.request("lobby", open_seats=True))["lobby"]["rooms"] == []
+
+    run(test)
+
+
+def test_request_errors():
+    async def test(game_server: GameServer, path: str) -> None:
+        client = await connect(path)
+        client.writer.write(b"not json\n\n[1]\n")
+        assert (await client.reply())["error"] == "Invalid JSON"
+        assert (await client.reply())["error"] == "Invalid request"
+        assert (await client.request("fly"))["error"] == "Unknown op fly"
+        reply = await client.request("start", user="nobody")
+        assert reply["error"] == "User nobody is not logged in on this connection"
+        user_uid = (await client.request("login", name="carol"))["user"]
+        reply = await client.request("command", user=user_uid, type="g_move")
+        assert reply["error"] == "Unknown command g_move"
+        reply = await client.request("command", user=user_uid, type="v_pay")
+        assert reply["error"] == f"The game of user {user_uid} has not started"
+        reply = await client.request("join_room", user=user_uid, room="nowhere")
+        assert reply["error"] == "Unknown room nowhere"
+
+        game_server.lobby.eviction.user_ttl = 0.001
+        await asyncio.sleep(0.01)
+        assert game_server.evict_idle().users == [user_uid]
+        reply = await client.request("command", user=user_uid, type="v_pay")
+        assert reply["error"] == f"User {user_uid} is not logged in on this connection"
+
+    run(test)
+
+
+def test_evict_forever_after_an_error(capsys):
+    async def test(game_server: GameServer, path: str) -> None:
+        sweeps = []
+
+        def evict_idle():
+            sweeps.append(len(sweeps))
+            if len(sweeps) == 1:
+                raise KeyError("gone")
+
+        game_server.evict_idle = evict_idle  # type: ignore[method-assign]
+        eviction = asyncio.create_task(game_server.evict_forever(interval=0.001))
+        while len(sweeps) < 2:
+            await asyncio.sleep(0.001)
+        eviction.cancel()
+        assert "GameServer - Error in eviction: 'gone'" in capsys.readouterr().out
+
+    run(test)
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any
+
+import pytest
+
+from host.network import GameServer
+from host.persistence import GameStore, StoredRoom
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.events: list[dict[str, Any]] = []
+        self._next_id = 0
+
+    async def request(self, op: str, **fields: Any) -> dict[str, Any]:
+        self._next_id += 1
+        line = {"op": op, "id": self._next_id, **fields}
+        self.writer.write(json.dumps(line).encode() + b"\n")
+        while True:
+            reply = json.loads(await self.reader.readline())
+            if reply["op"] != "event":
+                return reply
+            self.events.append(reply)
+
+
+def room(uid: str, events: list[tuple[int, bytes]]) -> StoredRoom:
+    record = {"uid": uid, "game": {"id": f"game of {uid}"}}
+    return StoredRoom(uid=uid, record=record, game=uid.encode(), events=events)
+
+
+def test_group_commit():
+    store = GameStore(os.path.join(tempfile.mkdtemp(), "games.db"))
+    try:
+        with store._lock:  # the writer holds the first batch until released
+            store.write([room("a", [(1, b"a1")])], [])
+            while store._pending:
+                time.sleep(0.001)
+            store.write([room("b", [(1, b"b1")])], [])
+            store.write([room("a", [(2, b"a2"), (3, b"a3")])], ["b"])
+        assert store.flush(timeout=5)
+        assert (store.written_count, store.commit_count) == (3, 2)
+        assert [(stored.uid, stored.game) for stored in store.load()] == [("a", b"a")]
+        assert store.events("game of a") == [b"a1", b"a2", b"a3"]
+        assert store.events("game of a", after_seq=2) == [b"a3"]
+        assert store.events("game of b") == []  # deleted with the room
+    finally:
+        store.close()
+    with pytest.raises(ValueError, match="is closed"):
+        store.write([], [])
+
+
+def test_retry_failed_commits():
+    store = GameStore(os.path.join(tempfile.mkdtemp(), "games.db"), 0.01)
+    write = store._write
+    failing = [True]
+
+    def fail_or_write(batch: Any) -> None:
+        if failing[0]:
+            raise sqlite3.OperationalError("disk I/O error")
+        write(batch)
+
+    store._write = fail_or_write  # type: ignore[method-assign]
+    store.write([room("a", [(1, b"a1")])], [])
+    assert not store.flush(timeout=5)
+    assert isinstance(store.error, sqlite3.OperationalError)
+    store.write([room("b", [])], [])
+    failing[0] = False
+    assert store.flush(timeout=5)
+    assert (store.written_count, store.error) == (2, None)
+    assert sorted(stored.uid for stored in store.load()) == ["a", "b"]
+    assert store.events("game of a") == [b"a1"]
+
+    failing[0] = True
+    store.write([], ["a"])
+    with pytest.raises(ValueError, match="1 batches not written"):
+        store.close()
+
+
+def test_recover_games_after_a_crash():
+    database = os.path.join(tempfile.mkdtemp(), "games.db")
+
+    async def play(client: Client, users: dict[int, str]) -> None:
+        """Send the command expected by the game after the last event"""
+        message = client.events[-1]["message"]
+        command, field = {
+            "g_current_player": ("v_roll_and_move", "player_id"),
+            "g_wait_for_roll": ("v_roll_and_move", "player_id"),
+            "g_wait_for_end_turn": ("v_end_turn", "player_id"),
+            "g_ask_to_buy": ("v_buy_property", "player_id"),
+            "g_ask_for_rent": ("v_pay", "payer_id"),
+        }[client.events[-1]["type"]]
+        reply = await client.request(
+            "command", user=users[message[field]], type=command
+        )
+        assert reply["op"] == "done"
+
+    async def main() -> None:
+        path = os.path.join(tempfile.mkdtemp(), "server.sock")
+        crashed = GameStore(database, flush_interval=0.01)
+        game_server = GameServer(store=crashed)
+        unix_server = await game_server.start_unix(path)
+        client = Client(*await asyncio.open_unix_connection(path))
+        uids = [
+            (await client.request("login", name=name))["user"]
+            for name in ("alice", "bob")
+        ]
+        room_uid = (await client.request("create_room", user=uids[0]))["room"]
+        await client.request("join_room", user=uids[1], room=room_uid)
+        await client.request("start", user=uids[0])
+        players = client.events[0]["message"]["user_to_player"]
+        users = {player: user for user, player in players.items()}
+        for _ in range(3):
+            await play(client, users)
+        await asyncio.sleep(0.05)  # written behind
+        assert crashed.flush(timeout=5)
+        # the process dies: the server is not closed
+        client.writer.close()
+        unix_server.close()
+
+        store = GameStore(database)
+        game_server = GameServer(store=store)
+        unix_server = await game_server.start_unix(path)
+        client = Client(*await asyncio.open_unix_connection(path))
+        try:
+            assert list(game_server.lobby.rooms) == [room_uid]
+            for uid in uids:
+                assert (await client.request("login", user=uid))["user"] == uid
+            game_model = game_server.lobby.rooms[room_uid].game_model
+            assert game_model is not None
+            # the game goes on from the events written before the crash
+            client.events = [json.loads(line) for line in store.events(game_model.id)]
+            await play(client, users)
+        finally:
+            client.writer.close()
+            unix_server.close()
+            game_server.close()
+            crashed.close()
+        seqs = [event["seq"] for event in client.events]
+        assert seqs == list(range(1, len(seqs) + 1))
+        store = GameStore(database)
+        try:
+            lines = store.events(game_model.id)
+        finally:
+            store.close()
+        assert [json.loads(line) for line in lines] == client.events
+
+    asyncio.run(main())
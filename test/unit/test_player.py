@@ -165,3 +165,14 @@ class TestJailCard:
         player_simple.add_jail_card(fake_jail_card)
         with pytest.raises(ValueError, match="Jail card 104 not found"):
             _ = player_simple.use_jail_card(104)
+
+
+def test_totals(player_comp: Player):
+    player_comp.add_totals(house_count=2, hotel_count=1, mortgaged_count=0, value=500)
+    assert player_comp.get_totals() == (2, 1, 0, 500)
+    assert player_comp.net_worth == 3500
+    player_comp.add_totals(house_count=-1, hotel_count=0, mortgaged_count=1, value=-80)
+    assert player_comp.get_totals() == (1, 1, 1, 420)
+    player_comp.clear_totals()
+    assert player_comp.get_totals() == (0, 0, 0, 0)
+    assert player_comp.net_worth == 3000
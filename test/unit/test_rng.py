@@ -0,0 +1,84 @@
+import copy
+import pickle
+import random
+
+import pytest
+
+import game.dice as dice
+from game.rng import GameRng
+
+
+def test_roll_dice_faces():
+    rng = GameRng(1)
+    faces = [face for _ in range(1000) for face in rng.roll_dice(2)]
+    assert set(faces) == {1, 2, 3, 4, 5, 6}
+
+
+def test_roll_dice_seeded():
+    rolls = [GameRng(5).roll_dice() for _ in range(2)]
+    assert rolls[0] == rolls[1]
+    assert [GameRng(5).roll_dice(3) for _ in range(50)] != [
+        GameRng(6).roll_dice(3) for _ in range(50)
+    ]
+
+
+def test_roll_dice_across_blocks():
+    rng = GameRng(3, block_size=1)
+    for _ in range(20):
+        rolls = rng.roll_dice(3)
+        assert len(rolls) == 3
+        assert all(1 <= face <= 6 for face in rolls)
+
+
+def test_invalid_block_size():
+    with pytest.raises(ValueError, match="Block size must be positive"):
+        GameRng(1, block_size=0)
+
+
+def test_state_keeps_pending_dice():
+    rng = GameRng(7, block_size=16)
+    rng.roll_dice()
+    state = rng.getstate()
+    rolls = [rng.roll_dice() for _ in range(30)]
+    card_order = rng.sample(range(16), 16)
+
+    restored = GameRng()
+    restored.setstate(state)
+    assert [restored.roll_dice() for _ in range(30)] == rolls
+    assert restored.sample(range(16), 16) == card_order
+
+
+@pytest.mark.parametrize(
+    "duplicate", [copy.deepcopy, lambda rng: pickle.loads(pickle.dumps(rng))]
+)
+def test_copy(duplicate):
+    rng = GameRng(7, block_size=16)
+    rng.roll_dice()
+    copied = duplicate(rng)
+    assert copied.block_size == 16
+    assert [copied.roll_dice() for _ in range(30)] == [
+        rng.roll_dice() for _ in range(30)
+    ]
+
+
+def test_reseed_drops_pending_dice():
+    rng = GameRng(2)
+    rolls = [rng.roll_dice() for _ in range(5)]
+    rng.seed(2)
+    assert [rng.roll_dice() for _ in range(5)] == rolls
+
+
+def test_dice_roll_with_game_rng():
+    assert dice.roll(rng=GameRng(4)) == GameRng(4).roll_dice(2)
+    rolls = dice.roll(num_faces=4, num_dice=3, rng=GameRng(4))
+    assert len(rolls) == 3
+    assert all(1 <= face <= 4 for face in rolls)
+
+
+def test_global_random_untouched():
+    random.seed(1)
+    state = random.getstate()
+    rng = GameRng()
+    rng.roll_dice()
+    rng.shuffle(list(range(10)))
+    assert random.getstate() == state
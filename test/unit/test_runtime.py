@@ -0,0 +1,147 @@
+import asyncio
+import gc
+import threading
+import tracemalloc
+from collections.abc import Iterator
+
+import pytest
+
+from event import Event, EventType, Topic
+from event.exceptions import EventError, TopicClosedError
+from event.runtime import EventRuntime
+
+
+class CountingSubscriber:
+    def __init__(self):
+        self.count = 0
+
+    async def listen(self, event: Event) -> None:
+        await asyncio.sleep(0)  # let the other topics of the loop run
+        self.count += 1
+
+
+@pytest.fixture
+def runtime() -> Iterator[EventRuntime]:
+    runtime = EventRuntime(n_loops=2)
+    yield runtime
+    runtime.close(timeout=1)
+
+
+def dice_event() -> Event:
+    return Event(EventType.G_DICE_ROLL, {"dice_1": 1, "dice_2": 2})
+
+
+def test_topics_share_loops(runtime: EventRuntime):
+    thread_count = threading.active_count()
+    topics = [Topic(f"topic {idx}", runtime=runtime) for idx in range(10)]
+    assert threading.active_count() == thread_count + 2
+    assert len({topic._loop for topic in topics}) == 2
+    assert runtime.topic_count == 10
+    for topic in topics:
+        topic.close()
+        assert topic.drain(timeout=1)
+    assert runtime.topic_count == 0
+
+
+def test_close_delivers_pending_events(runtime: EventRuntime):
+    topic = Topic("test", runtime=runtime)
+    subscriber = CountingSubscriber()
+    topic.register_subscriber(subscriber)
+    for _ in range(50):
+        topic.publish(dice_event())
+    topic.close()
+    assert topic.closed
+    assert topic.drain(timeout=1)
+    assert subscriber.count == 50
+    with pytest.raises(TopicClosedError, match="Topic test is closed"):
+        topic.publish(dice_event())
+    topic.close()  # closing twice is allowed
+
+
+def test_drain_open_topic(runtime: EventRuntime):
+    topic = Topic("test", runtime=runtime)
+    subscriber = CountingSubscriber()
+    topic.register_subscriber(subscriber)
+    for _ in range(10):
+        topic.publish(dice_event())
+    assert topic.drain(timeout=1)
+    assert subscriber.count == 10
+    topic.publish(dice_event())
+    assert topic.drain(timeout=1)
+    assert subscriber.count == 11
+
+
+def test_drain_timeout(runtime: EventRuntime):
+    release = threading.Event()
+
+    class BlockedSubscriber:
+        async def listen(self, event: Event) -> None:
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+
+    topic = Topic("test", runtime=runtime)
+    topic.register_subscriber(BlockedSubscriber())
+    topic.publish(dice_event())
+    assert not topic.drain(timeout=0.05)
+    release.set()
+    assert topic.drain(timeout=1)
+
+
+def test_close_and_drain_from_subscriber(runtime: EventRuntime):
+    errors: list[Exception] = []
+
+    class ClosingSubscriber:
+        def __init__(self, topic: Topic):
+            self.topic = topic
+
+        async def listen(self, event: Event) -> None:
+            self.topic.close()
+            try:
+                self.topic.drain()
+            except EventError as error:
+                errors.append(error)
+
+    topic = Topic("test", runtime=runtime)
+    topic.register_subscriber(ClosingSubscriber(topic))
+    topic.publish(dice_event())
+    assert topic.drain(timeout=1)
+    assert topic.closed
+    assert "cannot be drained from its own loop" in str(errors[0])
+
+
+def test_runtime_close():
+    runtime = EventRuntime(n_loops=2)
+    thread_count = threading.active_count()
+    topic = Topic("test", runtime=runtime)
+    runtime.close(timeout=1)
+    assert threading.active_count() == thread_count
+    assert topic.drain(timeout=1)
+    assert topic.closed
+    with pytest.raises(EventError, match="Event runtime is closed"):
+        Topic("test", runtime=runtime)
+    with pytest.raises(ValueError, match="Number of loops must be positive"):
+        EventRuntime(n_loops=0)
+
+
+def test_stress_10k_topics(runtime: EventRuntime):
+    """Thread count and memory stay flat while topics come and go"""
+
+    def churn(count: int) -> None:
+        for idx in range(count):
+            topic = Topic(f"room {idx}", runtime=runtime)
+            topic.register_subscriber(CountingSubscriber())
+            topic.publish(dice_event())
+            topic.close()
+            assert topic.drain(timeout=1)
+
+    churn(500)  # start the loops and warm up the allocator
+    thread_count = threading.active_count()
+    gc.collect()
+    tracemalloc.start()
+    before, _peak = tracemalloc.get_traced_memory()
+    churn(10_000)
+    gc.collect()
+    after, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert threading.active_count() == thread_count
+    assert runtime.topic_count == 0
+    assert after - before < 256 * 1024
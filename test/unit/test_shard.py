@@ -0,0 +1,150 @@
+import asyncio
+import random
+import threading
+import zlib
+from collections.abc import Iterator
+
+import pytest
+
+from controller import ControllerListener
+from event import Event, EventType, ShardedDispatcher, payload
+from event.exceptions import EventError
+from event.runtime import EventRuntime
+
+
+class RecordingController:
+    def __init__(self):
+        self.calls: list[tuple] = []
+
+    def add_players(self, user_ids: list[str]) -> dict[str, int]:
+        return {user_id: idx for idx, user_id in enumerate(user_ids)}
+
+    def __getattr__(self, name: str):
+        return lambda *args: self.calls.append((name, *args))
+
+
+class SeqSubscriber:
+    """Yields to the other games of the loop now and then"""
+
+    def __init__(self, seed: int):
+        self.rng = random.Random(seed)
+        self.seqs: list[int] = []
+
+    async def listen(self, event: Event) -> None:
+        if self.rng.random() < 0.3:
+            await asyncio.sleep(0)
+        self.seqs.append(event.seq)
+
+
+@pytest.fixture
+def runtime() -> Iterator[EventRuntime]:
+    runtime = EventRuntime(n_loops=2)
+    yield runtime
+    runtime.close(timeout=1)
+
+
+def command(property_id: int) -> Event:
+    return Event(
+        EventType.V_MORTGAGE, payload.UserCommand(user_id="a", property_id=property_id)
+    )
+
+
+def test_games_stay_ordered_under_load(runtime: EventRuntime):
+    n_games, n_events, n_threads = 40, 300, 4
+    dispatcher = ShardedDispatcher("games", n_shards=4, runtime=runtime)
+    game_ids = [f"game-{idx}" for idx in range(n_games)]
+    listeners: dict[str, ControllerListener] = {}
+    recorders: dict[str, SeqSubscriber] = {}
+    for idx, game_id in enumerate(game_ids):
+        listeners[game_id] = ControllerListener(
+            RecordingController()  # type: ignore[arg-type]
+        )
+        recorders[game_id] = SeqSubscriber(idx)
+        dispatcher.register_game(game_id, listeners[game_id])
+        dispatcher.register_game(game_id, recorders[game_id])
+        users = payload.AddUsers(user_ids=["a"])
+        dispatcher.publish(game_id, Event(EventType.V_ADD_PLAYER, users))
+
+    def publish(owned: list[str]) -> None:
+        # the games of a thread interleaved, each in its own order
+        for property_id in range(n_events):
+            for game_id in owned:
+                dispatcher.publish(game_id, command(property_id))
+
+    threads = [
+        threading.Thread(target=publish, args=(game_ids[idx::n_threads],))
+        for idx in range(n_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert dispatcher.drain(timeout=5)
+
+    assert sum(dispatcher.dispatched()) == n_games * (n_events + 1)
+    assert all(dispatcher.dispatched())  # every shard got games
+    expected = [("mortgage", 0, property_id) for property_id in range(n_events)]
+    for game_id in game_ids:
+        calls = listeners[game_id].game_controller.calls  # type: ignore[attr-defined]
+        assert calls == expected
+        assert recorders[game_id].seqs == list(range(1, n_events + 2))
+    dispatcher.close()
+    assert dispatcher.drain(timeout=1)
+    assert runtime.topic_count == 0
+
+
+def test_shards_run_in_parallel(runtime: EventRuntime):
+    dispatcher = ShardedDispatcher("games", n_shards=2, runtime=runtime)
+    game_ids: dict[int, str] = {}
+    idx = 0
+    while len(game_ids) < 2:
+        game_ids.setdefault(dispatcher.shard_of(f"game-{idx}"), f"game-{idx}")
+        idx += 1
+    released = threading.Event()
+    waited: list[bool] = []
+
+    class Blocking:
+        def listen(self, event: Event) -> None:
+            waited.append(released.wait(timeout=2))
+
+    class Releasing:
+        def listen(self, event: Event) -> None:
+            released.set()
+
+    dispatcher.register_game(game_ids[0], Blocking())
+    dispatcher.register_game(game_ids[1], Releasing())
+    dispatcher.publish(game_ids[0], command(0))
+    dispatcher.publish(game_ids[1], command(0))
+    assert dispatcher.drain(timeout=3)
+    assert waited == [True]  # shard 1 handled its game while shard 0 was blocked
+    dispatcher.close()
+
+
+def test_errors(runtime: EventRuntime, capsys: pytest.CaptureFixture[str]):
+    with pytest.raises(ValueError, match="Number of shards must be positive"):
+        ShardedDispatcher("games", n_shards=0, runtime=runtime)
+    dispatcher = ShardedDispatcher("games", n_shards=3, runtime=runtime)
+    assert dispatcher.shard_of("abc") == zlib.crc32(b"abc") % 3  # not hash()
+    with pytest.raises(EventError, match="Game abc is not registered"):
+        dispatcher.publish("abc", command(0))
+
+    class Failing:
+        def listen(self, event: Event) -> None:
+            raise RuntimeError("failed")
+
+    recorder = SeqSubscriber(0)
+    dispatcher.register_game("abc", Failing())
+    dispatcher.register_game("abc", recorder)
+    dispatcher.publish("abc", command(0))
+    assert dispatcher.drain(timeout=1)
+    assert recorder.seqs == [1]
+    assert "Dispatcher games - Error in game abc: failed" in capsys.readouterr().out
+
+    dispatcher.unregister_game("abc")
+    with pytest.raises(EventError, match="Game abc is not registered"):
+        dispatcher.publish("abc", command(0))
+    dispatcher.close()
+    assert dispatcher.closed
+    with pytest.raises(EventError, match="Dispatcher games is closed"):
+        dispatcher.register_game("abc", recorder)
+    assert dispatcher.drain(timeout=1)
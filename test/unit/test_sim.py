@@ -0,0 +1,172 @@
+import random
+
+import pytest
+
+import constants as c
+from game import sim, space
+from game.game import Game
+from game.player import Player
+from game.rng import GameRng
+
+
+@pytest.fixture
+def simulator_greedy() -> sim.Simulator:
+    return sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+
+
+@pytest.fixture
+def simulator_passive() -> sim.Simulator:
+    return sim.Simulator(policies=[sim.PassivePolicy() for _ in range(4)], max_turns=40)
+
+
+def test_new_game(simulator_greedy: sim.Simulator):
+    game = simulator_greedy.new_game()
+    assert len(game.players) == 4
+    assert game.game_map.size == 40
+    for player in game.players:
+        assert player.cash == c.CONST_SIM_STARTING_CASH
+
+
+def test_play_game_no_io(
+    simulator_greedy: sim.Simulator,
+    capsys: pytest.CaptureFixture[str],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    def fail_input(_prompt: str) -> str:
+        raise AssertionError("input() must not be called")
+
+    monkeypatch.setattr("builtins.input", fail_input)
+    for seed in range(5):
+        simulator_greedy.play_game(simulator_greedy.new_game(rng=GameRng(seed)))
+    captured = capsys.readouterr()
+    assert captured.out == ""
+
+
+def test_play_game_result(simulator_greedy: sim.Simulator):
+    for seed in range(10):
+        result = simulator_greedy.play_game(
+            simulator_greedy.new_game(rng=GameRng(seed))
+        )
+        assert 0 < result.turns <= simulator_greedy.max_turns
+        assert len(result.cash) == len(result.active) == 4
+        if result.winner_uid is None:
+            assert result.turns == simulator_greedy.max_turns
+        else:
+            assert result.active[result.winner_uid]
+            assert sum(result.active) == 1
+
+
+def test_play_game_invariants(simulator_greedy: sim.Simulator):
+    """Buying, building, mortgaging and bankruptcies keep the player totals exact"""
+    for seed in range(5):
+        game = simulator_greedy.new_game(rng=GameRng(seed))
+        game.check_invariants = True
+        simulator_greedy.play_game(game)
+        game.verify_player_totals()
+
+
+def test_passive_policy_times_out(simulator_passive: sim.Simulator):
+    """Passive players never buy, so no one wins before the turn limit. They only
+    own the properties won for free as the last remaining bidder of an auction"""
+    game = simulator_passive.new_game(rng=GameRng(9001))
+    result = simulator_passive.play_game(game)
+    assert result.winner_uid is None
+    assert result.turns == simulator_passive.max_turns
+    for player in game.players:
+        for property_ in player.properties:
+            assert property_.owner_uid == player.uid
+
+
+def test_run_stats(simulator_greedy: sim.Simulator):
+    stats = simulator_greedy.run(5, seed=9001)
+    assert stats.games == 5
+    assert stats.turns > 0
+    assert sum(stats.wins) + stats.timeouts == 5
+    assert stats.elapsed > 0
+    assert stats.games_per_sec == pytest.approx(5 / stats.elapsed)
+    assert stats.turns_per_sec == pytest.approx(stats.turns / stats.elapsed)
+
+
+def test_run_seeded(simulator_greedy: sim.Simulator):
+    stats = [simulator_greedy.run(3, seed=5) for _ in range(2)]
+    assert stats[0].turns == stats[1].turns
+    assert stats[0].wins == stats[1].wins
+
+
+def test_new_game_owns_rng(simulator_greedy: sim.Simulator):
+    random.seed(1)
+    state = random.getstate()
+    simulator_greedy.play_game(simulator_greedy.new_game())
+    assert random.getstate() == state
+
+
+def test_play_turn_next_player(simulator_greedy: sim.Simulator):
+    game = simulator_greedy.new_game()
+    first_player = game.current_player_id
+    simulator_greedy.play_turn(game)
+    assert game.current_player_id == (first_player + 1) % 4
+    assert game.has_double_roll is False
+
+
+def test_jail_turn_pays_fine_after_max_turns(
+    simulator_passive: sim.Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(sim.PassivePolicy, "should_pay_jail_fine", lambda *_: False)
+    game = simulator_passive.new_game()
+    player = game.current_player
+    game.send_player_to_jail()
+    player.jail_turns = c.CONST_MAX_JAIL_TURNS - 1
+    monkeypatch.setattr("game.dice.roll", lambda **_: (1, 2))
+    old_cash = player.cash
+    simulator_passive.play_turn(game)
+    assert player.jail_turns is None
+    assert player.position == 13
+    assert player.cash == old_cash - c.CONST_JAIL_FINE
+
+
+def test_jail_turn_stays(
+    simulator_passive: sim.Simulator, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.setattr(sim.PassivePolicy, "should_pay_jail_fine", lambda *_: False)
+    game = simulator_passive.new_game()
+    player = game.current_player
+    game.send_player_to_jail()
+    monkeypatch.setattr("game.dice.roll", lambda **_: (1, 2))
+    simulator_passive.play_turn(game)
+    assert player.jail_turns == 1
+    assert player.position == 10
+
+
+def test_raise_cash_mortgages(simulator_greedy: sim.Simulator):
+    game = simulator_greedy.new_game()
+    player = game.players[0]
+    property_ = game.get_property(position=1)
+    game.buy_property_transaction(player, property_)
+    player.sub_cash(player.cash)
+    sim.GreedyPolicy().raise_cash(game, player, 10)
+    assert property_.mortgaged is True
+    assert player.cash == property_.mortgage_value
+
+
+def test_greedy_policy_builds_evenly(simulator_greedy: sim.Simulator):
+    game = simulator_greedy.new_game()
+    player = game.players[0]
+    for position in (1, 3):
+        game.buy_property_transaction(player, game.get_property(position=position))
+    sim.GreedyPolicy(reserve=player.cash - 150).end_turn(game, player)
+    houses = []
+    for property_ in player.properties:
+        assert isinstance(property_, space.PropertySpace)
+        houses.append(property_.no_of_houses)
+    assert houses == [2, 1]
+
+
+def test_pay_bankrupts_to_creditor(simulator_greedy: sim.Simulator):
+    game = simulator_greedy.new_game()
+    player: Player = game.players[0]
+    creditor: Player = game.players[1]
+    player.sub_cash(player.cash - 10)
+    old_cash = creditor.cash
+    assert simulator_greedy._pay(game, player, 100, creditor.uid) is False
+    assert player.active is False
+    assert creditor.cash == old_cash + 10
@@ -0,0 +1,144 @@
+import pytest
+
+from game import card, sim, space, state
+from game.game import Game
+from game.rng import GameRng
+
+
+@pytest.fixture
+def simulator_greedy() -> sim.Simulator:
+    return sim.Simulator(policies=[sim.GreedyPolicy() for _ in range(4)])
+
+
+@pytest.fixture
+def game_played(simulator_greedy: sim.Simulator) -> Game:
+    """Greedy game after enough turns to own, build and mortgage"""
+    game = simulator_greedy.new_game(rng=GameRng(3))
+    for _ in range(120):
+        simulator_greedy.play_turn(game)
+    return game
+
+
+def assert_same_game(game_1: Game, game_2: Game):
+    for player_1, player_2 in zip(game_1.players, game_2.players, strict=True):
+        assert player_1.name == player_2.name
+        assert player_1.cash == player_2.cash
+        assert player_1.position == player_2.position
+        assert player_1.jail_turns == player_2.jail_turns
+        assert player_1.active == player_2.active
+        assert [p.id for p in player_1.properties] == [
+            p.id for p in player_2.properties
+        ]
+        assert player_1.get_jail_card_ids() == player_2.get_jail_card_ids()
+        assert player_1.get_totals() == player_2.get_totals()
+    for space_1, space_2 in zip(
+        game_1.game_map.map_list, game_2.game_map.map_list, strict=True
+    ):
+        if isinstance(space_1, space.Property):
+            assert isinstance(space_2, space.Property)
+            assert space_1.owner_uid == space_2.owner_uid
+            assert space_1.mortgaged == space_2.mortgaged
+            assert space_1.property_set.monopoly == space_2.property_set.monopoly
+        if isinstance(space_1, space.PropertySpace):
+            assert isinstance(space_2, space.PropertySpace)
+            assert space_1.no_of_houses == space_2.no_of_houses
+            assert space_1.no_of_hotels == space_2.no_of_hotels
+    assert [c.id for c in game_1.chance_deck.cards] == [
+        c.id for c in game_2.chance_deck.cards
+    ]
+    assert [c.id for c in game_1.cc_deck.cards] == [c.id for c in game_2.cc_deck.cards]
+    assert game_1.current_player_uid == game_2.current_player_uid
+    assert game_1.last_dice_rolls == game_2.last_dice_rolls
+
+
+def test_encode_played_game(game_played: Game):
+    game_state = state.encode(game_played)
+    assert game_state.n_players == 4
+    assert game_state.n_positions == 40
+    assert len(game_state.chance_cards) + len(game_state.cc_cards) + len(
+        game_state.jail_cards
+    ) // 2 == len(game_played.chance_deck.cards) + len(game_played.cc_deck.cards) + sum(
+        len(player.jail_cards) for player in game_played.players
+    )
+    for position, map_space in enumerate(game_played.game_map.map_list):
+        if isinstance(map_space, space.Property):
+            owner = game_state.owner[position]
+            assert map_space.owner_uid == (None if owner == state.BANK else owner)
+            assert game_state.is_mortgaged(position) == map_space.mortgaged
+        else:
+            assert game_state.owner[position] == state.BANK
+    assert sorted(game_state.property_order) == sorted(
+        position
+        for position, owner in enumerate(game_state.owner)
+        if owner != state.BANK
+    )
+
+
+def test_round_trip(game_played: Game):
+    game_state = state.encode(game_played)
+    decoded = state.decode(state.GameState.from_bytes(game_state.to_bytes()))
+    assert_same_game(game_played, decoded)
+    assert state.encode(decoded) == game_state
+
+
+def test_round_trip_keeps_playing_the_same(
+    game_played: Game, simulator_greedy: sim.Simulator
+):
+    decoded = state.decode(state.encode(game_played))
+    assert decoded.rng is not game_played.rng
+    for _ in range(50):
+        simulator_greedy.play_turn(game_played)
+        simulator_greedy.play_turn(decoded)
+    assert_same_game(game_played, decoded)
+
+
+def test_decode_into_game(game_played: Game, simulator_greedy: sim.Simulator):
+    game_state = state.encode(game_played)
+    template = simulator_greedy.new_game()
+    game_map = template.game_map
+    decoded = state.decode(game_state, game=template)
+    assert decoded is template
+    assert decoded.game_map is game_map
+    assert_same_game(game_played, decoded)
+
+
+def test_round_trip_jail_card_and_auction(
+    game_middle: Game, fake_jail_card: card.ChanceCard
+):
+    game_middle.add_player_jail_card(2, fake_jail_card)
+    game_middle.players[3].jail_turns = 1
+    game_middle.players[0].assign_token(5)
+    game_middle.current_player_uid = 0
+    game_middle._roll_double_counter = (0, 2)
+    game_middle.auction_property(game_middle.get_property(position=6))
+    game_middle.bid_property(10)
+
+    game_state = state.GameState.from_bytes(state.encode(game_middle).to_bytes())
+    decoded = state.decode(game_state)
+    assert_same_game(game_middle, decoded)
+    assert decoded.players[2].get_jail_card_ids() == [8]
+    assert decoded.players[3].jail_turns == 1
+    assert decoded.players[0].token == 5
+    assert decoded._roll_double_counter == (0, 2)
+    assert [bidder.uid for bidder in decoded.bidders] == [
+        bidder.uid for bidder in game_middle.bidders
+    ]
+    assert decoded.current_bid_price == 10
+    assert decoded.current_bid_property is decoded.get_property(position=6)
+
+
+def test_without_rng(game_played: Game):
+    with_rng = state.encode(game_played)
+    without_rng = state.encode(game_played, include_rng=False)
+    assert without_rng.rng_state is None
+    assert len(without_rng.to_bytes()) < 400 < len(with_rng.to_bytes())
+    assert state.GameState.from_bytes(without_rng.to_bytes()) == without_rng
+
+
+def test_decode_mismatch(game_played: Game, game_with_players: Game):
+    game_state = state.encode(game_played)
+    with pytest.raises(ValueError, match="does not fit a map"):
+        state.decode(game_state, game=game_with_players)
+    game_played.players.pop()
+    with pytest.raises(ValueError, match="does not fit 3 players"):
+        state.decode(game_state, game=game_played)
@@ -0,0 +1,260 @@
+import asyncio
+import threading
+import time
+from collections.abc import Callable, Iterator
+
+import pytest
+
+from event import Event, EventType, QueuePolicy, Topic
+from event.exceptions import TopicClosedError
+from event.runtime import EventRuntime
+from event.subscription import Subscription
+
+
+class RecordingSubscriber:
+    def __init__(self):
+        self.events: list[Event] = []
+
+    async def listen(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class GatedSubscriber(RecordingSubscriber):
+    """Listens until the gate opens, like a slow view"""
+
+    def __init__(self):
+        super().__init__()
+        self.started = threading.Event()
+        self.gate = threading.Event()
+
+    async def listen(self, event: Event) -> None:
+        self.started.set()
+        await asyncio.get_running_loop().run_in_executor(None, self.gate.wait)
+        self.events.append(event)
+
+
+@pytest.fixture
+def topic() -> Iterator[Topic]:
+    runtime = EventRuntime()
+    topic = Topic("test", runtime=runtime)
+    yield topic
+    runtime.close(timeout=1)
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 1) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def dice_event() -> Event:
+    return Event(EventType.G_DICE_ROLL, {"dices": (1, 2)})
+
+
+def cash_event(player_id: int, old_cash: int, new_cash: int) -> Event:
+    return Event(
+        EventType.G_CASH_CHANGE,
+        {"player_id": player_id, "old_cash": old_cash, "new_cash": new_cash},
+    )
+
+
+def test_slow_subscriber_does_not_block_others(topic: Topic):
+    slow = GatedSubscriber()
+    fast = RecordingSubscriber()
+    topic.register_subscriber(slow, name="view")
+    topic.register_subscriber(fast, name="controller")
+    events = [dice_event() for _ in range(20)]
+    topic.publish(events[0])
+    assert slow.started.wait(timeout=1)
+    for event in events[1:]:
+        topic.publish(event)
+    wait_until(lambda: len(fast.events) == 20)
+    assert fast.events == events
+    assert slow.events == []
+
+    view, controller = topic.stats()
+    assert (view.name, view.depth, view.delivered, view.lag) == ("view", 19, 0, 20)
+    assert view.lag_seconds > 0
+    assert (controller.depth, controller.delivered, controller.lag) == (0, 20, 0)
+
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+    assert slow.events == events
+    assert topic.stats()[0].high_water == 19
+
+
+def test_block_policy(topic: Topic):
+    slow = GatedSubscriber()
+    fast = RecordingSubscriber()
+    topic.register_subscriber(slow, maxsize=2, policy=QueuePolicy.BLOCK)
+    topic.register_subscriber(fast)
+    events = [dice_event() for _ in range(10)]
+    for event in events:
+        topic.publish(event)
+    wait_until(lambda: len(fast.events) == 3)
+    assert not topic.drain(timeout=0.05)
+    assert len(fast.events) == 3  # one listened to and two queued
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+    assert slow.events == events
+    assert fast.events == events
+
+
+def test_drop_oldest_policy(topic: Topic):
+    slow = GatedSubscriber()
+    fast = RecordingSubscriber()
+    topic.register_subscriber(slow, maxsize=3, policy=QueuePolicy.DROP_OLDEST)
+    topic.register_subscriber(fast)
+    topic.publish(dice_event())
+    assert slow.started.wait(timeout=1)
+    for _ in range(9):
+        topic.publish(dice_event())
+    wait_until(lambda: len(fast.events) == 10)
+    stats = topic.stats()[0]
+    assert (stats.depth, stats.dropped) == (3, 6)
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+    assert [event.seq for event in slow.events] == [1, 8, 9, 10]
+
+
+def test_coalesce_policy(topic: Topic):
+    slow = GatedSubscriber()
+    fast = RecordingSubscriber()
+    topic.register_subscriber(slow, maxsize=3, policy=QueuePolicy.COALESCE)
+    topic.register_subscriber(fast)
+    topic.publish(dice_event())
+    assert slow.started.wait(timeout=1)
+    topic.publish(cash_event(0, 1500, 1400))
+    topic.publish(cash_event(1, 1500, 1600))
+    topic.publish(cash_event(0, 1400, 1200))
+    topic.publish(dice_event())
+    topic.publish(cash_event(0, 1200, 1000))
+    wait_until(lambda: len(fast.events) == 6)
+    stats = topic.stats()[0]
+    assert (stats.depth, stats.coalesced, stats.dropped) == (3, 2, 0)
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+    assert [event.seq for event in slow.events] == [1, 3, 5, 6]
+    assert slow.events[3].message == {
+        "player_id": 0,
+        "old_cash": 1500,
+        "new_cash": 1000,
+    }
+    # the events of the other subscribers are not changed
+    assert fast.events[5].message["old_cash"] == 1200
+
+
+def test_coalesce_policy_drops_when_full(topic: Topic):
+    slow = GatedSubscriber()
+    topic.register_subscriber(slow, maxsize=2, policy=QueuePolicy.COALESCE)
+    topic.publish(dice_event())
+    assert slow.started.wait(timeout=1)
+    for player_id in range(3):
+        topic.publish(cash_event(player_id, 1500, 1400))
+    topic.publish(cash_event(1, 1400, 1300))  # the dropped event was player 0
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+    assert [event.message["player_id"] for event in slow.events[1:]] == [2, 1]
+    assert slow.events[2].message["old_cash"] == 1500
+    assert topic.stats()[0].dropped == 1
+
+
+def test_coalesce_policy_keeps_one_slot_per_key():
+    subscription = Subscription(
+        RecordingSubscriber(),
+        topic_name="test",
+        name="slow",
+        maxsize=4,
+        policy=QueuePolicy.COALESCE,
+    )
+
+    async def publish() -> None:  # nothing listens, the queue only grows
+        for cash in range(100_000):
+            await subscription.put(cash_event(0, cash, cash + 1), 0)
+
+    asyncio.run(publish())
+    assert len(subscription._slots) == subscription.depth == 1
+    assert subscription.coalesced == 99_999
+    assert subscription.stats().depth == 1
+    message = subscription._pop().event.message
+    assert (message["old_cash"], message["new_cash"]) == (0, 100_000)
+
+
+def test_register_subscriber_invalid(topic: Topic):
+    with pytest.raises(ValueError, match="Queue size must be positive"):
+        topic.register_subscriber(RecordingSubscriber(), maxsize=0)
+    topic.close()
+    assert topic.drain(timeout=1)
+    with pytest.raises(TopicClosedError, match="Topic test is closed"):
+        topic.register_subscriber(RecordingSubscriber())
+
+
+class SyncRecordingSubscriber:
+    def __init__(self):
+        self.events: list[Event] = []
+        self.threads: set[int] = set()
+
+    def listen(self, event: Event) -> None:
+        self.threads.add(threading.get_ident())
+        self.events.append(event)
+
+
+def test_sync_subscriber(topic: Topic):
+    sync = SyncRecordingSubscriber()
+    subscription = topic.register_subscriber(sync)
+    slow = GatedSubscriber()
+    topic.register_subscriber(slow)
+    assert subscription.synchronous
+    events = [dice_event() for _ in range(10)]
+    for event in events:
+        topic.publish(event)
+    wait_until(lambda: len(sync.events) == 10)
+    assert sync.events == events
+    assert len(sync.threads) == 1  # the loop of the topic
+    assert threading.get_ident() not in sync.threads
+    stats = topic.stats()[0]
+    assert (stats.depth, stats.delivered, stats.lag) == (0, 10, 0)
+    slow.gate.set()
+    assert topic.drain(timeout=1)
+
+
+def test_sync_subscriber_error(topic: Topic, capsys: pytest.CaptureFixture[str]):
+    class FailingSubscriber:
+        def listen(self, event: Event) -> None:
+            raise RuntimeError("sync failure")
+
+    topic.register_subscriber(FailingSubscriber(), name="failing")
+    sync = SyncRecordingSubscriber()
+    topic.register_subscriber(sync)
+    topic.publish(dice_event())
+    assert topic.drain(timeout=1)
+    assert len(sync.events) == 1
+    assert "Topic test - Error in subscriber failing: sync failure" in (
+        capsys.readouterr().out
+    )
+
+
+def test_handler_table_sync_and_async(topic: Topic):
+    handled: list[EventType] = []
+
+    def on_dice(event: Event) -> None:
+        handled.append(event.event_type)
+
+    async def on_move(event: Event) -> None:
+        await asyncio.sleep(0)
+        handled.append(event.event_type)
+
+    sync = topic.register_handlers({EventType.G_DICE_ROLL: on_dice})
+    mixed = topic.register_handlers(
+        {EventType.G_DICE_ROLL: on_dice, EventType.G_MOVE: on_move}
+    )
+    assert sync.synchronous and not mixed.synchronous
+    topic.publish(dice_event())
+    topic.publish(Event(EventType.G_MOVE, {}))
+    assert topic.drain(timeout=1)
+    assert sorted(handled, key=lambda event_type: event_type.value) == [
+        EventType.G_DICE_ROLL,
+        EventType.G_DICE_ROLL,
+        EventType.G_MOVE,
+    ]
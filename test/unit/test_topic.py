@@ -0,0 +1,125 @@
+import threading
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from event import Event, EventType, LocalPublisher, Topic
+from event.runtime import EventRuntime
+
+
+class RecordingSubscriber:
+    def __init__(self, expected: int):
+        self.events: list[Event] = []
+        self.expected = expected
+        self.done = threading.Event()
+
+    async def listen(self, event: Event) -> None:
+        self.events.append(event)
+        if len(self.events) == self.expected:
+            self.done.set()
+
+
+class FailingSubscriber:
+    async def listen(self, event: Event) -> None:
+        raise RuntimeError(f"failed on {event.message['idx']}")
+
+
+def make_events(count: int) -> list[Event]:
+    return [Event(EventType.G_DICE_ROLL, {"idx": idx}) for idx in range(count)]
+
+
+@pytest.fixture
+def topic() -> Iterator[Topic]:
+    runtime = EventRuntime()
+    topic = Topic("test", runtime=runtime)
+    yield topic
+    runtime.close(timeout=1)
+
+
+def test_publish_in_order(topic: Topic):
+    subscribers = [RecordingSubscriber(20), RecordingSubscriber(20)]
+    for subscriber in subscribers:
+        topic.register_subscriber(subscriber)
+    publisher = LocalPublisher()
+    publisher.register_topic(topic)
+
+    events = make_events(20)
+    start = time.perf_counter()
+    for event in events:
+        publisher.publish(event)
+    for subscriber in subscribers:
+        assert subscriber.done.wait(timeout=1)
+        assert subscriber.events == events
+    # a turn worth of events no longer waits for a polling interval per event
+    assert time.perf_counter() - start < 0.5
+
+
+def test_publish_from_threads(topic: Topic):
+    subscriber = RecordingSubscriber(100)
+    topic.register_subscriber(subscriber)
+    events = make_events(100)
+    threads = [
+        threading.Thread(
+            target=lambda chunk=events[idx::4]: [topic.publish(e) for e in chunk]
+        )
+        for idx in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert subscriber.done.wait(timeout=1)
+    assert sorted(event.message["idx"] for event in subscriber.events) == list(
+        range(100)
+    )
+
+
+def test_failing_subscriber(topic: Topic, capsys: pytest.CaptureFixture[str]):
+    topic.register_subscriber(FailingSubscriber())
+    subscriber = RecordingSubscriber(2)
+    topic.register_subscriber(subscriber)
+    for event in make_events(2):
+        topic.publish(event)
+    assert subscriber.done.wait(timeout=1)
+    assert "Topic test - Error in subscriber 0: failed on 0" in capsys.readouterr().out
+
+
+def test_route_by_event_type(topic: Topic):
+    dice = RecordingSubscriber(2)
+    every = RecordingSubscriber(3)
+    topic.register_subscriber(dice, event_types=[EventType.G_DICE_ROLL])
+    topic.register_subscriber(every)
+    events = [
+        Event(EventType.G_DICE_ROLL, {"idx": 0}),
+        Event(EventType.G_MOVE, {"idx": 1}),
+        Event(EventType.G_DICE_ROLL, {"idx": 2}),
+    ]
+    for event in events:
+        topic.publish(event)
+    assert topic.drain(timeout=1)
+    assert dice.events == [events[0], events[2]]
+    assert every.events == events
+    assert [stats.delivered for stats in topic.stats()] == [2, 3]
+
+
+def test_register_handlers(topic: Topic):
+    handled: list[tuple[str, int]] = []
+
+    async def on_move(event: Event) -> None:
+        handled.append(("move", event.message["idx"]))
+
+    async def on_cash(event: Event) -> None:
+        handled.append(("cash", event.message["idx"]))
+
+    subscription = topic.register_handlers(
+        {EventType.G_MOVE: on_move, EventType.G_CASH_CHANGE: on_cash}
+    )
+    assert subscription.event_types == {EventType.G_MOVE, EventType.G_CASH_CHANGE}
+    for idx, event_type in enumerate(
+        [EventType.G_MOVE, EventType.G_DICE_ROLL, EventType.G_CASH_CHANGE]
+    ):
+        topic.publish(Event(event_type, {"idx": idx}))
+    assert topic.drain(timeout=1)
+    assert handled == [("move", 0), ("cash", 2)]
+    assert topic.stats()[0].delivered == 2
@@ -0,0 +1,245 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+
+import pytest
+
+from event import (
+    Event,
+    EventRuntime,
+    EventType,
+    QueuePolicy,
+    SocketPublisher,
+    SocketReceiver,
+    Topic,
+    payload,
+)
+from event.exceptions import EventError
+from event.transport import decode_events, encode_event
+
+
+class RecordingSubscriber:
+    def __init__(self):
+        self.events: list[Event] = []
+
+    def listen(self, event: Event) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture
+def runtime() -> Iterator[EventRuntime]:
+    runtime = EventRuntime()
+    yield runtime
+    runtime.close(timeout=1)
+
+
+@pytest.fixture
+def socket_path(tmp_path: Path) -> str:
+    return str(tmp_path / "events.sock")
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+def test_encode_decode():
+    events = [
+        Event(
+            EventType.G_MOVE, payload.Move(player_id=1, old_position=3, new_position=9)
+        ),
+        Event(EventType.G_DICE_ROLL, payload.DiceRoll(dices=(4, 4))),
+        Event(EventType.G_ADD_PLAYER, payload.AddPlayers(user_to_player={"a": 0})),
+        Event(EventType.G_MOVE, {"player_id": 0, "old_position": 1, "new_position": 2}),
+        Event(EventType.V_START_GAME, payload.Empty()),
+        Event(EventType.G_DICE_ROLL, payload.PlayerPayload(player_id=2)),
+    ]
+    buffer = bytearray(b"".join(encode_event(event) for event in events))
+    decoded = decode_events(buffer)
+    assert buffer == bytearray()
+    for event, copy in zip(events, decoded, strict=True):
+        assert copy.event_type is event.event_type
+        assert copy.timestamp_ns == event.timestamp_ns
+    assert [copy.message for copy in decoded[:5]] == [
+        event.message for event in events[:5]
+    ]
+    assert type(decoded[0].message) is payload.Move
+    assert decoded[5].message == {"player_id": 2}  # not the payload of the type
+
+
+def test_decode_partial_frame():
+    frame = encode_event(Event(EventType.G_DICE_ROLL, payload.DiceRoll(dices=(1, 2))))
+    buffer = bytearray(frame + frame[:5])
+    assert len(decode_events(buffer)) == 1
+    assert buffer == frame[:5]
+    buffer += frame[5:]
+    assert len(decode_events(buffer)) == 1
+    assert buffer == bytearray()
+
+
+def test_encode_invalid_message():
+    with pytest.raises(ValueError, match="Cannot encode the message of"):
+        encode_event(Event(EventType.G_ALL_STATES, {"state": object()}))
+
+
+def test_publish_to_receiver(runtime: EventRuntime, socket_path: str):
+    topic = Topic("remote", runtime=runtime)
+    subscriber = RecordingSubscriber()
+    topic.register_subscriber(subscriber)
+    receiver = SocketReceiver(socket_path, topic, runtime=runtime)
+    publishers = [SocketPublisher(socket_path), SocketPublisher(socket_path)]
+    with publishers[0].batch():
+        for idx in range(100):
+            publishers[0].publish(
+                Event(EventType.G_CURRENT_PLAYER, payload.PlayerPayload(player_id=idx))
+            )
+        assert receiver.received_count == 0  # written when the batch ends
+    publishers[1].publish(Event(EventType.V_START_GAME, payload.Empty()))
+    wait_until(lambda: receiver.received_count == 101)
+    assert topic.drain(timeout=1)
+    player_ids = [
+        event.message["player_id"]
+        for event in subscriber.events
+        if event.event_type is EventType.G_CURRENT_PLAYER
+    ]
+    assert player_ids == list(range(100))
+    for publisher in publishers:
+        publisher.close()
+    with pytest.raises(EventError, match="is closed"):
+        publishers[0].publish(Event(EventType.V_START_GAME, payload.Empty()))
+    receiver.close(timeout=1)
+    assert not os.path.exists(socket_path)
+
+
+def test_forward_topic(runtime: EventRuntime, socket_path: str):
+    remote_topic = Topic("remote", runtime=runtime)
+    subscriber = RecordingSubscriber()
+    remote_topic.register_subscriber(subscriber)
+    receiver = SocketReceiver(socket_path, remote_topic, runtime=runtime)
+    local_topic = Topic("local", runtime=runtime)
+    forwarder = SocketPublisher(socket_path)
+    local_topic.register_subscriber(forwarder, event_types=[EventType.G_CASH_CHANGE])
+    for idx in range(50):
+        local_topic.publish(Event(EventType.G_DICE_ROLL, {"idx": idx}))
+        local_topic.publish(
+            Event(
+                EventType.G_CASH_CHANGE,
+                payload.CashChange(player_id=0, old_cash=idx, new_cash=idx + 1),
+            )
+        )
+    assert local_topic.drain(timeout=1)
+    wait_until(lambda: receiver.received_count == 50)
+    assert remote_topic.drain(timeout=1)
+    assert [event.message["new_cash"] for event in subscriber.events] == list(
+        range(1, 51)
+    )
+    forwarder.close()
+    receiver.close(timeout=1)
+
+
+def test_forward_on_the_loop_of_the_receiver(socket_path: str):
+    """The frames forwarded on a loop are written while the receiver reads them
+    on the same loop"""
+    runtime = EventRuntime(n_loops=1)
+    try:
+        remote_topic = Topic("remote", runtime=runtime)
+        subscriber = RecordingSubscriber()
+        remote_topic.register_subscriber(subscriber)
+        receiver = SocketReceiver(socket_path, remote_topic, runtime=runtime)
+        local_topic = Topic("local", runtime=runtime)
+        forwarder = SocketPublisher(socket_path)
+        local_topic.register_subscriber(forwarder)
+        status = [{"index": idx, "owner": 0, "houses": 0} for idx in range(40)]
+        for idx in range(5000):
+            message = payload.PropertyStatus(player_id=idx, property_status=status)
+            local_topic.publish(Event(EventType.G_PROPERTY_STATUS, message))
+        assert local_topic.drain(timeout=10)
+        wait_until(lambda: receiver.received_count == 5000, timeout=10)
+        assert remote_topic.drain(timeout=10)
+        player_ids = [event.message.player_id for event in subscriber.events]
+        assert player_ids == list(range(5000))
+        forwarder.close()
+        receiver.close(timeout=1)
+    finally:
+        runtime.close(timeout=1)
+
+
+def property_status(player_id: int) -> Event:
+    status = [{"index": idx, "owner": 0, "houses": 0} for idx in range(40)]
+    message = payload.PropertyStatus(player_id=player_id, property_status=status)
+    return Event(EventType.G_PROPERTY_STATUS, message)
+
+
+def read_events(connection: socket.socket, count: int) -> list[Event]:
+    buffer = bytearray()
+    events: list[Event] = []
+    while len(events) < count:
+        buffer += connection.recv(256 * 1024)
+        events += decode_events(buffer)
+    return events
+
+
+@pytest.mark.parametrize("policy", [QueuePolicy.BLOCK, QueuePolicy.DROP_OLDEST])
+def test_stalled_receiver(socket_path: str, policy: QueuePolicy):
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen()
+    publisher = SocketPublisher(
+        socket_path, batch_bytes=1, max_pending_bytes=64 * 1024, policy=policy
+    )
+    connection, _ = listener.accept()  # not read until the events are published
+
+    def publish() -> None:
+        for idx in range(2000):
+            publisher.publish(property_status(idx))
+
+    thread = threading.Thread(target=publish)
+    thread.start()
+    thread.join(timeout=0.5 if policy is QueuePolicy.BLOCK else 5)
+    assert thread.is_alive() is (policy is QueuePolicy.BLOCK)
+    assert publisher.pending_bytes <= 64 * 1024
+    if policy is QueuePolicy.DROP_OLDEST:
+        assert publisher.dropped > 0
+    events = read_events(connection, 2000 - publisher.dropped)
+    thread.join(timeout=5)
+    publisher.close()
+    player_ids = [event.message.player_id for event in events]
+    assert player_ids == sorted(player_ids)
+    assert len(player_ids) == 2000 - publisher.dropped
+    assert player_ids[-1] == 1999
+    connection.close()
+    listener.close()
+    with pytest.raises(ValueError, match="cannot coalesce"):
+        SocketPublisher(socket_path, policy=QueuePolicy.COALESCE)
+
+
+def test_publish_from_other_process(runtime: EventRuntime, socket_path: str):
+    topic = Topic("remote", runtime=runtime)
+    subscriber = RecordingSubscriber()
+    topic.register_subscriber(subscriber)
+    receiver = SocketReceiver(socket_path, topic, runtime=runtime)
+    code = (
+        "import sys\n"
+        "from event import Event, EventType, SocketPublisher, payload\n"
+        "publisher = SocketPublisher(sys.argv[1])\n"
+        "for dice in range(1, 7):\n"
+        "    message = payload.DiceRoll(dices=(dice, dice))\n"
+        "    publisher.publish(Event(EventType.G_DICE_ROLL, message))\n"
+        "publisher.close()\n"
+    )
+    src = Path(__file__).parents[2] / "src"
+    env = {**os.environ, "PYTHONPATH": str(src)}
+    subprocess.run([sys.executable, "-c", code, socket_path], env=env, check=True)
+    wait_until(lambda: receiver.received_count == 6)
+    assert topic.drain(timeout=1)
+    assert [event.message.dices for event in subscriber.events] == [
+        (dice, dice) for dice in range(1, 7)
+    ]
+    receiver.close(timeout=1)
@@ -0,0 +1,140 @@
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from game import card, data, sim, space  # noqa: E402
+from game import vector_sim as vsim  # noqa: E402
+from game.game import Game  # noqa: E402
+from game.player import Player  # noqa: E402
+
+
+class ParityPolicy(sim.Policy):
+    """The fixed policy of VectorSimulator"""
+
+    def should_buy(self, game: Game, player: Player, property_: space.Property) -> bool:
+        return True
+
+    def bid(
+        self, game: Game, player: Player, property_: space.Property, price: int
+    ) -> int:
+        return 0
+
+    def should_pay_jail_fine(self, game: Game, player: Player) -> bool:
+        return True
+
+    def raise_cash(self, game: Game, player: Player, amount: int) -> None:
+        return
+
+
+def test_board_tables():
+    board = vsim.BoardTables.from_game_map()
+    assert board.kind[0] == vsim.NOTHING
+    assert board.kind[1] == vsim.PROPERTY
+    assert board.kind[5] == vsim.RAILROAD
+    assert board.kind[12] == vsim.UTILITY
+    assert board.kind[7] == vsim.CHANCE
+    assert board.kind[2] == vsim.CC
+    assert board.kind[30] == vsim.GO_TO_JAIL
+    assert board.price[39] == 400
+    assert board.set_size[1] == 2 and board.set_size[5] == 4
+    assert board.set_members[1].tolist() == [1, 3, 1, 1]
+    assert board.nearest_railroad[36] == 5
+    assert board.nearest_utility[22] == 28
+
+
+def test_run_finishes():
+    simulator = vsim.VectorSimulator(n_games=50, seed=1, max_turns=100)
+    stats = simulator.run()
+    assert simulator.finished.all()
+    assert stats.games == 50
+    assert stats.timeouts + sum(stats.wins) == 50
+    assert stats.turns == simulator.turns.sum()
+    assert (simulator.turns <= 100).all()
+    assert stats.landings.sum() > 0
+    # bankrupt players hand over all of their cash
+    assert (simulator.cash[~simulator.active] == 0).all()
+
+
+def test_run_deterministic():
+    stats_1 = vsim.VectorSimulator(n_games=20, seed=7, max_turns=50).run()
+    stats_2 = vsim.VectorSimulator(n_games=20, seed=7, max_turns=50).run()
+    assert stats_1.turns == stats_2.turns
+    assert stats_1.wins == stats_2.wins
+    assert (stats_1.landings == stats_2.landings).all()
+
+
+def test_compute_rent():
+    simulator = vsim.VectorSimulator(n_games=1, seed=1)
+    g = np.array([0])
+    simulator.owner[0, 1] = 0
+    assert simulator.compute_rent(g, np.array([1]))[0] == 2
+    simulator.owner[0, 3] = 0  # monopoly
+    assert simulator.compute_rent(g, np.array([1]))[0] == 4
+    simulator.houses[0, 1] = vsim.HOTEL_LEVEL
+    assert simulator.compute_rent(g, np.array([1]))[0] == 250
+    simulator.owner[0, [5, 15]] = 1
+    assert simulator.compute_rent(g, np.array([5]))[0] == 50
+    simulator.mortgaged[0, 5] = True
+    assert simulator.compute_rent(g, np.array([5]))[0] == 0
+    simulator.owner[0, 12] = 1
+    simulator.last_roll[0] = 7
+    assert simulator.compute_rent(g, np.array([12]))[0] == 28
+
+
+@pytest.mark.parametrize("seed", [1, 2])
+def test_parity_with_simulator(seed: int, monkeypatch: pytest.MonkeyPatch):
+    """Replay every vectorized game on Game with the same dice, decks and order"""
+    n_games, n_players, starting_cash, max_turns = 30, 4, 500, 150
+    simulator = vsim.VectorSimulator(
+        n_games=n_games,
+        n_players=n_players,
+        seed=seed,
+        starting_cash=starting_cash,
+        max_turns=max_turns,
+        record_dice=True,
+    )
+    first_players = simulator.current.copy()
+    decks = [cards.copy() for cards in simulator.deck_cards]
+    simulator.run()
+
+    dice_by_game: list[list[tuple[int, int]]] = [[] for _ in range(n_games)]
+    for games, dice in simulator.dice_log:
+        for game_idx, (dice_1, dice_2) in zip(games, dice):
+            dice_by_game[game_idx].append((int(dice_1), int(dice_2)))
+    assert sum(1 for active in simulator.active if active.sum() == 1) > 0
+
+    replay = sim.Simulator(
+        policies=[ParityPolicy() for _ in range(n_players)],
+        starting_cash=starting_cash,
+        max_turns=max_turns,
+        auctions=False,
+    )
+    for game_idx in range(n_games):
+        game = Game()
+        for idx in range(n_players):
+            game.add_player(f"Bot {idx + 1}", cash=starting_cash)
+        game.initialize()
+        game.current_player_uid = int(first_players[game_idx])
+        for deck, cards_data, order in (
+            (game.chance_deck, data.CONST_CHANCE_CARDS, decks[0][game_idx]),
+            (game.cc_deck, data.CONST_CC_CARDS, decks[1][game_idx]),
+        ):
+            deck.cards = deque(card.ChanceCard(**cards_data[idx]) for idx in order)
+        rolls = iter(dice_by_game[game_idx])
+        monkeypatch.setattr("game.dice.roll", lambda **_: next(rolls))
+
+        result = replay.play_game(game)
+
+        assert next(rolls, None) is None
+        assert result.turns == simulator.turns[game_idx]
+        assert list(result.cash) == simulator.cash[game_idx].tolist()
+        assert list(result.active) == simulator.active[game_idx].tolist()
+        assert [player.position for player in game.players] == simulator.position[
+            game_idx
+        ].tolist()
+        for position, map_space in enumerate(game.game_map.map_list):
+            if isinstance(map_space, space.Property):
+                owner = simulator.owner[game_idx, position]
+                assert map_space.owner_uid == (None if owner < 0 else owner)